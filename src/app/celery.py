@@ -1,6 +1,9 @@
 import os
 
+from typing import Any
+
 from celery import Celery
+from celery.signals import task_prerun
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
 
@@ -8,3 +11,52 @@ app = Celery("app")
 app.config_from_object("django.conf:settings", namespace="CELERY")
 
 app.autodiscover_tasks()
+
+
+@task_prerun.connect
+def set_background_priority(**kwargs: Any) -> None:
+    """
+    Запросы задач к внешним API выполняются с фоновым приоритетом,
+    чтобы не расходовать квоту, зарезервированную для запросов пользователей.
+
+    :param kwargs: Параметры сигнала
+    :return:
+    """
+
+    from base.clients.quota import (  # pylint: disable=import-outside-toplevel
+        PRIORITY_BACKGROUND,
+        set_priority,
+    )
+
+    set_priority(PRIORITY_BACKGROUND)
+
+
+@task_prerun.connect
+def reset_database_pinning(**kwargs: Any) -> None:
+    """
+    Сброс привязки чтения к основной БД перед выполнением задачи
+    (чтение из реплик доступно до первой записи в задаче).
+
+    :param kwargs: Параметры сигнала
+    :return:
+    """
+
+    from base.routers import reset_pinning  # pylint: disable=import-outside-toplevel
+
+    reset_pinning()
+
+
+@task_prerun.connect
+def check_database_connections(**kwargs: Any) -> None:
+    """
+    Проверка работоспособности постоянных подключений к БД перед выполнением задачи.
+
+    :param kwargs: Параметры сигнала
+    :return:
+    """
+
+    from base.services.connections import (  # pylint: disable=import-outside-toplevel
+        check_connections,
+    )
+
+    check_connections()
@@ -15,6 +15,8 @@ import sys
 from pathlib import Path
 
 import environ
+from celery.schedules import crontab
+from django.core.exceptions import ImproperlyConfigured
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 ROOT_DIR = environ.Path(__file__) - 4
@@ -39,6 +41,8 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    # классы операторов индексов (`OpClass`) и другие возможности PostgreSQL
+    "django.contrib.postgres",
     "drf_yasg",
     "rest_framework",
     "django_celery_beat",
@@ -47,6 +51,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # сбор показателей производительности запросов
+    "base.middleware.MetricsMiddleware",
+    # сброс привязки чтения к основной БД в начале каждого запроса
+    "base.middleware.ReplicaPinningMiddleware",
+    # сжатие ответов (должно располагаться до middleware, изменяющих содержимое ответа)
+    "django.middleware.gzip.GZipMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -82,6 +92,32 @@ WSGI_APPLICATION = "app.wsgi.application"
 DATABASES = {
     "default": env.db(),
 }
+# реплики основной БД для запросов только на чтение (строки подключения через запятую)
+DATABASE_REPLICAS: list[str] = []
+for index, replica_url in enumerate(env.list("DATABASE_REPLICA_URLS", default=[])):
+    DATABASES[f"replica_{index}"] = {
+        **env.db_url_config(replica_url),
+        # в тестах реплики используют основную тестовую БД
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica_{index}")
+DATABASE_ROUTERS = ["base.routers.ReplicaRouter"]
+
+# режим подключений к БД:
+# none – новое подключение для каждого запроса,
+# persistent – постоянные подключения с проверкой работоспособности,
+# pgbouncer – постоянные подключения к PgBouncer в режиме transaction (без серверных курсоров)
+DATABASE_POOL_MODE: str = os.getenv("DATABASE_POOL_MODE", "persistent")
+# время жизни постоянного подключения к БД (в секундах)
+DATABASE_CONN_MAX_AGE: int = int(os.getenv("DATABASE_CONN_MAX_AGE", "60"))
+if DATABASE_POOL_MODE not in ("none", "persistent", "pgbouncer"):
+    raise ImproperlyConfigured(f"Unknown DATABASE_POOL_MODE: {DATABASE_POOL_MODE}")
+for database in DATABASES.values():
+    database["CONN_MAX_AGE"] = (
+        0 if DATABASE_POOL_MODE == "none" else DATABASE_CONN_MAX_AGE
+    )
+    # PgBouncer в режиме transaction не поддерживает серверные курсоры (QuerySet.iterator)
+    database["DISABLE_SERVER_SIDE_CURSORS"] = DATABASE_POOL_MODE == "pgbouncer"
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -128,6 +164,20 @@ MEDIA_URL = "/media/"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# настройки документации API (drf_yasg): Swagger UI и ReDoc загружают схему,
+# сформированную один раз за время работы процесса
+SWAGGER_SETTINGS = {
+    "DEFAULT_INFO": "app.urls.api_info",
+    "SPEC_URL": ("schema-json", {"format": ".json"}),
+}
+REDOC_SETTINGS = {
+    "SPEC_URL": ("schema-json", {"format": ".json"}),
+}
+# путь к файлу со схемой OpenAPI в формате JSON, сформированному при развертывании
+# (python manage.py generate_swagger --overwrite openapi.json); если не задан – схема
+# генерируется при первом запросе
+OPENAPI_SCHEMA_FILE = os.getenv("OPENAPI_SCHEMA_FILE", "")
+
 # настройки логирования
 LOGGING = {
     "version": 1,
@@ -160,11 +210,52 @@ BROKER_URL = f"redis://{REDIS_HOST}:{REDIS_PORT}/"
 
 # время актуальности данных о курсах валют (в секундах), по умолчанию – сутки
 CACHE_TTL_CURRENCY_RATES: int = int(os.getenv("CACHE_TTL_CURRENCY_RATES", "86_400"))
+# базовая валюта для получения и расчета курсов валют
+CURRENCY_BASE: str = os.getenv("CURRENCY_BASE", "RUB")
 # время актуальности данных о погоде (в секундах), по умолчанию ~ три часа
 CACHE_TTL_WEATHER: int = int(os.getenv("CACHE_TTL_WEATHER", "10_700"))
 
+# максимальное количество параллельных запросов к API погоды при пакетном получении данных
+WEATHER_REQUESTS_WORKERS: int = int(os.getenv("WEATHER_REQUESTS_WORKERS", "8"))
+# длина геохеша ячейки для кэширования данных о погоде (5 – ячейка около 5 x 5 км)
+WEATHER_GEOHASH_PRECISION: int = int(os.getenv("WEATHER_GEOHASH_PRECISION", "5"))
+# максимальное количество локаций в одном пакетном запросе погоды
+WEATHER_BULK_LIMIT: int = int(os.getenv("WEATHER_BULK_LIMIT", "100"))
+
+# количество самых запрашиваемых локаций для предварительного обновления данных о погоде
+WEATHER_PREWARM_TOP_N: int = int(os.getenv("WEATHER_PREWARM_TOP_N", "100"))
+# периодичность запуска предварительного обновления данных о погоде (в секундах)
+WEATHER_PREWARM_INTERVAL: int = int(os.getenv("WEATHER_PREWARM_INTERVAL", "600"))
+# данные обновляются, если до истечения их актуальности осталось меньше указанного времени (в секундах)
+WEATHER_PREWARM_WINDOW: int = int(os.getenv("WEATHER_PREWARM_WINDOW", "900"))
+# максимальное количество запросов к API погоды за один запуск предварительного обновления
+WEATHER_PREWARM_BUDGET: int = int(os.getenv("WEATHER_PREWARM_BUDGET", "50"))
+
+# время хранения последних успешных ответов внешних API для использования при их недоступности (в секундах)
+UPSTREAM_STALE_TTL: int = int(os.getenv("UPSTREAM_STALE_TTL", "86_400"))
+
+# время хранения ответов API данных о странах и городах (в секундах), по умолчанию – неделя
+GEO_RESPONSE_CACHE_TTL: int = int(os.getenv("GEO_RESPONSE_CACHE_TTL", "604_800"))
+# время хранения ответов API данных о странах и городах об отсутствии данных (в секундах)
+GEO_RESPONSE_CACHE_NEGATIVE_TTL: int = int(
+    os.getenv("GEO_RESPONSE_CACHE_NEGATIVE_TTL", "3_600")
+)
+
+# периодичность запуска фонового обновления данных о странах и городах (в секундах)
+GEO_REFRESH_INTERVAL: int = int(os.getenv("GEO_REFRESH_INTERVAL", "3_600"))
+# данные о стране или городе проверяются, если не проверялись и не изменялись дольше указанного времени
+# (в секундах, по умолчанию – 30 дней; должно быть больше GEO_RESPONSE_CACHE_TTL)
+GEO_REFRESH_MAX_AGE: int = int(os.getenv("GEO_REFRESH_MAX_AGE", "2_592_000"))
+# максимальное количество запросов к API данных о странах и городах за один запуск обновления
+GEO_REFRESH_BUDGET: int = int(os.getenv("GEO_REFRESH_BUDGET", "200"))
+# количество записей, проверяемых и сохраняемых за один шаг обновления
+GEO_REFRESH_BATCH_SIZE: int = int(os.getenv("GEO_REFRESH_BATCH_SIZE", "20"))
+# максимальное количество параллельных запросов к API при обновлении данных
+GEO_REFRESH_WORKERS: int = int(os.getenv("GEO_REFRESH_WORKERS", "4"))
+
 CACHE_WEATHER = "cache_weather"
 CACHE_CURRENCY = "cache_currency"
+CACHE_UPSTREAM = "cache_upstream"
 CACHES = {
     # общий кэш приложения
     "default": {
@@ -188,6 +279,14 @@ CACHES = {
         "OPTIONS": {"db": "2"},
         "TIMEOUT": CACHE_TTL_CURRENCY_RATES,
     },
+    # ответы внешних API (последние успешные ответы и кэш ответов)
+    CACHE_UPSTREAM: {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": BROKER_URL,
+        "KEY_PREFIX": "upstream",
+        "OPTIONS": {"db": "3"},
+        "TIMEOUT": UPSTREAM_STALE_TTL,
+    },
 }
 
 # настройки для Celery
@@ -197,6 +296,25 @@ CELERY_TIMEZONE = TIME_ZONE
 CELERY_ACCEPT_CONTENT = ["application/json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
+# периодические задачи (синхронизируются в расписание django_celery_beat при запуске)
+CELERY_BEAT_SCHEDULE = {
+    "rebuild_autocomplete": {
+        "task": "rebuild_autocomplete",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    "import_currency_rates": {
+        "task": "import_currency_rates",
+        "schedule": crontab(hour=0, minute=5),
+    },
+    "prewarm_weather": {
+        "task": "prewarm_weather",
+        "schedule": WEATHER_PREWARM_INTERVAL,
+    },
+    "refresh_geo_data": {
+        "task": "refresh_geo_data",
+        "schedule": GEO_REFRESH_INTERVAL,
+    },
+}
 
 # строка подключения к RabbitMQ
 RABBITMQ_URI = os.getenv(
@@ -213,5 +331,95 @@ API_KEY_APILAYER = env("API_KEY_APILAYER")
 API_KEY_OPENWEATHER = env("API_KEY_OPENWEATHER")
 # токен доступа к API для получения последних новостей
 API_KEY_NEWSAPI = env("API_KEY_NEWSAPI")
+# базовый адрес API APILayer (данные о странах, городах и курсах валют)
+API_BASE_URL_APILAYER = os.getenv("API_BASE_URL_APILAYER", "https://api.apilayer.com")
+# базовый адрес API OpenWeather
+API_BASE_URL_OPENWEATHER = os.getenv(
+    "API_BASE_URL_OPENWEATHER", "https://api.openweathermap.org"
+)
+# базовый адрес API NewsAPI
+API_BASE_URL_NEWSAPI = os.getenv("API_BASE_URL_NEWSAPI", "https://newsapi.org")
 # таймаут запросов на внешние ресурсы
 REQUESTS_TIMEOUT = env.int("REQUESTS_TIMEOUT")
+# минимальный адаптивный таймаут запросов на внешние ресурсы (в секундах)
+UPSTREAM_TIMEOUT_MIN: float = float(os.getenv("UPSTREAM_TIMEOUT_MIN", "1"))
+# множитель 99-го процентиля времени ответа внешнего ресурса для расчета адаптивного таймаута
+UPSTREAM_TIMEOUT_MULTIPLIER: float = float(
+    os.getenv("UPSTREAM_TIMEOUT_MULTIPLIER", "3")
+)
+# период, за который учитываются ошибки запросов к внешнему ресурсу (в секундах)
+UPSTREAM_BREAKER_WINDOW: int = int(os.getenv("UPSTREAM_BREAKER_WINDOW", "60"))
+# минимальное количество запросов за период для отключения запросов к внешнему ресурсу
+UPSTREAM_BREAKER_MIN_CALLS: int = int(os.getenv("UPSTREAM_BREAKER_MIN_CALLS", "10"))
+# доля ошибок за период, при которой запросы к внешнему ресурсу отключаются
+UPSTREAM_BREAKER_FAILURE_RATE: float = float(
+    os.getenv("UPSTREAM_BREAKER_FAILURE_RATE", "0.5")
+)
+# время, на которое отключаются запросы к внешнему ресурсу (в секундах)
+UPSTREAM_BREAKER_OPEN_SECONDS: int = int(
+    os.getenv("UPSTREAM_BREAKER_OPEN_SECONDS", "30")
+)
+# допустимое количество запросов в секунду к внешним API для всех процессов (0 – без ограничений)
+# и максимальное количество запросов подряд
+API_RATE_LIMIT_APILAYER: float = float(os.getenv("API_RATE_LIMIT_APILAYER", "0"))
+API_RATE_BURST_APILAYER: int = int(os.getenv("API_RATE_BURST_APILAYER", "10"))
+API_RATE_LIMIT_OPENWEATHER: float = float(os.getenv("API_RATE_LIMIT_OPENWEATHER", "0"))
+API_RATE_BURST_OPENWEATHER: int = int(os.getenv("API_RATE_BURST_OPENWEATHER", "10"))
+API_RATE_LIMIT_NEWSAPI: float = float(os.getenv("API_RATE_LIMIT_NEWSAPI", "0"))
+API_RATE_BURST_NEWSAPI: int = int(os.getenv("API_RATE_BURST_NEWSAPI", "10"))
+# доля квоты запросов к внешним API, недоступная фоновым задачам (резерв для запросов пользователей)
+UPSTREAM_QUOTA_BACKGROUND_RESERVE: float = float(
+    os.getenv("UPSTREAM_QUOTA_BACKGROUND_RESERVE", "0.5")
+)
+# максимальное время ожидания квоты запросов к внешним API (в секундах):
+# для запросов пользователей и для фоновых задач
+UPSTREAM_QUOTA_INTERACTIVE_WAIT: float = float(
+    os.getenv("UPSTREAM_QUOTA_INTERACTIVE_WAIT", "1")
+)
+UPSTREAM_QUOTA_BACKGROUND_WAIT: float = float(
+    os.getenv("UPSTREAM_QUOTA_BACKGROUND_WAIT", "60")
+)
+# максимальный радиус поиска ближайших городов (в километрах)
+CITY_NEAR_MAX_RADIUS: float = float(os.getenv("CITY_NEAR_MAX_RADIUS", "500"))
+# максимальное количество городов в ответе поиска ближайших городов
+CITY_NEAR_MAX_LIMIT: int = int(os.getenv("CITY_NEAR_MAX_LIMIT", "100"))
+# использование индекса координат городов в памяти процесса для обратного геокодирования
+GEO_INDEX_ENABLED: bool = env.bool("GEO_INDEX_ENABLED", default=False)
+# интервал фонового обновления индекса координат городов (в секундах);
+# города, импортированные в том же процессе, добавляются в индекс сразу
+GEO_INDEX_REFRESH_INTERVAL: int = int(os.getenv("GEO_INDEX_REFRESH_INTERVAL", "60"))
+# интервал полной перестройки индекса координат городов (в секундах):
+# удаленные города исключаются из индекса только при полной перестройке
+GEO_INDEX_REBUILD_INTERVAL: int = int(os.getenv("GEO_INDEX_REBUILD_INTERVAL", "3600"))
+# максимальное количество точек в одном запросе обратного геокодирования
+GEO_INDEX_BATCH_LIMIT: int = int(os.getenv("GEO_INDEX_BATCH_LIMIT", "10000"))
+# максимальное количество точек в одном запросе обратного геокодирования
+# без индекса координат (для каждой точки выполняется запрос к БД)
+GEO_REVERSE_DB_BATCH_LIMIT: int = int(os.getenv("GEO_REVERSE_DB_BATCH_LIMIT", "100"))
+# добавление в ответы заголовка Server-Timing с показателями производительности запроса
+SERVER_TIMING_ENABLED: bool = env.bool("SERVER_TIMING_ENABLED", default=False)
+# токен доступа к показателям производительности (/metrics, заголовок
+# `Authorization: Bearer <токен>`); пустое значение – доступ запрещен
+METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
+# каталог файлов показателей Prometheus при работе в нескольких процессах (воркеры сервера
+# приложений): /metrics возвращает показатели всех процессов. Каталог должен существовать
+# и очищаться перед запуском; без значения публикуются показатели текущего процесса
+PROMETHEUS_MULTIPROC_DIR: str = os.getenv("PROMETHEUS_MULTIPROC_DIR", "")
+# режим административного интерфейса для больших таблиц: оценка количества записей
+# по статистике PostgreSQL и полнотекстовый поиск по индексу
+ADMIN_PERFORMANCE_MODE: bool = env.bool("ADMIN_PERFORMANCE_MODE", default=True)
+# минимальное оценочное количество записей в таблице, начиная с которого
+# в административном интерфейсе не выполняется точный подсчет записей
+ADMIN_ESTIMATED_COUNT_MIN: int = int(os.getenv("ADMIN_ESTIMATED_COUNT_MIN", "10000"))
+# максимальное количество результатов автодополнения
+AUTOCOMPLETE_LIMIT: int = int(os.getenv("AUTOCOMPLETE_LIMIT", "10"))
+# максимальная длина индексируемого префикса названия для автодополнения
+AUTOCOMPLETE_MAX_PREFIX: int = int(os.getenv("AUTOCOMPLETE_MAX_PREFIX", "10"))
+# максимальное количество записей в одном ответе ленты изменений
+CHANGES_LIMIT: int = int(os.getenv("CHANGES_LIMIT", "500"))
+# задержка ленты изменений (в секундах) относительно начала самой ранней незавершенной
+# транзакции основной БД: учитывает расхождение часов серверов приложения и БД.
+# Длительные транзакции (например, пакеты загрузчика) задерживают ленту, но не пропускаются
+CHANGES_DELAY: int = int(os.getenv("CHANGES_DELAY", "5"))
+# время ожидания каждого раздела сводной информации о месте (в секундах)
+LOCATION_SECTION_TIMEOUT: float = float(os.getenv("LOCATION_SECTION_TIMEOUT", "5"))
@@ -20,13 +20,16 @@ from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 from rest_framework import permissions
 
+from base.views import get_metrics, get_openapi_schema
+
+api_info = openapi.Info(  # pylint: disable=C0103
+    title="Countries Informer API",
+    default_version="v1",
+    description="Сервис для получения актуальной информации о стране",
+)
 
 schema_view = get_schema_view(  # pylint: disable=C0103
-    openapi.Info(
-        title="Countries Informer API",
-        default_version="v1",
-        description="Сервис для получения актуальной информации о стране",
-    ),
+    api_info,
     public=True,
     permission_classes=[permissions.AllowAny],
 )
@@ -34,9 +37,10 @@ schema_view = get_schema_view(  # pylint: disable=C0103
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/v1/", include("geo.urls")),
+    path("metrics", get_metrics, name="metrics"),
     re_path(
         r"^swagger(?P<format>\.json|\.yaml)$",
-        schema_view.without_ui(cache_timeout=0),
+        get_openapi_schema,
         name="schema-json",
     ),
     re_path(
@@ -0,0 +1,94 @@
+"""
+Базовые классы административного интерфейса для больших таблиц.
+"""
+import re
+from typing import Any, Optional
+
+from django.contrib import admin
+from django.contrib.postgres.search import SearchQuery
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.http import HttpRequest
+from django.utils.functional import cached_property
+
+from app.settings import ADMIN_ESTIMATED_COUNT_MIN, ADMIN_PERFORMANCE_MODE
+from base.models import SEARCH_CONFIG, build_search_vector
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Постраничный вывод с оценкой количества записей по статистике PostgreSQL (`pg_class`)
+    вместо `COUNT(*)` для запросов без условий отбора.
+    """
+
+    @cached_property
+    def count(self) -> int:  # type: ignore
+        queryset: Any = self.object_list
+        # оценка используется только для всей таблицы (без фильтров и поиска)
+        if hasattr(queryset, "query") and not queryset.query.where:
+            if (estimate := self._get_estimate(queryset)) is not None:
+                return estimate
+
+        return super().count
+
+    @staticmethod
+    def _get_estimate(queryset: QuerySet) -> Optional[int]:
+        """
+        Получение оценки количества записей в таблице.
+        Для небольших таблиц и таблиц без статистики возвращается None (точный подсчет).
+
+        :param queryset: Запрос
+        :return:
+        """
+
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+
+        if row and row[0] >= ADMIN_ESTIMATED_COUNT_MIN:
+            return int(row[0])
+
+        return None
+
+
+class PerformanceModelAdmin(admin.ModelAdmin):
+    """
+    Административный интерфейс для больших таблиц (при включенной настройке
+    `ADMIN_PERFORMANCE_MODE`): оценка количества записей вместо `COUNT(*)`
+    и полнотекстовый поиск по GIN-индексу полей `search_vector_fields`
+    вместо `icontains` по полям `search_fields`.
+    """
+
+    # поля, по которым построен GIN-индекс для полнотекстового поиска
+    search_vector_fields: tuple[str, ...] = ()
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        if ADMIN_PERFORMANCE_MODE:
+            self.paginator = EstimatedCountPaginator
+            # общее количество записей без учета фильтров не подсчитывается
+            self.show_full_result_count = False
+
+    def get_search_results(
+        self, request: HttpRequest, queryset: QuerySet, search_term: str
+    ) -> tuple[QuerySet, bool]:
+        if not ADMIN_PERFORMANCE_MODE or not self.search_vector_fields:
+            return super().get_search_results(request, queryset, search_term)
+
+        # поиск слов по началу: "mosc" находит "Moscow"
+        if words := re.findall(r"\w+", search_term):
+            queryset = queryset.annotate(
+                search_vector=build_search_vector(*self.search_vector_fields)
+            ).filter(
+                search_vector=SearchQuery(
+                    " & ".join(f"{word}:*" for word in words),
+                    search_type="raw",
+                    config=SEARCH_CONFIG,
+                )
+            )
+
+        return queryset, False
@@ -2,15 +2,53 @@
 Базовые функции для клиентов внешних сервисов.
 """
 
+import hashlib
+import json
+import logging
+import threading
+import time
+import zlib
 from abc import ABC, abstractmethod
-from typing import Optional
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+from typing import Any, Optional
+from urllib.parse import parse_qsl, unquote, urlencode, urlparse, urlsplit
+
+import httpx
+from django.core.cache import caches
+
+from app.settings import CACHE_UPSTREAM, UPSTREAM_STALE_TTL
+from base.clients.quota import QuotaGovernor
+from base.clients.resilience import AdaptiveTimeout, CircuitBreaker
+from base.services.metrics import record_cache
+
+logger = logging.getLogger()
+
+# время ожидания после ответа 429 без заголовка Retry-After (в секундах)
+RETRY_AFTER_DEFAULT = 1.0
 
 
 class BaseClient(ABC):
     """
     Базовый класс, реализующий интерфейс для клиентов.
+
+    Запросы к каждому внешнему сервису (хосту) выполняются через общий для процесса
+    автоматический выключатель и адаптивный таймаут. При ошибке сервиса или открытом
+    выключателе возвращается последний успешный ответ на такой же запрос (если он сохранен).
+    Клиенты, для которых задано время хранения ответов (`get_cache_ttl`),
+    получают повторные ответы из кэша без запроса к сервису. Ответ хранится в кэше
+    одной записью со временем актуальности: актуальная запись заменяет запрос к сервису,
+    устаревшая используется при ошибке сервиса.
     """
 
+    _lock = threading.Lock()
+    # хост внешнего сервиса -> (автоматический выключатель, таймаут)
+    _upstreams: dict[str, tuple[CircuitBreaker, AdaptiveTimeout]] = {}
+    # признак отказа в запросе клиента из-за открытого выключателя или исчерпанной квоты
+    # (позволяет фоновым задачам отличить недоступность сервиса от отсутствия данных)
+    throttled = False
+
     @abstractmethod
     def get_base_url(self) -> str:
         """
@@ -19,6 +57,26 @@ class BaseClient(ABC):
         :return:
         """
 
+    def get_rate_limit(self) -> tuple[float, int]:
+        """
+        Получение ограничения частоты запросов к внешнему сервису:
+        количество запросов в секунду (0 – без ограничений) и максимальное количество запросов подряд.
+
+        :return:
+        """
+
+        return 0.0, 1
+
+    def get_cache_ttl(self) -> tuple[int, int]:
+        """
+        Получение времени хранения ответов внешнего сервиса в кэше (в секундах):
+        для успешных ответов и для ответов `404 Not Found` (0 – не кэшировать).
+
+        :return:
+        """
+
+        return 0, 0
+
     @abstractmethod
     def _request(self, endpoint: str) -> Optional[dict]:
         """
@@ -27,3 +85,238 @@ class BaseClient(ABC):
         :param endpoint:
         :return:
         """
+
+    def _get(self, endpoint: str, headers: Optional[dict] = None) -> Optional[Any]:
+        """
+        Выполнение GET-запроса к внешнему сервису.
+
+        :param endpoint: Адрес запроса
+        :param headers: Заголовки запроса
+        :return: Данные ответа или None, если данные не получены
+        """
+
+        cache_key = self._get_cache_key(endpoint)
+        if any(self.get_cache_ttl()):
+            entry = caches[CACHE_UPSTREAM].get(f"response_{cache_key}")
+            fresh = entry is not None and entry[0] > time.time()
+            record_cache(CACHE_UPSTREAM, int(fresh), int(not fresh))
+            if fresh:
+                return self._unpack(entry[1])
+
+        breaker, timeout = self._get_upstream()
+        if not breaker.allow():
+            logger.warning("Circuit breaker is open for %s.", self.get_base_url())
+            self.throttled = True
+            return self._get_stale(cache_key)
+
+        quota = QuotaGovernor(
+            urlparse(self.get_base_url()).netloc, *self.get_rate_limit()
+        )
+        if not quota.acquire():
+            # пробный запрос не выполнен: следующий запрос сможет его выполнить
+            breaker.release()
+            self.throttled = True
+            return self._get_stale(cache_key)
+
+        data = None
+        success = False
+        try:
+            response = self._send(endpoint, headers, timeout)
+            if response is not None:
+                if response.status_code == HTTPStatus.TOO_MANY_REQUESTS:
+                    # квота исчерпана: запросы всех процессов приостанавливаются
+                    quota.block(
+                        self._parse_retry_after(response.headers.get("Retry-After"))
+                    )
+                    self.throttled = True
+                # ответы 4xx, кроме 429 (например, 404), являются корректными ответами сервиса
+                ok = (
+                    response.status_code != HTTPStatus.TOO_MANY_REQUESTS
+                    and response.status_code < HTTPStatus.INTERNAL_SERVER_ERROR
+                )
+                if ok and response.status_code == HTTPStatus.OK:
+                    data = response.json()
+                success = ok
+        finally:
+            # результат учитывается при любом исходе, в том числе при непредвиденной ошибке,
+            # иначе пробный запрос полуоткрытого выключателя не будет завершен
+            breaker.record(success)
+
+        if not success or response is None:
+            return self._get_stale(cache_key)
+
+        self._store(cache_key, response, data)
+
+        return data
+
+    def _send(
+        self, endpoint: str, headers: Optional[dict], timeout: AdaptiveTimeout
+    ) -> Optional[httpx.Response]:
+        """
+        Отправка запроса с учетом времени ответа в адаптивном таймауте.
+
+        :param endpoint: Адрес запроса
+        :param headers: Заголовки запроса
+        :param timeout: Адаптивный таймаут внешнего сервиса
+        :return: Ответ или None при ошибке соединения или превышении таймаута
+        """
+
+        started = time.perf_counter()
+        try:
+            with httpx.Client(timeout=timeout.get()) as client:
+                response = client.get(endpoint, headers=headers)
+        except httpx.TimeoutException:
+            timeout.record(timeout.get())
+            logger.warning("Request to %s timed out.", self.get_base_url())
+            return None
+        except httpx.HTTPError:
+            logger.warning("Request to %s failed.", self.get_base_url(), exc_info=True)
+            return None
+
+        timeout.record(time.perf_counter() - started)
+
+        return response
+
+    def _get_upstream(self) -> tuple[CircuitBreaker, AdaptiveTimeout]:
+        """
+        Получение автоматического выключателя и таймаута для внешнего сервиса клиента.
+
+        :return:
+        """
+
+        host = urlparse(self.get_base_url()).netloc
+        with self._lock:
+            if host not in self._upstreams:
+                self._upstreams[host] = (CircuitBreaker(), AdaptiveTimeout())
+
+            return self._upstreams[host]
+
+    def _store(
+        self, cache_key: str, response: httpx.Response, data: Optional[Any]
+    ) -> None:
+        """
+        Сохранение ответа в кэше со временем его актуальности.
+
+        Успешный ответ хранится не меньше `UPSTREAM_STALE_TTL` для использования
+        при ошибке сервиса. Из остальных ответов сохраняется только `404 Not Found`
+        (ответы 400, 401, 403 могут быть вызваны временной ошибкой ключа или запроса).
+
+        :param cache_key: Ключ запроса
+        :param response: Ответ внешнего сервиса
+        :param data: Данные ответа
+        :return:
+        """
+
+        ttl, negative_ttl = self.get_cache_ttl()
+        if data is not None:
+            fresh_ttl = self._get_response_ttl(response, ttl)
+            timeout = max(fresh_ttl, UPSTREAM_STALE_TTL)
+        elif response.status_code == HTTPStatus.NOT_FOUND:
+            fresh_ttl = timeout = self._get_response_ttl(response, negative_ttl)
+        else:
+            return
+
+        if timeout:
+            caches[CACHE_UPSTREAM].set(
+                f"response_{cache_key}",
+                (time.time() + fresh_ttl, self._pack(data)),
+                timeout,
+            )
+
+    def _get_stale(self, cache_key: str) -> Optional[Any]:
+        """
+        Получение последнего сохраненного ответа на запрос (в том числе устаревшего).
+
+        :param cache_key: Ключ запроса
+        :return:
+        """
+
+        if entry := caches[CACHE_UPSTREAM].get(f"response_{cache_key}"):
+            return self._unpack(entry[1])
+
+        return None
+
+    @staticmethod
+    def _get_response_ttl(response: httpx.Response, default: int) -> int:
+        """
+        Получение времени хранения ответа в кэше с учетом заголовка Cache-Control.
+
+        :param response: Ответ внешнего сервиса
+        :param default: Время хранения по умолчанию (в секундах)
+        :return:
+        """
+
+        if not default:
+            return 0
+
+        directives = {}
+        for directive in response.headers.get("Cache-Control", "").lower().split(","):
+            name, _, value = directive.strip().partition("=")
+            directives[name] = value.strip('"')
+        if "no-store" in directives or "no-cache" in directives:
+            return 0
+        for name in ("s-maxage", "max-age"):
+            if directives.get(name, "").isdigit():
+                return min(default, int(directives[name]))
+
+        return default
+
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> float:
+        """
+        Получение времени ожидания из заголовка Retry-After (число секунд или дата).
+
+        :param value: Значение заголовка
+        :return: Время ожидания (в секундах)
+        """
+
+        if not value:
+            return RETRY_AFTER_DEFAULT
+        if value.strip().isdigit():
+            return float(value)
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return RETRY_AFTER_DEFAULT
+
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+    @staticmethod
+    def _get_cache_key(endpoint: str) -> str:
+        """
+        Формирование ключа кэша для запроса: адрес нормализуется (регистр хоста и пути,
+        кодирование символов, порядок параметров) и хэшируется, так как может содержать ключ API.
+
+        :param endpoint: Адрес запроса
+        :return:
+        """
+
+        url = urlsplit(endpoint)
+        path = " ".join(unquote(url.path).lower().split())
+        # значения параметров могут зависеть от регистра, поэтому не изменяются
+        query = urlencode(sorted(parse_qsl(url.query)))
+        normalized = f"{url.netloc.lower()}{path}?{query}"
+
+        return hashlib.sha1(normalized.encode()).hexdigest()
+
+    @staticmethod
+    def _pack(data: Optional[Any]) -> bytes:
+        """
+        Сжатие данных ответа для хранения в кэше.
+
+        :param data: Данные ответа
+        :return:
+        """
+
+        return zlib.compress(json.dumps(data).encode())
+
+    @staticmethod
+    def _unpack(packed: bytes) -> Optional[Any]:
+        """
+        Распаковка данных ответа из кэша.
+
+        :param packed: Сжатые данные
+        :return:
+        """
+
+        return json.loads(zlib.decompress(packed))
@@ -0,0 +1,157 @@
+"""
+Распределенное ограничение частоты запросов к внешним сервисам (общее для всех процессов).
+"""
+import logging
+import math
+import time
+from contextvars import ContextVar
+
+from redis.exceptions import RedisError
+
+from app.settings import (
+    UPSTREAM_QUOTA_BACKGROUND_RESERVE,
+    UPSTREAM_QUOTA_BACKGROUND_WAIT,
+    UPSTREAM_QUOTA_INTERACTIVE_WAIT,
+)
+from base.services.cache import get_redis_client
+
+logger = logging.getLogger()
+
+# приоритеты запросов: интерактивные (запросы пользователей) и фоновые (задачи, импорт)
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BACKGROUND = "background"
+
+_priority: ContextVar[str] = ContextVar(
+    "upstream_priority", default=PRIORITY_INTERACTIVE
+)
+
+# корзина маркеров: возвращает 0, если запрос разрешен, иначе время ожидания (в миллисекундах)
+TOKEN_BUCKET_SCRIPT = """
+local blocked = redis.call('PTTL', KEYS[2])
+if blocked > 0 then
+    return blocked
+end
+
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local reserve = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or burst
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate / 1000)
+
+local wait = 0
+if tokens - 1 >= reserve then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 + reserve - tokens) * 1000 / rate)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst * 1000 / rate) + 1000)
+
+return wait
+"""
+
+
+def set_priority(priority: str) -> None:
+    """
+    Установка приоритета запросов к внешним сервисам для текущего контекста выполнения.
+
+    :param priority: Приоритет
+    :return:
+    """
+
+    _priority.set(priority)
+
+
+class QuotaGovernor:
+    """
+    Ограничение частоты запросов к внешнему сервису по алгоритму корзины маркеров в Redis.
+
+    Фоновые запросы не могут использовать последние `UPSTREAM_QUOTA_BACKGROUND_RESERVE`
+    доли корзины, поэтому интерактивные запросы получают маркеры в первую очередь.
+    Ответ сервиса `429 Too Many Requests` блокирует запросы всех процессов
+    на время из заголовка `Retry-After`.
+    """
+
+    def __init__(self, upstream: str, rate: float, burst: int) -> None:
+        """
+        Конструктор.
+
+        :param upstream: Название внешнего сервиса
+        :param rate: Допустимое количество запросов в секунду (0 – без ограничений)
+        :param burst: Максимальное количество запросов подряд
+        """
+
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.bucket_key = f"quota:{upstream}"
+        self.blocked_key = f"quota:{upstream}:blocked"
+
+    def acquire(self) -> bool:
+        """
+        Получение разрешения на запрос (с ожиданием, допустимым для текущего приоритета).
+
+        :return: Признак разрешения запроса
+        """
+
+        if self.rate <= 0:
+            return True
+
+        background = _priority.get() == PRIORITY_BACKGROUND
+        reserve = (
+            min(
+                self.burst - 1,
+                math.floor(self.burst * UPSTREAM_QUOTA_BACKGROUND_RESERVE),
+            )
+            if background
+            else 0
+        )
+        max_wait = (
+            UPSTREAM_QUOTA_BACKGROUND_WAIT
+            if background
+            else UPSTREAM_QUOTA_INTERACTIVE_WAIT
+        )
+        deadline = time.monotonic() + max_wait
+
+        try:
+            client = get_redis_client("default")
+            while True:
+                wait = client.eval(
+                    TOKEN_BUCKET_SCRIPT,
+                    2,
+                    self.bucket_key,
+                    self.blocked_key,
+                    self.rate,
+                    self.burst,
+                    reserve,
+                )
+                if not wait:
+                    return True
+                if time.monotonic() + wait / 1000 > deadline:
+                    logger.warning("Upstream quota exceeded for '%s'.", self.bucket_key)
+                    return False
+                time.sleep(wait / 1000)
+        except RedisError:
+            # при недоступности Redis запросы не ограничиваются
+            logger.warning("Failed to check upstream quota.", exc_info=True)
+            return True
+
+    def block(self, seconds: float) -> None:
+        """
+        Блокировка запросов к внешнему сервису для всех процессов.
+
+        :param seconds: Время блокировки (в секундах)
+        :return:
+        """
+
+        try:
+            get_redis_client("default").set(
+                self.blocked_key, 1, px=max(1, int(seconds * 1000))
+            )
+        except RedisError:
+            logger.warning("Failed to block upstream requests.", exc_info=True)
@@ -0,0 +1,166 @@
+"""
+Функции для защиты от деградации внешних сервисов: автоматический выключатель
+(circuit breaker) и адаптивный таймаут запросов.
+"""
+import math
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from app.settings import (
+    REQUESTS_TIMEOUT,
+    UPSTREAM_BREAKER_FAILURE_RATE,
+    UPSTREAM_BREAKER_MIN_CALLS,
+    UPSTREAM_BREAKER_OPEN_SECONDS,
+    UPSTREAM_BREAKER_WINDOW,
+    UPSTREAM_TIMEOUT_MIN,
+    UPSTREAM_TIMEOUT_MULTIPLIER,
+)
+
+# состояния автоматического выключателя
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+# количество последних значений времени ответа для расчета таймаута
+LATENCY_SAMPLES = 200
+# минимальное количество значений времени ответа для расчета таймаута
+LATENCY_MIN_SAMPLES = 20
+
+
+class CircuitBreaker:
+    """
+    Автоматический выключатель для внешнего сервиса.
+
+    Если за последние `UPSTREAM_BREAKER_WINDOW` секунд доля неудачных запросов превысила
+    `UPSTREAM_BREAKER_FAILURE_RATE`, запросы к сервису не выполняются в течение
+    `UPSTREAM_BREAKER_OPEN_SECONDS` секунд. Затем выполняется один пробный запрос:
+    при успехе выключатель закрывается, иначе – снова открывается.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.state = STATE_CLOSED
+        self.opened_at = 0.0
+        self.probing = False
+        # время и результат последних запросов
+        self.calls: deque[tuple[float, bool]] = deque()
+
+    def allow(self) -> bool:
+        """
+        Проверка возможности выполнить запрос.
+
+        :return:
+        """
+
+        with self.lock:
+            if self.state == STATE_CLOSED:
+                return True
+            if (
+                self.state == STATE_OPEN
+                and time.monotonic() - self.opened_at >= UPSTREAM_BREAKER_OPEN_SECONDS
+            ):
+                self.state = STATE_HALF_OPEN
+            if self.state == STATE_HALF_OPEN and not self.probing:
+                self.probing = True
+                return True
+
+            return False
+
+    def release(self) -> None:
+        """
+        Отказ от пробного запроса, разрешенного `allow`, без учета результата
+        (например, если запрос не выполнен из-за ограничения частоты запросов).
+
+        :return:
+        """
+
+        with self.lock:
+            self.probing = False
+
+    def record(self, success: bool) -> None:
+        """
+        Учет результата запроса.
+
+        :param success: Признак успешного запроса
+        :return:
+        """
+
+        now = time.monotonic()
+        with self.lock:
+            if self.state == STATE_HALF_OPEN:
+                self.probing = False
+                self.calls.clear()
+                if success:
+                    self.state = STATE_CLOSED
+                else:
+                    self._open(now)
+                return
+
+            self.calls.append((now, success))
+            while self.calls and self.calls[0][0] < now - UPSTREAM_BREAKER_WINDOW:
+                self.calls.popleft()
+
+            failures = sum(1 for _, ok in self.calls if not ok)
+            if (
+                len(self.calls) >= UPSTREAM_BREAKER_MIN_CALLS
+                and failures / len(self.calls) >= UPSTREAM_BREAKER_FAILURE_RATE
+            ):
+                self._open(now)
+
+    def _open(self, now: float) -> None:
+        """
+        Открытие выключателя (вызывается под блокировкой).
+
+        :param now: Текущее время
+        :return:
+        """
+
+        self.state = STATE_OPEN
+        self.opened_at = now
+        self.calls.clear()
+
+
+class AdaptiveTimeout:
+    """
+    Таймаут запросов, рассчитываемый по 99-му процентилю времени ответа внешнего сервиса.
+
+    Таймаут равен процентилю, умноженному на `UPSTREAM_TIMEOUT_MULTIPLIER`,
+    но не меньше `UPSTREAM_TIMEOUT_MIN` и не больше `REQUESTS_TIMEOUT`.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.samples: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.value: Optional[float] = None
+
+    def get(self) -> float:
+        """
+        Получение текущего таймаута (в секундах).
+
+        :return:
+        """
+
+        return self.value or REQUESTS_TIMEOUT
+
+    def record(self, seconds: float) -> None:
+        """
+        Учет времени ответа (при превышении таймаута учитывается значение таймаута,
+        поэтому при замедлении сервиса таймаут постепенно увеличивается).
+
+        :param seconds: Время ответа
+        :return:
+        """
+
+        with self.lock:
+            self.samples.append(seconds)
+            if len(self.samples) < LATENCY_MIN_SAMPLES:
+                return
+
+            ordered = sorted(self.samples)
+            percentile = ordered[math.ceil(len(ordered) * 0.99) - 1]
+            self.value = min(
+                float(REQUESTS_TIMEOUT),
+                max(UPSTREAM_TIMEOUT_MIN, percentile * UPSTREAM_TIMEOUT_MULTIPLIER),
+            )
@@ -1,14 +1,46 @@
 """
 Описание моделей данных (DTO).
 """
+from typing import Any, TypeVar
 
-from pydantic import BaseModel
+from pydantic import BaseModel, parse_obj_as
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
 
 
 class HashableBaseModel(BaseModel):
     """
     Добавление хэшируемости для моделей.
+
+    Модели неизменяемы, поэтому хэш вычисляется один раз и хранится в слоте `_hash`,
+    а вложенные модели при проверке данных используются без копирования.
     """
 
+    __slots__ = ("_hash",)
+    _hash: int
+
+    class Config:
+        frozen = True
+        copy_on_model_validation = "none"
+
     def __hash__(self) -> int:
-        return hash((type(self),) + tuple(self.__dict__.values()))
+        try:
+            return self._hash
+        except AttributeError:
+            value = hash((type(self),) + tuple(self.__dict__.values()))
+            object.__setattr__(self, "_hash", value)
+
+            return value
+
+
+def parse_list(model: type[ModelT], items: Any) -> list[ModelT]:
+    """
+    Проверка и преобразование списка данных (например, ответа внешнего сервиса)
+    в список моделей за один вызов.
+
+    :param model: Класс модели
+    :param items: Список данных
+    :return:
+    """
+
+    return parse_obj_as(list[model], items)  # type: ignore
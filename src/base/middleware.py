@@ -0,0 +1,82 @@
+"""
+Промежуточные слои (middleware) для обработки запросов.
+"""
+import time
+from typing import Callable
+
+from django.http import HttpRequest, HttpResponse
+
+from app.settings import SERVER_TIMING_ENABLED
+from base.routers import reset_pinning
+from base.services.metrics import (
+    REQUEST_DB_DURATION,
+    REQUEST_DB_QUERIES,
+    REQUEST_DURATION,
+    count_queries,
+    finish_request,
+    start_request,
+)
+
+
+class MetricsMiddleware:
+    """
+    Сбор показателей производительности запросов: время обработки, количество и время
+    запросов к БД, обращения к кэшу, запросы к внешним API и время сериализации.
+
+    Показатели публикуются в Prometheus, а при включенной настройке `SERVER_TIMING_ENABLED`
+    также возвращаются в заголовке ответа Server-Timing.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        metrics = start_request()
+        started = time.perf_counter()
+        try:
+            with count_queries(metrics):
+                response = self.get_response(request)
+        finally:
+            finish_request()
+        total = time.perf_counter() - started
+
+        view = self._get_view_name(request)
+        REQUEST_DURATION.labels(request.method, view, response.status_code).observe(
+            total
+        )
+        REQUEST_DB_QUERIES.labels(view).observe(metrics.db_queries)
+        REQUEST_DB_DURATION.labels(view).observe(metrics.db_seconds)
+
+        if SERVER_TIMING_ENABLED:
+            response["Server-Timing"] = metrics.build_server_timing(total)
+
+        return response
+
+    @staticmethod
+    def _get_view_name(request: HttpRequest) -> str:
+        """
+        Получение названия маршрута запроса (для ограничения количества меток Prometheus).
+
+        :param request: Объект запроса
+        :return:
+        """
+
+        if match := request.resolver_match:
+            return match.view_name
+
+        return "unknown"
+
+
+class ReplicaPinningMiddleware:
+    """
+    Сброс привязки чтения к основной БД: после записи в основную БД чтение в рамках того же
+    запроса выполняется из нее, а следующий запрос снова может читать из реплик.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        reset_pinning()
+
+        return self.get_response(request)
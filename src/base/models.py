@@ -1,5 +1,21 @@
+from django.contrib.postgres.search import SearchVector
 from django.db import models
 
+# конфигурация полнотекстового поиска: без морфологии, так как данные на разных языках
+SEARCH_CONFIG = "simple"
+
+
+def build_search_vector(*fields: str) -> SearchVector:
+    """
+    Формирование выражения для полнотекстового поиска по полям модели.
+    Выражение GIN-индекса и выражение в запросе должны совпадать, чтобы поиск использовал индекс.
+
+    :param fields: Названия полей
+    :return:
+    """
+
+    return SearchVector(*fields, config=SEARCH_CONFIG)
+
 
 class TimeStampMixin(models.Model):
     """
@@ -0,0 +1,72 @@
+"""
+Маршрутизация запросов к базам данных (основная БД и реплики для чтения).
+"""
+import random
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from django.db.models import Model
+
+from app.settings import DATABASE_REPLICAS
+
+# признак записи в основную БД в текущем запросе (задаче): последующие чтения
+# выполняются из основной БД, чтобы не получить устаревшие данные из реплики
+_pinned: ContextVar[bool] = ContextVar("database_pinned", default=False)
+
+
+def get_read_database() -> str:
+    """
+    Получение псевдонима БД для запросов только на чтение.
+
+    Возвращается случайная реплика, а если реплики не настроены
+    или в текущем запросе выполнялась запись – основная БД.
+
+    :return:
+    """
+
+    if not DATABASE_REPLICAS or _pinned.get():
+        return "default"
+
+    return random.choice(DATABASE_REPLICAS)
+
+
+def reset_pinning() -> None:
+    """
+    Сброс привязки чтения к основной БД (в начале обработки запроса или задачи).
+
+    :return:
+    """
+
+    _pinned.set(False)
+
+
+class ReplicaRouter:
+    """
+    Маршрутизатор БД: запись и миграции выполняются в основной БД,
+    чтение из реплик – только для явно выбранных запросов (`get_read_database`).
+
+    https://docs.djangoproject.com/en/4.0/topics/db/multi-db/#database-routers
+    """
+
+    def db_for_read(  # pylint: disable=unused-argument
+        self, model: type[Model], **hints: Any
+    ) -> Optional[str]:
+        return None
+
+    def db_for_write(  # pylint: disable=unused-argument
+        self, model: type[Model], **hints: Any
+    ) -> Optional[str]:
+        _pinned.set(True)
+
+        return "default"
+
+    def allow_relation(  # pylint: disable=unused-argument
+        self, obj1: Model, obj2: Model, **hints: Any
+    ) -> bool:
+        # реплики содержат те же данные, что и основная БД
+        return True
+
+    def allow_migrate(  # pylint: disable=unused-argument
+        self, db: str, app_label: str, model_name: Optional[str] = None, **hints: Any
+    ) -> bool:
+        return db == "default"
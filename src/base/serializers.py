@@ -0,0 +1,97 @@
+"""
+Базовые классы сериализаторов.
+"""
+from typing import Any, Collection, Optional
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+
+class SparseFieldsMixin:
+    """
+    Ограничение набора полей сериализатора модели (параметр запроса `fields`).
+
+    Поля передаются аргументом `fields` списком путей: `name`, `country.name`.
+    Вложенный сериализатор без указания его полей (`country`) выводится полностью.
+    """
+
+    def __init__(
+        self, *args: Any, fields: Optional[Collection[str]] = None, **kwargs: Any
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            restrict_fields(self, fields)
+
+    @classmethod
+    def get_only(cls, fields: Optional[Collection[str]]) -> Optional[list[str]]:
+        """
+        Получение полей модели (в формате `QuerySet.only`), необходимых для вывода полей.
+
+        :param fields: Поля сериализатора (None – все поля)
+        :return: Поля модели или None, если выводятся все поля
+        """
+
+        if fields is None:
+            return None
+
+        return get_model_fields(cls(fields=fields))
+
+
+def restrict_fields(
+    serializer: serializers.Serializer, paths: Collection[str], prefix: str = ""
+) -> None:
+    """
+    Удаление из сериализатора полей, не указанных в списке.
+
+    :param serializer: Сериализатор
+    :param paths: Пути полей (`name`, `country.name`)
+    :param prefix: Путь вложенного сериализатора (для сообщений об ошибках)
+    :return:
+    """
+
+    selected: dict[str, list[str]] = {}
+    for path in paths:
+        name, _, nested = path.partition(".")
+        selected.setdefault(name, [])
+        if nested:
+            selected[name].append(nested)
+
+    if unknown := [prefix + name for name in selected if name not in serializer.fields]:
+        raise ValidationError({"fields": f"Неизвестные поля: {', '.join(unknown)}."})
+
+    for name in list(serializer.fields):
+        if name not in selected:
+            serializer.fields.pop(name)
+        elif selected[name]:
+            field = serializer.fields[name]
+            if not isinstance(field, serializers.Serializer):
+                raise ValidationError(
+                    {"fields": f"Поле {prefix}{name} не содержит вложенных полей."}
+                )
+            restrict_fields(field, selected[name], f"{prefix}{name}.")
+
+
+def get_model_fields(serializer: serializers.ModelSerializer) -> list[str]:
+    """
+    Получение полей модели, необходимых сериализатору, включая поля вложенных
+    сериализаторов связанных моделей (`country__name`).
+    Вычисляемые атрибуты (например, аннотации выборки) не учитываются.
+
+    :param serializer: Сериализатор модели
+    :return:
+    """
+
+    model = serializer.Meta.model
+    names = []
+    for field in serializer.fields.values():
+        try:
+            model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            continue
+
+        names.append(field.source)
+        if isinstance(field, serializers.ModelSerializer):
+            names.extend(f"{field.source}__{name}" for name in get_model_fields(field))
+
+    return names
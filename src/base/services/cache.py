@@ -0,0 +1,22 @@
+"""
+Функции для работы с кэшем.
+"""
+
+from typing import Any
+
+from django.core.cache import caches
+
+
+def get_redis_client(alias: str) -> Any:
+    """
+    Получение клиента Redis (`redis.Redis`) для именованного кэша.
+
+    Клиент использует пул соединений и номер базы данных, указанные в настройках кэша,
+    и нужен для операций, не поддерживаемых API кэша Django (сортированные множества, TTL).
+
+    :param alias: Название кэша из настройки `CACHES`
+    :return:
+    """
+
+    # pylint: disable=protected-access
+    return caches[alias]._cache.get_client(write=True)
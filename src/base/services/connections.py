@@ -0,0 +1,64 @@
+"""
+Проверка работоспособности постоянных подключений к БД и учет их использования.
+"""
+import logging
+from typing import Any
+
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.signals import connection_created
+
+from base.services.metrics import (
+    DB_CONNECTIONS_DISCARDED,
+    DB_CONNECTIONS_OPENED,
+    DB_CONNECTIONS_REUSED,
+)
+
+logger = logging.getLogger()
+
+
+def check_connections(**kwargs: Any) -> None:  # pylint: disable=unused-argument
+    """
+    Проверка открытых постоянных подключений перед обработкой запроса (задачи):
+    неработоспособные подключения (например, закрытые сервером или PgBouncer) закрываются,
+    и при первом обращении к БД открывается новое подключение.
+
+    :param kwargs: Параметры сигнала
+    :return:
+    """
+
+    for connection in connections.all():
+        if connection.connection is None:
+            continue
+        if connection.is_usable():
+            DB_CONNECTIONS_REUSED.labels(connection.alias).inc()
+        else:
+            logger.warning("Discarding unusable connection to '%s'.", connection.alias)
+            DB_CONNECTIONS_DISCARDED.labels(connection.alias).inc()
+            connection.close()
+
+
+def count_connection(
+    connection: BaseDatabaseWrapper, **kwargs: Any  # pylint: disable=unused-argument
+) -> None:
+    """
+    Учет открытого подключения к БД.
+
+    :param connection: Подключение
+    :param kwargs: Параметры сигнала
+    :return:
+    """
+
+    DB_CONNECTIONS_OPENED.labels(connection.alias).inc()
+
+
+def connect_signals() -> None:
+    """
+    Подключение обработчиков сигналов.
+
+    :return:
+    """
+
+    request_started.connect(check_connections, dispatch_uid="check_connections")
+    connection_created.connect(count_connection, dispatch_uid="count_connection")
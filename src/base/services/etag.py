@@ -0,0 +1,35 @@
+"""
+Функции для поддержки условных запросов (ETag).
+"""
+
+import hashlib
+from typing import Optional
+
+from django.db.models import Count, Max, QuerySet
+
+
+def get_queryset_etag(queryset: QuerySet, *timestamp_fields: str) -> Optional[str]:
+    """
+    Формирование ETag для выборки по количеству записей и времени их последнего обновления.
+
+    Значения вычисляются одним агрегирующим запросом, без загрузки самих записей.
+
+    :param queryset: Выборка записей, возвращаемых в ответе
+    :param timestamp_fields: Дополнительные поля с временем обновления (например, связанных записей)
+    :return:
+    """
+
+    fields = ("updated_at", *timestamp_fields)
+    aggregates = {f"max_{index}": Max(field) for index, field in enumerate(fields)}
+    data = queryset.order_by().aggregate(count=Count("pk"), **aggregates)
+    if not data["count"]:
+        # для пустой выборки ETag не формируется,
+        # чтобы представление могло выполнить поиск во внешнем API
+        return None
+
+    version = ":".join(
+        [str(data["count"])]
+        + [data[key].isoformat() if data[key] else "" for key in aggregates]
+    )
+
+    return f'"{hashlib.md5(version.encode()).hexdigest()}"'
@@ -0,0 +1,30 @@
+"""
+Функции для выборки из БД только необходимых полей.
+"""
+from typing import Optional
+
+from django.db.models import QuerySet
+
+
+def restrict_queryset(queryset: QuerySet, only: Optional[list[str]]) -> QuerySet:
+    """
+    Ограничение выборки полями модели и связанных моделей (`name`, `country__name`).
+
+    Связанные модели присоединяются к запросу только при выборке их полей,
+    предварительная загрузка связанных записей (`prefetch_related`) заменяется соединением.
+
+    :param queryset: Выборка
+    :param only: Поля модели (None – выборка не изменяется, пустой список – только
+        первичный ключ, например, если выводятся только вычисляемые атрибуты)
+    :return:
+    """
+
+    if only is None:
+        return queryset
+
+    queryset = queryset.select_related(None).prefetch_related(None)
+    if related := {path.split("__", 1)[0] for path in only if "__" in path}:
+        queryset = queryset.select_related(*related)
+
+    # `only()` без полей не ограничивает выборку
+    return queryset.only(*(only or ["pk"]))
@@ -0,0 +1,309 @@
+"""
+Сбор показателей производительности запросов (Prometheus и заголовок Server-Timing).
+"""
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from functools import wraps
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+from django.db import connections
+from prometheus_client import Counter, Histogram
+
+FuncT = TypeVar("FuncT", bound=Callable[..., Any])
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Время обработки HTTP-запроса",
+    ["method", "view", "status"],
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Количество запросов к БД за HTTP-запрос",
+    ["view"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds",
+    "Время выполнения запросов к БД за HTTP-запрос",
+    ["view"],
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Количество обращений к кэшу",
+    ["cache", "result"],
+)
+UPSTREAM_DURATION = Histogram(
+    "upstream_request_duration_seconds",
+    "Время выполнения запроса к внешнему API",
+    ["client"],
+)
+SECTION_DURATION = Histogram(
+    "section_duration_seconds",
+    "Время выполнения этапа обработки запроса (например, сериализации)",
+    ["section"],
+)
+DB_CONNECTIONS_OPENED = Counter(
+    "db_connections_opened_total",
+    "Количество открытых подключений к БД",
+    ["alias"],
+)
+DB_CONNECTIONS_REUSED = Counter(
+    "db_connections_reused_total",
+    "Количество запросов (задач), использовавших ранее открытое подключение к БД",
+    ["alias"],
+)
+DB_CONNECTIONS_DISCARDED = Counter(
+    "db_connections_discarded_total",
+    "Количество закрытых неработоспособных постоянных подключений к БД",
+    ["alias"],
+)
+
+
+class RequestMetrics:
+    """
+    Показатели производительности одного HTTP-запроса.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        # название кэша -> [попадания, промахи]
+        self.cache: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+        # название клиента -> [количество запросов, время]
+        self.upstream: dict[str, list[float]] = defaultdict(lambda: [0, 0.0])
+        # название этапа -> время
+        self.sections: dict[str, float] = defaultdict(float)
+
+    def add_db_query(self, seconds: float) -> None:
+        """
+        Учет запроса к БД.
+
+        :param seconds: Время выполнения запроса
+        :return:
+        """
+
+        with self.lock:
+            self.db_queries += 1
+            self.db_seconds += seconds
+
+    def build_server_timing(self, total: float) -> str:
+        """
+        Формирование значения заголовка Server-Timing.
+
+        :param total: Общее время обработки запроса (в секундах)
+        :return:
+        """
+
+        with self.lock:
+            items = [
+                f'db;dur={self.db_seconds * 1000:.1f};desc="{self.db_queries} queries"'
+            ]
+            items.extend(
+                f'cache-{name};desc="hit={hits} miss={misses}"'
+                for name, (hits, misses) in self.cache.items()
+            )
+            items.extend(
+                f'upstream-{name};dur={seconds * 1000:.1f};desc="{int(calls)} calls"'
+                for name, (calls, seconds) in self.upstream.items()
+            )
+            items.extend(
+                f"{name};dur={seconds * 1000:.1f}"
+                for name, seconds in self.sections.items()
+            )
+        items.append(f"total;dur={total * 1000:.1f}")
+
+        return ", ".join(items)
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar(
+    "request_metrics", default=None
+)
+
+
+def start_request() -> RequestMetrics:
+    """
+    Начало сбора показателей для текущего запроса.
+
+    :return:
+    """
+
+    metrics = RequestMetrics()
+    _current.set(metrics)
+
+    return metrics
+
+
+class QueryCounter:
+    """
+    Обертка выполнения запросов к БД для учета их количества и времени в показателях запроса.
+    https://docs.djangoproject.com/en/4.0/topics/db/instrumentation/
+    """
+
+    def __init__(self, metrics: RequestMetrics) -> None:
+        self.metrics = metrics
+
+    def __call__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self, execute: Callable, sql: str, params: Any, many: bool, context: dict
+    ) -> Any:
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.metrics.add_db_query(time.perf_counter() - started)
+
+
+@contextmanager
+def count_queries(metrics: RequestMetrics) -> Iterator[None]:
+    """
+    Учет запросов к БД текущего потока в показателях запроса.
+
+    Подключения к БД у каждого потока свои, поэтому обертка устанавливается
+    в каждом потоке, выполняющем запросы к БД (см. `propagate`).
+    Подключения, на которых показатели запроса уже учитываются, не изменяются.
+
+    :param metrics: Показатели запроса
+    :return:
+    """
+
+    counter = QueryCounter(metrics)
+    wrapped = [
+        connection
+        for connection in connections.all()
+        if not any(
+            isinstance(wrapper, QueryCounter) and wrapper.metrics is metrics
+            for wrapper in connection.execute_wrappers
+        )
+    ]
+    for connection in wrapped:
+        connection.execute_wrappers.append(counter)
+    try:
+        yield
+    finally:
+        for connection in wrapped:
+            connection.execute_wrappers.remove(counter)
+
+
+def finish_request() -> None:
+    """
+    Завершение сбора показателей для текущего запроса.
+
+    :return:
+    """
+
+    _current.set(None)
+
+
+def get_request_metrics() -> Optional[RequestMetrics]:
+    """
+    Получение показателей текущего запроса (если сбор показателей включен).
+
+    :return:
+    """
+
+    return _current.get()
+
+
+def record_cache(cache: str, hits: int, misses: int) -> None:
+    """
+    Учет обращений к кэшу.
+
+    :param cache: Название кэша
+    :param hits: Количество найденных в кэше значений
+    :param misses: Количество отсутствующих в кэше значений
+    :return:
+    """
+
+    if hits:
+        CACHE_REQUESTS.labels(cache, "hit").inc(hits)
+    if misses:
+        CACHE_REQUESTS.labels(cache, "miss").inc(misses)
+
+    if metrics := _current.get():
+        with metrics.lock:
+            metrics.cache[cache][0] += hits
+            metrics.cache[cache][1] += misses
+
+
+@contextmanager
+def track(section: str) -> Iterator[None]:
+    """
+    Замер времени выполнения этапа обработки запроса.
+
+    :param section: Название этапа
+    :return:
+    """
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        SECTION_DURATION.labels(section).observe(seconds)
+        if metrics := _current.get():
+            with metrics.lock:
+                metrics.sections[section] += seconds
+
+
+def track_upstream(func: FuncT) -> FuncT:
+    """
+    Декоратор для замера времени запросов клиентов внешних API (метод `_request`).
+
+    :param func: Метод клиента
+    :return:
+    """
+
+    @wraps(func)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        client = self.__class__.__name__
+        started = time.perf_counter()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - started
+            UPSTREAM_DURATION.labels(client).observe(seconds)
+            if metrics := _current.get():
+                with metrics.lock:
+                    metrics.upstream[client][0] += 1
+                    metrics.upstream[client][1] += seconds
+
+    return wrapper  # type: ignore
+
+
+def propagate(func: FuncT) -> FuncT:
+    """
+    Передача контекста текущего запроса в функцию, выполняемую в другом потоке
+    (например, в `ThreadPoolExecutor`), для учета ее показателей в текущем запросе,
+    включая запросы к БД из подключений этого потока.
+
+    :param func: Функция
+    :return:
+    """
+
+    context = copy_context()
+
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return context.copy().run(_call_counted, func, *args, **kwargs)
+
+    return wrapper  # type: ignore
+
+
+def _call_counted(func: Callable, *args: Any, **kwargs: Any) -> Any:
+    """
+    Вызов функции с учетом ее запросов к БД в показателях текущего запроса.
+
+    :param func: Функция
+    :param args: Позиционные аргументы функции
+    :param kwargs: Именованные аргументы функции
+    :return:
+    """
+
+    if (metrics := _current.get()) is None:
+        return func(*args, **kwargs)
+
+    with count_queries(metrics):
+        return func(*args, **kwargs)
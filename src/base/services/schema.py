@@ -0,0 +1,95 @@
+"""
+Хранение схемы OpenAPI в памяти процесса.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Optional
+
+from drf_yasg.app_settings import swagger_settings
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml, yaml_sane_dump
+
+from app.settings import OPENAPI_SCHEMA_FILE
+
+logger = logging.getLogger()
+
+# форматы схемы: JSON и YAML
+FORMAT_JSON = ".json"
+FORMAT_YAML = ".yaml"
+
+_lock = threading.Lock()
+# формат -> (содержимое, ETag)
+_documents: dict[str, tuple[bytes, str]] = {}
+
+
+def get_schema(format_: str) -> tuple[bytes, str]:
+    """
+    Получение схемы OpenAPI и ее ETag.
+
+    Схема формируется один раз за время работы процесса: загружается из файла,
+    сформированного при развертывании (`OPENAPI_SCHEMA_FILE`), или, если файл не задан,
+    генерируется по представлениям приложения.
+
+    :param format_: Формат схемы (`.json` или `.yaml`)
+    :return:
+    """
+
+    if not _documents:
+        with _lock:
+            if not _documents:
+                _documents.update(_build_documents())
+
+    return _documents[format_]
+
+
+def _build_documents() -> dict[str, tuple[bytes, str]]:
+    """
+    Формирование схемы OpenAPI во всех форматах.
+
+    :return:
+    """
+
+    if content := _read_schema_file():
+        spec = json.loads(content)
+        documents = {
+            FORMAT_JSON: content,
+            FORMAT_YAML: yaml_sane_dump(spec, binary=True),
+        }
+    else:
+        generator = swagger_settings.DEFAULT_GENERATOR_CLASS(
+            info=swagger_settings.DEFAULT_INFO
+        )
+        # схема формируется без учета запроса (адреса сервера и прав пользователя)
+        schema = generator.get_schema(request=None, public=True)
+        documents = {
+            FORMAT_JSON: OpenAPICodecJson(validators=[]).encode(schema),
+            FORMAT_YAML: OpenAPICodecYaml(validators=[]).encode(schema),
+        }
+    logger.info("OpenAPI schema loaded.")
+
+    return {
+        format_: (content, hashlib.sha1(content).hexdigest())
+        for format_, content in documents.items()
+    }
+
+
+def _read_schema_file() -> Optional[bytes]:
+    """
+    Чтение схемы OpenAPI из файла (в формате JSON).
+
+    :return:
+    """
+
+    if not OPENAPI_SCHEMA_FILE:
+        return None
+    if not os.path.exists(OPENAPI_SCHEMA_FILE):
+        logger.warning(
+            "OpenAPI schema file '%s' not found, generating schema.",
+            OPENAPI_SCHEMA_FILE,
+        )
+        return None
+
+    with open(OPENAPI_SCHEMA_FILE, "rb") as file:
+        return file.read()
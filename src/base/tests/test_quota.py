@@ -0,0 +1,121 @@
+from unittest import mock
+from uuid import uuid4
+
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from django.test import SimpleTestCase
+from redis.exceptions import RedisError
+
+from base.clients import quota
+from base.clients.quota import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    QuotaGovernor,
+    set_priority,
+)
+from base.services.cache import get_redis_client
+
+
+@mock.patch.multiple(
+    quota,
+    UPSTREAM_QUOTA_BACKGROUND_RESERVE=0.5,
+    UPSTREAM_QUOTA_INTERACTIVE_WAIT=1,
+    UPSTREAM_QUOTA_BACKGROUND_WAIT=1,
+)
+class QuotaGovernorTest(SimpleTestCase):
+    """
+    Тесты ограничения частоты запросов к внешнему сервису (выполняются в тестовом Redis).
+    """
+
+    def setUp(self) -> None:
+        if not isinstance(caches["default"], RedisCache):
+            self.skipTest("Redis cache is not configured.")
+
+        self.client = get_redis_client("default")
+        try:
+            self.client.ping()
+        except RedisError:
+            self.skipTest("Redis is not available.")
+
+        self.upstream = f"test_{uuid4().hex}"
+        self.addCleanup(
+            self.client.delete,
+            f"quota:{self.upstream}",
+            f"quota:{self.upstream}:blocked",
+        )
+        set_priority(PRIORITY_INTERACTIVE)
+        self.addCleanup(set_priority, PRIORITY_INTERACTIVE)
+
+    def governor(self, rate: float, burst: int) -> QuotaGovernor:
+        return QuotaGovernor(self.upstream, rate, burst)
+
+    def test_bucket_allows_burst(self) -> None:
+        """
+        Корзина разрешает не больше `burst` запросов подряд.
+        """
+
+        governor = self.governor(rate=0.001, burst=3)
+
+        self.assertEqual(
+            [governor.acquire() for _ in range(4)], [True, True, True, False]
+        )
+
+    def test_bucket_refills(self) -> None:
+        """
+        Запрос ожидает пополнения корзины, если ожидание не превышает допустимое.
+        """
+
+        governor = self.governor(rate=100, burst=1)
+
+        self.assertTrue(governor.acquire())
+        with mock.patch.object(quota.time, "sleep", wraps=quota.time.sleep) as sleep:
+            self.assertTrue(governor.acquire())
+        sleep.assert_called()
+
+    def test_unlimited_rate(self) -> None:
+        """
+        Нулевая частота не ограничивает запросы и не обращается к Redis.
+        """
+
+        governor = self.governor(rate=0, burst=1)
+
+        self.assertTrue(all(governor.acquire() for _ in range(10)))
+        self.assertFalse(self.client.exists(governor.bucket_key))
+
+    def test_background_reserve(self) -> None:
+        """
+        Фоновые запросы не используют резерв корзины, а интерактивные получают маркеры из резерва.
+        """
+
+        governor = self.governor(rate=0.001, burst=4)
+
+        set_priority(PRIORITY_BACKGROUND)
+        self.assertEqual([governor.acquire() for _ in range(3)], [True, True, False])
+
+        set_priority(PRIORITY_INTERACTIVE)
+        self.assertEqual([governor.acquire() for _ in range(3)], [True, True, False])
+
+    def test_block(self) -> None:
+        """
+        Блокировка (`Retry-After`) запрещает запросы при наличии маркеров в корзине.
+        """
+
+        governor = self.governor(rate=100, burst=10)
+
+        governor.block(30)
+
+        self.assertFalse(governor.acquire())
+        self.assertGreater(self.client.pttl(governor.blocked_key), 29000)
+        self.assertFalse(self.client.exists(governor.bucket_key))
+
+    def test_short_block_waits(self) -> None:
+        """
+        Запрос ожидает окончания блокировки, если она короче допустимого ожидания.
+        """
+
+        governor = self.governor(rate=100, burst=10)
+
+        governor.block(0.05)
+
+        self.assertTrue(governor.acquire())
+        self.assertFalse(self.client.exists(governor.blocked_key))
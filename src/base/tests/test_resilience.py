@@ -0,0 +1,201 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from base.clients import resilience
+from base.clients.resilience import (
+    LATENCY_MIN_SAMPLES,
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    AdaptiveTimeout,
+    CircuitBreaker,
+)
+
+
+class ClockMixin:
+    """
+    Управляемые часы (`time.monotonic`) модуля защиты внешних сервисов.
+    """
+
+    def start_clock(self) -> None:
+        self.now = 1000.0
+        patcher = mock.patch.object(resilience, "time")
+        clock = patcher.start()
+        clock.monotonic.side_effect = lambda: self.now
+        self.addCleanup(patcher.stop)  # type: ignore
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@mock.patch.multiple(
+    resilience,
+    UPSTREAM_BREAKER_WINDOW=60,
+    UPSTREAM_BREAKER_MIN_CALLS=4,
+    UPSTREAM_BREAKER_FAILURE_RATE=0.5,
+    UPSTREAM_BREAKER_OPEN_SECONDS=30,
+)
+class CircuitBreakerTest(ClockMixin, SimpleTestCase):
+    """
+    Тесты переходов состояний автоматического выключателя.
+    """
+
+    def setUp(self) -> None:
+        self.start_clock()
+        self.breaker = CircuitBreaker()
+
+    def open_breaker(self) -> None:
+        for success in (True, True, False, False):
+            self.breaker.record(success)
+
+    def test_opens_on_failure_rate(self) -> None:
+        """
+        Выключатель открывается, когда доля неудачных запросов достигает порога.
+        """
+
+        self.open_breaker()
+
+        self.assertEqual(self.breaker.state, STATE_OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_stays_closed_below_min_calls(self) -> None:
+        """
+        При количестве запросов меньше минимального выключатель не открывается.
+        """
+
+        for _ in range(3):
+            self.breaker.record(False)
+
+        self.assertEqual(self.breaker.state, STATE_CLOSED)
+        self.assertTrue(self.breaker.allow())
+
+    def test_old_calls_leave_window(self) -> None:
+        """
+        Запросы старше окна не учитываются в доле неудачных запросов.
+        """
+
+        for _ in range(3):
+            self.breaker.record(False)
+        self.advance(61)
+        for _ in range(3):
+            self.breaker.record(True)
+
+        self.assertEqual(self.breaker.state, STATE_CLOSED)
+
+    def test_half_open_allows_single_probe(self) -> None:
+        """
+        После времени открытия разрешается только один пробный запрос.
+        """
+
+        self.open_breaker()
+        self.advance(29)
+        self.assertFalse(self.breaker.allow())
+
+        self.advance(1)
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.state, STATE_HALF_OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_successful_probe_closes(self) -> None:
+        """
+        Успешный пробный запрос закрывает выключатель.
+        """
+
+        self.open_breaker()
+        self.advance(30)
+        self.assertTrue(self.breaker.allow())
+
+        self.breaker.record(True)
+
+        self.assertEqual(self.breaker.state, STATE_CLOSED)
+        self.assertTrue(self.breaker.allow())
+        self.assertTrue(self.breaker.allow())
+
+    def test_failed_probe_reopens(self) -> None:
+        """
+        Неудачный пробный запрос снова открывает выключатель на время открытия.
+        """
+
+        self.open_breaker()
+        self.advance(30)
+        self.assertTrue(self.breaker.allow())
+
+        self.breaker.record(False)
+
+        self.assertEqual(self.breaker.state, STATE_OPEN)
+        self.advance(29)
+        self.assertFalse(self.breaker.allow())
+        self.advance(1)
+        self.assertTrue(self.breaker.allow())
+
+    def test_release_allows_next_probe(self) -> None:
+        """
+        Отказ от пробного запроса позволяет выполнить пробный запрос следующему вызову.
+        """
+
+        self.open_breaker()
+        self.advance(30)
+        self.assertTrue(self.breaker.allow())
+
+        self.breaker.release()
+
+        self.assertEqual(self.breaker.state, STATE_HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+
+
+@mock.patch.multiple(
+    resilience,
+    REQUESTS_TIMEOUT=10,
+    UPSTREAM_TIMEOUT_MIN=0.5,
+    UPSTREAM_TIMEOUT_MULTIPLIER=3,
+)
+class AdaptiveTimeoutTest(SimpleTestCase):
+    """
+    Тесты расчета адаптивного таймаута.
+    """
+
+    def setUp(self) -> None:
+        self.timeout = AdaptiveTimeout()
+
+    def test_default_until_enough_samples(self) -> None:
+        """
+        До накопления минимального количества значений используется общий таймаут.
+        """
+
+        for _ in range(LATENCY_MIN_SAMPLES - 1):
+            self.timeout.record(0.2)
+
+        self.assertEqual(self.timeout.get(), 10)
+
+    def test_percentile_with_multiplier(self) -> None:
+        """
+        Таймаут равен 99-му процентилю времени ответа, умноженному на множитель.
+        """
+
+        for _ in range(99):
+            self.timeout.record(0.2)
+        self.timeout.record(5.0)
+
+        self.assertAlmostEqual(self.timeout.get(), 0.6)
+
+    def test_clamped_to_minimum(self) -> None:
+        """
+        Таймаут не меньше минимального значения.
+        """
+
+        for _ in range(LATENCY_MIN_SAMPLES):
+            self.timeout.record(0.01)
+
+        self.assertEqual(self.timeout.get(), 0.5)
+
+    def test_clamped_to_maximum(self) -> None:
+        """
+        Таймаут не больше общего таймаута запросов.
+        """
+
+        for _ in range(LATENCY_MIN_SAMPLES):
+            self.timeout.record(8.0)
+
+        self.assertEqual(self.timeout.get(), 10)
@@ -0,0 +1,84 @@
+"""Представления Django"""
+import hmac
+
+from django.http import HttpRequest, HttpResponse, HttpResponseForbidden
+from django.views.decorators.http import condition, require_safe
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    generate_latest,
+    multiprocess,
+)
+
+from app.settings import METRICS_TOKEN, PROMETHEUS_MULTIPROC_DIR
+from base.services.schema import FORMAT_YAML, get_schema
+
+
+@require_safe
+def get_metrics(request: HttpRequest) -> HttpResponse:
+    """
+    Получение показателей производительности в формате Prometheus.
+
+    Доступ только с токеном `METRICS_TOKEN` (заголовок `Authorization: Bearer <токен>`).
+    В режиме нескольких процессов (`PROMETHEUS_MULTIPROC_DIR`) показатели
+    всех процессов объединяются.
+
+    :param HttpRequest request: Объект запроса
+    :return:
+    """
+
+    if not METRICS_TOKEN or not hmac.compare_digest(
+        request.headers.get("Authorization", ""), f"Bearer {METRICS_TOKEN}"
+    ):
+        return HttpResponseForbidden()
+
+    registry = REGISTRY
+    if PROMETHEUS_MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(  # type: ignore
+            registry, path=PROMETHEUS_MULTIPROC_DIR
+        )
+
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+
+def _get_schema_etag(  # pylint: disable=W0613
+    request: HttpRequest, format: str  # pylint: disable=W0622
+) -> str:
+    """
+    Получение ETag схемы OpenAPI.
+
+    :param HttpRequest request: Объект запроса
+    :param str format: Формат схемы (`.json` или `.yaml`)
+    :return:
+    """
+
+    return get_schema(format)[1]
+
+
+@require_safe
+@condition(etag_func=_get_schema_etag)
+def get_openapi_schema(
+    request: HttpRequest, format: str  # pylint: disable=W0613,W0622
+) -> HttpResponse:
+    """
+    Получение схемы OpenAPI, сформированной один раз за время работы процесса.
+
+    :param HttpRequest request: Объект запроса
+    :param str format: Формат схемы (`.json` или `.yaml`)
+    :return:
+    """
+
+    content, _ = get_schema(format)
+    # схема уже сериализована, поэтому JsonResponse не используется
+    response = HttpResponse(content)
+    response["Content-Type"] = (
+        "application/yaml"
+        if format == FORMAT_YAML
+        else "application/json; charset=utf-8"
+    )
+    # схема меняется только при развертывании: клиенты проверяют ее актуальность по ETag
+    response["Cache-Control"] = "no-cache"
+
+    return response
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from geo.models import Country, City
+from base.admin import PerformanceModelAdmin
+from geo.models import Country, City, CurrencyRates
 
 
 @admin.register(Country)
@@ -25,7 +26,7 @@ class CountryAdmin(admin.ModelAdmin):
 
 
 @admin.register(City)
-class CityAdmin(admin.ModelAdmin):
+class CityAdmin(PerformanceModelAdmin):
     list_display = (
         "name",
         "country",
@@ -33,10 +34,22 @@ class CityAdmin(admin.ModelAdmin):
         "created_at",
         "updated_at",
     )
+    list_select_related = ("country",)
 
     search_fields = ("name", "region")
+    search_vector_fields = ("name", "region")
 
-    list_filter = (
+    # фильтрация по дате обновления использует индекс geo_city_updated_at_idx
+    date_hierarchy = "updated_at"
+
+
+@admin.register(CurrencyRates)
+class CurrencyRatesAdmin(admin.ModelAdmin):
+    list_display = (
+        "base",
+        "date",
         "created_at",
         "updated_at",
     )
+
+    list_filter = ("base", "date")
@@ -5,3 +5,9 @@ class GeoConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "geo"
     verbose_name = "Города и страны"
+
+    def ready(self) -> None:
+        # pylint: disable=import-outside-toplevel
+        from base.services.connections import connect_signals
+
+        connect_signals()
@@ -0,0 +1,47 @@
+"""
+Функции для взаимодействия с внешним сервисом-провайдером данных о курсах валют.
+"""
+from typing import Optional
+
+from app.settings import (
+    API_RATE_BURST_APILAYER,
+    API_RATE_LIMIT_APILAYER,
+    API_BASE_URL_APILAYER,
+    API_KEY_APILAYER,
+)
+from base.clients.base import BaseClient
+from base.services.metrics import track_upstream
+from geo.clients.shemas import CurrencyRatesDTO
+
+
+class CurrencyClient(BaseClient):
+    """
+    Реализация функций для взаимодействия с внешним сервисом-провайдером данных о курсах валют.
+    """
+
+    def get_base_url(self) -> str:
+        return f"{API_BASE_URL_APILAYER}/exchangerates_data"
+
+    def get_rate_limit(self) -> tuple[float, int]:
+        return API_RATE_LIMIT_APILAYER, API_RATE_BURST_APILAYER
+
+    @track_upstream
+    def _request(self, endpoint: str) -> Optional[dict]:
+        return self._get(endpoint, headers={"apikey": API_KEY_APILAYER})
+
+    def get_rates(self, base: str) -> Optional[CurrencyRatesDTO]:
+        """
+        Получение актуальных курсов валют относительно базовой валюты.
+
+        :param base: Код базовой валюты
+        :return:
+        """
+
+        if response := self._request(f"{self.get_base_url()}/latest?base={base}"):
+            return CurrencyRatesDTO(
+                base=response["base"],
+                date=response["date"],
+                rates=response["rates"],
+            )
+
+        return None
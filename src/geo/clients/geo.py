@@ -1,14 +1,20 @@
 """
 Функции для взаимодействия с внешним сервисом-провайдером данных о странах.
 """
-from http import HTTPStatus
 from typing import Optional
 
-import httpx
-
-from app.settings import API_KEY_APILAYER, REQUESTS_TIMEOUT
+from app.settings import (
+    API_RATE_BURST_APILAYER,
+    API_RATE_LIMIT_APILAYER,
+    API_BASE_URL_APILAYER,
+    API_KEY_APILAYER,
+    GEO_RESPONSE_CACHE_NEGATIVE_TTL,
+    GEO_RESPONSE_CACHE_TTL,
+)
 from base.clients.base import BaseClient
-from geo.clients.shemas import CountryDTO, CurrencyInfoDTO, CityDTO, CountryShortDTO
+from base.clients.shemas import parse_list
+from base.services.metrics import track_upstream
+from geo.clients.shemas import CountryDTO, CityDTO
 
 
 class GeoClient(BaseClient):
@@ -17,18 +23,17 @@ class GeoClient(BaseClient):
     """
 
     def get_base_url(self) -> str:
-        return "https://api.apilayer.com/geo"
+        return f"{API_BASE_URL_APILAYER}/geo"
 
-    def _request(self, endpoint: str) -> Optional[dict]:
-        with httpx.Client(timeout=REQUESTS_TIMEOUT) as client:
-            # формирование заголовков запроса
-            headers = {"apikey": API_KEY_APILAYER}
-            # получение ответа
-            response = client.get(endpoint, headers=headers)
-            if response.status_code == HTTPStatus.OK:
-                return response.json()
+    def get_rate_limit(self) -> tuple[float, int]:
+        return API_RATE_LIMIT_APILAYER, API_RATE_BURST_APILAYER
 
-            return None
+    def get_cache_ttl(self) -> tuple[int, int]:
+        return GEO_RESPONSE_CACHE_TTL, GEO_RESPONSE_CACHE_NEGATIVE_TTL
+
+    @track_upstream
+    def _request(self, endpoint: str) -> Optional[dict]:
+        return self._get(endpoint, headers={"apikey": API_KEY_APILAYER})
 
     def get_countries(self, name: str) -> Optional[list[CountryDTO]]:
         """
@@ -39,32 +44,7 @@ class GeoClient(BaseClient):
         """
 
         if response := self._request(f"{self.get_base_url()}/country/name/{name}"):
-            items = []
-            for item in response:
-                items.append(
-                    CountryDTO(
-                        name=item["name"],
-                        alpha2code=item["alpha2code"],
-                        alpha3code=item["alpha3code"],
-                        capital=item["capital"],
-                        region=item["region"],
-                        subregion=item["subregion"],
-                        population=item["population"],
-                        latitude=item["latitude"],
-                        longitude=item["longitude"],
-                        demonym=item["demonym"],
-                        area=item["area"],
-                        numeric_code=item["numeric_code"],
-                        flag=item["flag"],
-                        currencies={
-                            CurrencyInfoDTO(code=currency["code"])
-                            for currency in item["currencies"]
-                        },
-                        languages=item["languages"],
-                    )
-                )
-
-            return items
+            return parse_list(CountryDTO, response)
 
         return None
 
@@ -77,27 +57,7 @@ class GeoClient(BaseClient):
         """
 
         if response := self._request(f"{self.get_base_url()}/country/code/{code}"):
-            item = response[0]
-            return CountryDTO(
-                name=item["name"],
-                alpha2code=item["alpha2code"],
-                alpha3code=item["alpha3code"],
-                capital=item["capital"],
-                region=item["region"],
-                subregion=item["subregion"],
-                population=item["population"],
-                latitude=item["latitude"],
-                longitude=item["longitude"],
-                demonym=item["demonym"],
-                area=item["area"],
-                numeric_code=item["numeric_code"],
-                flag=item["flag"],
-                currencies={
-                    CurrencyInfoDTO(code=currency["code"])
-                    for currency in item["currencies"]
-                },
-                languages=item["languages"],
-            )
+            return CountryDTO.parse_obj(response[0])
 
         return None
 
@@ -110,21 +70,6 @@ class GeoClient(BaseClient):
         """
 
         if response := self._request(f"{self.get_base_url()}/city/name/{name}"):
-            items = []
-            for item in response:
-                items.append(
-                    CityDTO(
-                        name=item["name"],
-                        state_or_region=item["state_or_region"],
-                        country=CountryShortDTO(
-                            name=item["country"]["name"],
-                            alpha2code=item["country"]["code"],
-                        ),
-                        latitude=item["latitude"],
-                        longitude=item["longitude"],
-                    )
-                )
-
-            return items
+            return parse_list(CityDTO, response)
 
         return None
@@ -1,9 +1,9 @@
 """
 Описание моделей данных (DTO).
 """
-from typing import Optional
+from typing import Any, Optional
 
-from pydantic import Field, BaseModel
+from pydantic import Field, BaseModel, validator
 
 from base.clients.shemas import HashableBaseModel
 
@@ -54,7 +54,7 @@ class LanguagesInfoDTO(HashableBaseModel):
     native_name: str
 
 
-class CountryShortDTO(BaseModel):
+class CountryShortDTO(HashableBaseModel):
     """
     Модель базовых данных о стране.
 
@@ -117,11 +117,11 @@ class CountryDTO(CountryShortDTO):
     area: float
     numeric_code: str
     flag: str
-    currencies: set[CurrencyInfoDTO]
-    languages: set[LanguagesInfoDTO]
+    currencies: frozenset[CurrencyInfoDTO]
+    languages: frozenset[LanguagesInfoDTO]
 
 
-class CityDTO(BaseModel):
+class CityDTO(HashableBaseModel):
     """
     Модель данных о городе.
 
@@ -145,6 +145,14 @@ class CityDTO(BaseModel):
     latitude: float
     longitude: float
 
+    @validator("country", pre=True)
+    def parse_country(cls, value: Any) -> Any:  # pylint: disable=no-self-argument
+        # внешний сервис передает код страны в поле `code`
+        if isinstance(value, dict) and "code" in value:
+            return {"name": value.get("name"), "alpha2code": value["code"]}
+
+        return value
+
 
 class CurrencyRatesDTO(BaseModel):
     """
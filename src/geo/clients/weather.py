@@ -1,13 +1,17 @@
 """
 Функции для взаимодействия с внешним сервисом-провайдером данных о погоде.
 """
-from http import HTTPStatus
 from typing import Optional
 
-import httpx
-
-from app.settings import REQUESTS_TIMEOUT, API_KEY_OPENWEATHER
+from app.settings import (
+    API_RATE_BURST_OPENWEATHER,
+    API_RATE_LIMIT_OPENWEATHER,
+    API_BASE_URL_OPENWEATHER,
+    API_KEY_OPENWEATHER,
+)
 from base.clients.base import BaseClient
+from base.services.metrics import track_upstream
+from geo.clients.shemas import WeatherInfoDTO
 
 
 class WeatherClient(BaseClient):
@@ -16,16 +20,14 @@ class WeatherClient(BaseClient):
     """
 
     def get_base_url(self) -> str:
-        return "https://api.openweathermap.org/data/2.5/weather"
+        return f"{API_BASE_URL_OPENWEATHER}/data/2.5/weather"
 
-    def _request(self, endpoint: str) -> Optional[dict]:
-        with httpx.Client(timeout=REQUESTS_TIMEOUT) as client:
-            # получение ответа
-            response = client.get(endpoint)
-            if response.status_code == HTTPStatus.OK:
-                return response.json()
+    def get_rate_limit(self) -> tuple[float, int]:
+        return API_RATE_LIMIT_OPENWEATHER, API_RATE_BURST_OPENWEATHER
 
-            return None
+    @track_upstream
+    def _request(self, endpoint: str) -> Optional[dict]:
+        return self._get(endpoint)
 
     def get_weather(self, location: str) -> Optional[dict]:
         """
@@ -38,3 +40,35 @@ class WeatherClient(BaseClient):
         return self._request(
             f"{self.get_base_url()}?units=metric&q={location}&appid={API_KEY_OPENWEATHER}"
         )
+
+    def get_weather_by_coordinates(
+        self, latitude: float, longitude: float
+    ) -> Optional[dict]:
+        """
+        Получение данных о погоде по географическим координатам.
+
+        :param latitude: Широта
+        :param longitude: Долгота
+        :return:
+        """
+
+        return self._request(
+            f"{self.get_base_url()}?units=metric&lat={latitude}&lon={longitude}&appid={API_KEY_OPENWEATHER}"
+        )
+
+    @staticmethod
+    def build_weather_info(data: dict) -> WeatherInfoDTO:
+        """
+        Формирование компактной модели данных о погоде из ответа API.
+
+        :param data: Ответ API
+        :return:
+        """
+
+        return WeatherInfoDTO(
+            temp=data["main"]["temp"],
+            pressure=data["main"]["pressure"],
+            humidity=data["main"]["humidity"],
+            wind_speed=data["wind"]["speed"],
+            description=data["weather"][0]["description"],
+        )
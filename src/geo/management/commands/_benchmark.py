@@ -0,0 +1,387 @@
+import json
+import logging
+import platform
+import statistics
+import time
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from functools import partial
+from itertools import count
+from typing import Any, Callable, Iterator, Optional
+from unittest import mock
+
+import django
+from django.conf import settings
+from django.db import connection
+from pydantic import BaseModel
+
+from geo.clients.geo import GeoClient
+from geo.clients.shemas import LocationDTO
+from geo.clients.weather import WeatherClient
+from geo.management.commands._consumer import EventConsumer
+from geo.models import City, Country
+from geo.serializers import CitySerializer
+from geo.services.city import CityService
+from geo.services.shemas import CountryCityDTO
+from geo.services.weather import WeatherService
+from news.clients.shemas import NewsItemDTO
+from news.services.news import NewsService
+
+logger = logging.getLogger()
+
+# код страны, к которой относятся данные для замеров
+COUNTRY_CODE = "BZ"
+
+# ответ внешнего сервиса с данными о стране
+FAKE_COUNTRY = {
+    "name": "Benchmarkia",
+    "alpha2code": COUNTRY_CODE,
+    "alpha3code": "BZA",
+    "capital": "City0",
+    "region": "Europe",
+    "subregion": "Northern Europe",
+    "population": 1_000_000,
+    "latitude": 55.0,
+    "longitude": 37.0,
+    "demonym": "Benchmarkian",
+    "area": 100_000.0,
+    "numeric_code": "999",
+    "flag": "https://example.com/flag.svg",
+    "currencies": [{"code": "RUB"}],
+    "languages": [{"name": "Russian", "native_name": "Русский"}],
+}
+
+# ответ внешнего сервиса с данными о погоде
+FAKE_WEATHER = {
+    "main": {"temp": 12.5, "pressure": 1012, "humidity": 70},
+    "wind": {"speed": 3.5},
+    "weather": [{"description": "broken clouds"}],
+}
+
+
+class BenchmarkStatsDTO(BaseModel):
+    """
+    Модель результатов замера (время в миллисекундах).
+    """
+
+    rounds: int
+    items: int
+    min: float
+    max: float
+    mean: float
+    median: float
+    stddev: float
+    p95: float
+
+    @property
+    def items_per_second(self) -> float:
+        """
+        Количество обработанных элементов в секунду.
+
+        :return:
+        """
+
+        return self.items / self.mean * 1000 if self.mean else 0.0
+
+
+def fake_geo_request(endpoint: str) -> Optional[Any]:
+    """
+    Имитация ответов внешнего сервиса с данными о странах и городах.
+
+    :param endpoint: Адрес запроса
+    :return:
+    """
+
+    name = endpoint.rsplit("/", 1)[-1]
+    # большой ответ для замеров разбора данных: `bulk<количество элементов>`
+    size = int(name[4:]) if name.startswith("bulk") else 1
+
+    if "/city/name/" in endpoint:
+        return [
+            {
+                "name": f"{name}{index}" if size > 1 else name,
+                "state_or_region": "Benchmark region",
+                "country": {"name": FAKE_COUNTRY["name"], "code": COUNTRY_CODE},
+                "latitude": 55.0,
+                "longitude": 37.0,
+            }
+            for index in range(size)
+        ]
+    if "/country/" in endpoint:
+        return [
+            dict(FAKE_COUNTRY, name=f"{FAKE_COUNTRY['name']}{index}")
+            for index in range(size)
+        ]
+
+    return None
+
+
+def fake_weather_request(endpoint: str) -> dict:  # pylint: disable=unused-argument
+    """
+    Имитация ответов внешнего сервиса с данными о погоде.
+
+    :param endpoint: Адрес запроса
+    :return:
+    """
+
+    return FAKE_WEATHER
+
+
+class BenchmarkRunner:
+    """
+    Набор замеров производительности основных сценариев работы с данными.
+
+    Внешние сервисы заменяются функциями, возвращающими заранее подготовленные ответы,
+    поэтому результат зависит только от приложения, PostgreSQL и Redis.
+    """
+
+    def __init__(self, rounds: int, warmup: int, cities: int) -> None:
+        """
+        Конструктор.
+
+        :param rounds: Количество замеров каждого сценария
+        :param warmup: Количество предварительных запусков без замера
+        :param cities: Количество городов в тестовых данных
+        """
+
+        self.rounds = rounds
+        self.warmup = warmup
+        self.cities = cities
+        self.country: Optional[Country] = None
+        self.counter = count()
+
+    def run(self, names: Optional[list[str]] = None) -> dict[str, BenchmarkStatsDTO]:
+        """
+        Выполнение замеров.
+
+        :param names: Названия сценариев (по умолчанию – все сценарии)
+        :return:
+        """
+
+        with ExitStack() as stack:
+            stack.enter_context(
+                mock.patch.object(GeoClient, "_request", side_effect=fake_geo_request)
+            )
+            stack.enter_context(
+                mock.patch.object(
+                    WeatherClient, "_request", side_effect=fake_weather_request
+                )
+            )
+            self.seed()
+
+            results = {}
+            for name, func, items in self.get_cases():
+                if names and name not in names:
+                    continue
+                logger.info("Running benchmark '%s'...", name)
+                results[name] = self.measure(func, items)
+
+        return results
+
+    def seed(self) -> None:
+        """
+        Подготовка тестовых данных.
+
+        :return:
+        """
+
+        self.country, _ = Country.objects.update_or_create(
+            alpha2code=COUNTRY_CODE,
+            defaults={
+                **{
+                    key: value
+                    for key, value in FAKE_COUNTRY.items()
+                    if key not in ("currencies", "languages")
+                },
+                "currencies": ["RUB"],
+                "languages": ["Russian"],
+            },
+        )
+        existing = City.objects.filter(country=self.country).count()
+        City.objects.bulk_create(
+            [
+                City(
+                    country=self.country,
+                    name=f"City{index}",
+                    region=f"Region{index % 100}",
+                    latitude=50 + index % 1000 / 100,
+                    longitude=30 + index // 1000 / 100,
+                    population=index,
+                )
+                for index in range(existing, self.cities)
+            ],
+            batch_size=10_000,
+        )
+
+    def get_cases(self) -> Iterator[tuple[str, Callable[[], Any], int]]:
+        """
+        Формирование сценариев: название, функция и количество обрабатываемых элементов.
+
+        :return:
+        """
+
+        geo_client = GeoClient()
+        city_service = CityService()
+        weather_service = WeatherService()
+        news_service = NewsService()
+
+        yield "cities_hit", lambda: list(city_service.get_cities("City42$")), 1
+        yield "cities_miss", lambda: list(
+            city_service.get_cities(f"Imported{next(self.counter)}")
+        ), 1
+
+        for size in (1, 50, 500):
+            codes = {
+                CountryCityDTO(city=f"city{index}", alpha2code=COUNTRY_CODE.lower())
+                for index in range(size)
+            }
+            yield f"cities_by_codes_{size}", partial(
+                lambda items: list(city_service.get_cities_by_codes(items)), codes
+            ), size
+
+        yield "geo_parse_countries_1000", lambda: geo_client.get_countries(
+            "bulk1000"
+        ), 1000
+        yield "geo_parse_cities_1000", lambda: geo_client.get_cities("bulk1000"), 1000
+
+        codes_list = [
+            CountryCityDTO(city=f"city{index}", alpha2code=COUNTRY_CODE.lower())
+            for index in range(500)
+        ]
+        codes_set = set(codes_list)
+        yield "dto_hash_500", lambda: sum(
+            code in codes_set for code in codes_list
+        ), len(codes_list)
+
+        cities = list(City.objects.filter(country=self.country).order_by("pk")[:500])
+        yield "city_serializer_500", lambda: CitySerializer(
+            cities, many=True
+        ).data, len(cities)
+
+        locations = {
+            LocationDTO(alpha2code=COUNTRY_CODE, city=f"City{index}")
+            for index in range(50)
+        }
+        weather_service.get_weather_bulk(locations)
+        yield "weather_cache_hit_50", lambda: weather_service.get_weather_bulk(
+            locations
+        ), len(locations)
+
+        news = [
+            NewsItemDTO(
+                source="Benchmark",
+                author="Author",
+                title=f"Title {index}",
+                description="Description",
+                url=f"https://example.com/news/{index}",
+                published_at=datetime.now(timezone.utc),
+            )
+            for index in range(1000)
+        ]
+        yield "news_save_1000", lambda: news_service.save_news(
+            self.country.pk if self.country else 0, news
+        ), len(news)
+
+        messages = [
+            json.dumps({"city": f"City{index}", "alpha2code": COUNTRY_CODE}).encode()
+            for index in range(100)
+        ]
+        yield "consumer_messages_100", lambda: [
+            EventConsumer.callback(None, None, None, body) for body in messages
+        ], len(messages)
+
+    def measure(self, func: Callable[[], Any], items: int) -> BenchmarkStatsDTO:
+        """
+        Замер времени выполнения функции.
+
+        :param func: Функция сценария
+        :param items: Количество обрабатываемых за вызов элементов
+        :return:
+        """
+
+        for _ in range(self.warmup):
+            func()
+
+        timings = []
+        for _ in range(self.rounds):
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        timings.sort()
+
+        return BenchmarkStatsDTO(
+            rounds=self.rounds,
+            items=items,
+            min=timings[0],
+            max=timings[-1],
+            mean=statistics.fmean(timings),
+            median=statistics.median(timings),
+            stddev=statistics.stdev(timings) if len(timings) > 1 else 0.0,
+            p95=timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        )
+
+    @staticmethod
+    def get_environment() -> dict:
+        """
+        Описание окружения, в котором выполнялись замеры.
+
+        :return:
+        """
+
+        with connection.cursor() as cursor:
+            cursor.execute("SHOW server_version")
+            postgres_version = cursor.fetchone()[0]
+
+        return {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "postgresql": postgres_version,
+            "machine": platform.machine(),
+        }
+
+
+def get_isolated_caches(first_db: int) -> dict:
+    """
+    Формирование настроек кэшей для замеров: каждый кэш использует отдельную базу данных
+    Redis (начиная с `first_db`), чтобы тестовые данные (погода, частоты запросов локаций,
+    индекс автодополнения) не попадали в рабочие кэши.
+
+    :param first_db: Номер первой базы данных Redis
+    :return:
+    """
+
+    configs: dict[str, dict[str, Any]] = settings.CACHES  # type: ignore
+    used = {
+        str(config.get("OPTIONS", {}).get("db", "0")) for config in configs.values()
+    }
+    caches_settings = {}
+    for index, (alias, config) in enumerate(configs.items()):
+        if (db := str(first_db + index)) in used:
+            raise ValueError(f"Redis database {db} is used by the application caches.")
+        caches_settings[alias] = {
+            **config,
+            "OPTIONS": {**config.get("OPTIONS", {}), "db": db},
+        }
+
+    return caches_settings
+
+
+def compare(
+    results: dict[str, BenchmarkStatsDTO], baseline: dict, threshold: float
+) -> Iterator[tuple[str, float, float, bool]]:
+    """
+    Сравнение результатов с сохраненными ранее результатами по медиане времени.
+
+    :param results: Текущие результаты
+    :param baseline: Ранее сохраненные результаты (содержимое JSON-файла)
+    :param threshold: Допустимое замедление (доля, например 0.1 – 10 %)
+    :return: Название сценария, медиана до и после, признак регрессии
+    """
+
+    previous = baseline.get("benchmarks", {})
+    for name, stats in results.items():
+        if name in previous:
+            before = previous[name]["median"]
+            yield name, before, stats.median, stats.median > before * (1 + threshold)
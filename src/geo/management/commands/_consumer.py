@@ -7,6 +7,7 @@ from pika.adapters.blocking_connection import BlockingChannel
 from pika.spec import Basic, BasicProperties
 from pydantic import ValidationError
 
+from base.clients.quota import PRIORITY_BACKGROUND, set_priority
 from geo.services.city import CityService
 from geo.services.shemas import CountryCityDTO
 
@@ -28,6 +29,8 @@ class EventConsumer:
         """
 
         self.queue_name = queue_name
+        # импорт данных по событиям выполняется с фоновым приоритетом запросов к внешним API
+        set_priority(PRIORITY_BACKGROUND)
 
         params = pika.URLParameters(url)
         connection = pika.BlockingConnection(params)
@@ -0,0 +1,417 @@
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler
+from typing import Any, Callable, Optional
+from urllib.parse import parse_qs, unquote, urlparse
+
+from pydantic import BaseModel
+
+logger = logging.getLogger()
+
+# страны, известные имитации внешнего сервиса
+COUNTRIES: list[dict[str, Any]] = [
+    {
+        "name": "Russia",
+        "alpha2code": "RU",
+        "alpha3code": "RUS",
+        "capital": "Moscow",
+        "region": "Europe",
+        "subregion": "Eastern Europe",
+        "population": 146_599_183,
+        "latitude": 60.0,
+        "longitude": 100.0,
+        "demonym": "Russian",
+        "area": 17_124_442.0,
+        "numeric_code": "643",
+        "flag": "https://restcountries.eu/data/rus.svg",
+        "currencies": [{"code": "RUB"}],
+        "languages": [{"name": "Russian", "native_name": "Русский"}],
+    },
+    {
+        "name": "Estonia",
+        "alpha2code": "EE",
+        "alpha3code": "EST",
+        "capital": "Tallinn",
+        "region": "Europe",
+        "subregion": "Northern Europe",
+        "population": 1_315_944,
+        "latitude": 59.0,
+        "longitude": 26.0,
+        "demonym": "Estonian",
+        "area": 45_227.0,
+        "numeric_code": "233",
+        "flag": "https://restcountries.eu/data/est.svg",
+        "currencies": [{"code": "EUR"}],
+        "languages": [{"name": "Estonian", "native_name": "eesti"}],
+    },
+    {
+        "name": "Germany",
+        "alpha2code": "DE",
+        "alpha3code": "DEU",
+        "capital": "Berlin",
+        "region": "Europe",
+        "subregion": "Western Europe",
+        "population": 83_240_525,
+        "latitude": 51.0,
+        "longitude": 9.0,
+        "demonym": "German",
+        "area": 357_114.0,
+        "numeric_code": "276",
+        "flag": "https://restcountries.eu/data/deu.svg",
+        "currencies": [{"code": "EUR"}],
+        "languages": [{"name": "German", "native_name": "Deutsch"}],
+    },
+    {
+        "name": "United States of America",
+        "alpha2code": "US",
+        "alpha3code": "USA",
+        "capital": "Washington, D.C.",
+        "region": "Americas",
+        "subregion": "Northern America",
+        "population": 329_484_123,
+        "latitude": 38.0,
+        "longitude": -97.0,
+        "demonym": "American",
+        "area": 9_629_091.0,
+        "numeric_code": "840",
+        "flag": "https://restcountries.eu/data/usa.svg",
+        "currencies": [{"code": "USD"}],
+        "languages": [{"name": "English", "native_name": "English"}],
+    },
+]
+
+# города, известные имитации внешнего сервиса
+CITIES = [
+    ("Moscow", "Moscow", "RU", 55.7558, 37.6173),
+    ("Saint Petersburg", "Saint Petersburg", "RU", 59.9343, 30.3351),
+    ("Perm", "Perm Krai", "RU", 58.0105, 56.2502),
+    ("Tallinn", "Harju County", "EE", 59.4370, 24.7536),
+    ("Tartu", "Tartu County", "EE", 58.3780, 26.7290),
+    ("Berlin", "Berlin", "DE", 52.5200, 13.4050),
+    ("Munich", "Bavaria", "DE", 48.1351, 11.5820),
+    ("New York", "New York", "US", 40.7128, -74.0060),
+    ("Washington", "District of Columbia", "US", 38.9072, -77.0369),
+]
+
+# курсы валют относительно доллара США
+USD_RATES = {"USD": 1.0, "EUR": 0.92, "RUB": 92.5, "GBP": 0.79, "CNY": 7.24}
+
+
+class FakeApiConfigDTO(BaseModel):
+    """
+    Модель настроек имитации внешних сервисов.
+    """
+
+    # средняя задержка ответа (в миллисекундах)
+    latency: float = 0.0
+    # случайное отклонение задержки ответа (в миллисекундах)
+    jitter: float = 0.0
+    # доля запросов, завершающихся ошибкой сервера
+    error_rate: float = 0.0
+    # допустимое количество запросов в секунду для одного ключа API (0 – без ограничений)
+    rate_limit: float = 0.0
+
+
+def _seed(value: str) -> int:
+    """
+    Получение числа, однозначно соответствующего строке (для воспроизводимых данных).
+
+    :param value: Строка
+    :return:
+    """
+
+    return int(hashlib.md5(value.lower().encode()).hexdigest()[:8], 16)
+
+
+class FakeApiState:
+    """
+    Общее состояние имитации: настройки и счетчики ограничения частоты запросов.
+    """
+
+    def __init__(self, config: FakeApiConfigDTO) -> None:
+        """
+        Конструктор.
+
+        :param config: Настройки имитации
+        """
+
+        self.config = config
+        self.lock = threading.Lock()
+        # ключ API -> (количество доступных запросов, время последнего пополнения)
+        self.buckets: dict[str, tuple[float, float]] = {}
+
+    def acquire(self, key: str) -> float:
+        """
+        Учет запроса в ограничении частоты запросов.
+
+        :param key: Ключ API
+        :return: 0, если запрос разрешен, иначе время ожидания (в секундах)
+        """
+
+        rate = self.config.rate_limit
+        if rate <= 0:
+            return 0.0
+
+        with self.lock:
+            now = time.monotonic()
+            tokens, updated = self.buckets.get(key, (rate, now))
+            tokens = min(rate, tokens + (now - updated) * rate)
+            if tokens < 1:
+                self.buckets[key] = (tokens, now)
+                return (1 - tokens) / rate
+            self.buckets[key] = (tokens - 1, now)
+
+        return 0.0
+
+
+class FakeApiHandler(BaseHTTPRequestHandler):
+    """
+    Обработчик запросов, имитирующий APILayer (Geo, Exchange Rates), OpenWeather и NewsAPI.
+    """
+
+    state: FakeApiState
+
+    def log_message(self, format: str, *args: Any) -> None:  # pylint: disable=W0622
+        logger.debug(format, *args)
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """
+        Обработка GET-запроса.
+
+        :return:
+        """
+
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        config = self.state.config
+
+        key = self.headers.get("apikey") or query.get("appid") or query.get("apiKey")
+        if retry_after := self.state.acquire(key or ""):
+            self._send(
+                HTTPStatus.TOO_MANY_REQUESTS,
+                {"message": "API rate limit exceeded"},
+                {"Retry-After": str(max(1, round(retry_after)))},
+            )
+            return
+
+        if delay := max(0.0, random.gauss(config.latency, config.jitter)):
+            time.sleep(delay / 1000)
+
+        if random.random() < config.error_rate:
+            self._send(HTTPStatus.SERVICE_UNAVAILABLE, {"message": "Injected error"})
+            return
+
+        data = self._route(url.path, query)
+        if data is None:
+            self._send(HTTPStatus.NOT_FOUND, {"message": "Not found"})
+        else:
+            self._send(HTTPStatus.OK, data)
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        """
+        Изменение настроек имитации во время работы (`POST /_config` с JSON-телом).
+
+        :return:
+        """
+
+        if urlparse(self.path).path != "/_config":
+            self._send(HTTPStatus.NOT_FOUND, {"message": "Not found"})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            values = json.loads(self.rfile.read(length) or b"{}")
+            self.state.config = FakeApiConfigDTO(
+                **{**self.state.config.dict(), **values}
+            )
+        except (TypeError, ValueError):
+            self._send(HTTPStatus.BAD_REQUEST, {"message": "Invalid config"})
+            return
+
+        self._send(HTTPStatus.OK, self.state.config.dict())
+
+    def _route(self, path: str, query: dict[str, str]) -> Optional[Any]:
+        """
+        Формирование ответа в зависимости от адреса запроса.
+
+        :param path: Путь запроса
+        :param query: Параметры запроса
+        :return:
+        """
+
+        parts = [unquote(part) for part in path.strip("/").split("/")]
+        if len(parts) == 4 and parts[0] == "geo":
+            return self._route_geo(parts[1], parts[2], parts[3])
+
+        handlers: dict[tuple[str, ...], Callable[[], Optional[Any]]] = {
+            ("exchangerates_data", "latest"): lambda: self._get_rates(
+                query.get("base", "USD").upper()
+            ),
+            ("data", "2.5", "weather"): lambda: self._get_weather(query),
+            ("v2", "top-headlines"): lambda: self._get_news(
+                query.get("country", "").upper()
+            ),
+        }
+        handler = handlers.get(tuple(parts))
+
+        return handler() if handler else None
+
+    def _route_geo(self, resource: str, field: str, value: str) -> Optional[Any]:
+        """
+        Формирование ответа на запрос к API стран и городов (`/geo/<ресурс>/<поле>/<значение>`).
+
+        :param resource: Ресурс (`country`, `city`)
+        :param field: Поле поиска (`name`, `code`)
+        :param value: Значение поля
+        :return:
+        """
+
+        if (resource, field) == ("country", "name"):
+            name = value.lower()
+            return [
+                country for country in COUNTRIES if name in str(country["name"]).lower()
+            ] or None
+        if (resource, field) == ("country", "code"):
+            code = value.upper()
+            return [
+                country
+                for country in COUNTRIES
+                if code in (country["alpha2code"], country["alpha3code"])
+            ] or None
+        if (resource, field) == ("city", "name"):
+            return self._get_cities(value)
+
+        return None
+
+    @staticmethod
+    def _get_cities(name: str) -> list[dict]:
+        """
+        Поиск городов по названию; для неизвестных названий формируется
+        воспроизводимый город в одной из известных стран.
+
+        :param name: Название города
+        :return:
+        """
+
+        cities = [city for city in CITIES if name.lower() in city[0].lower()]
+        if not cities:
+            seed = _seed(name)
+            country = COUNTRIES[seed % len(COUNTRIES)]
+            cities = [
+                (
+                    name.title(),
+                    "",
+                    str(country["alpha2code"]),
+                    float(country["latitude"]) + seed % 1000 / 500 - 1,
+                    float(country["longitude"]) + seed // 1000 % 1000 / 500 - 1,
+                )
+            ]
+
+        countries = {country["alpha2code"]: country["name"] for country in COUNTRIES}
+
+        return [
+            {
+                "name": city_name,
+                "state_or_region": region,
+                "country": {"name": countries[code], "code": code},
+                "latitude": latitude,
+                "longitude": longitude,
+            }
+            for city_name, region, code, latitude, longitude in cities
+        ]
+
+    @staticmethod
+    def _get_rates(base: str) -> Optional[dict]:
+        """
+        Формирование курсов валют относительно базовой валюты.
+
+        :param base: Код базовой валюты
+        :return:
+        """
+
+        if base not in USD_RATES:
+            return None
+
+        return {
+            "base": base,
+            "date": datetime.now(timezone.utc).date().isoformat(),
+            "rates": {
+                code: round(rate / USD_RATES[base], 6)
+                for code, rate in USD_RATES.items()
+            },
+        }
+
+    @staticmethod
+    def _get_weather(query: dict[str, str]) -> dict:
+        """
+        Формирование воспроизводимых данных о погоде для места.
+
+        :param query: Параметры запроса (`q` либо `lat` и `lon`)
+        :return:
+        """
+
+        seed = _seed(query.get("q") or f"{query.get('lat')},{query.get('lon')}")
+
+        return {
+            "weather": [
+                {"description": ("clear sky", "few clouds", "light rain")[seed % 3]}
+            ],
+            "main": {
+                "temp": round(seed % 600 / 10 - 25, 1),
+                "pressure": 980 + seed % 60,
+                "humidity": 30 + seed % 70,
+            },
+            "wind": {"speed": round(seed % 150 / 10, 1)},
+            "name": query.get("q", ""),
+        }
+
+    @staticmethod
+    def _get_news(alpha2code: str) -> dict:
+        """
+        Формирование новостной ленты для страны.
+
+        :param alpha2code: ISO Alpha2 код страны
+        :return:
+        """
+
+        published_at = datetime.now(timezone.utc).replace(minute=0, second=0)
+        articles = [
+            {
+                "source": {"id": None, "name": f"{alpha2code} News"},
+                "author": "Fake API",
+                "title": f"Headline {index} ({alpha2code})",
+                "description": f"Description of headline {index}",
+                "url": f"https://news.example.com/{alpha2code.lower()}/{index}",
+                "publishedAt": (published_at - timedelta(hours=index)).isoformat(),
+            }
+            for index in range(20)
+        ]
+
+        return {"status": "ok", "totalResults": len(articles), "articles": articles}
+
+    def _send(
+        self, status: HTTPStatus, data: Any, headers: Optional[dict] = None
+    ) -> None:
+        """
+        Отправка JSON-ответа.
+
+        :param status: Код ответа
+        :param data: Данные ответа
+        :param headers: Дополнительные заголовки
+        :return:
+        """
+
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
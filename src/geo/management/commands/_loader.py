@@ -0,0 +1,461 @@
+import csv
+import io
+import json
+import logging
+import os
+import time
+from itertools import islice
+from typing import IO, Any, Callable, Iterator, Optional
+
+from django.db import connection, transaction
+from pydantic import BaseModel
+
+from geo.models import City, Country
+
+logger = logging.getLogger()
+
+# колонки файла городов GeoNames (http://download.geonames.org/export/dump/readme.txt)
+GEONAMES_COLUMNS = (
+    "geonameid",
+    "name",
+    "asciiname",
+    "alternatenames",
+    "latitude",
+    "longitude",
+    "feature_class",
+    "feature_code",
+    "country_code",
+    "cc2",
+    "admin1_code",
+    "admin2_code",
+    "admin3_code",
+    "admin4_code",
+    "population",
+    "elevation",
+    "dem",
+    "timezone",
+    "modification_date",
+)
+
+# временная таблица для копирования пакета записей
+STAGING_TABLE = "loadgeo_staging"
+
+COUNTRY_COLUMNS = (
+    "name varchar(255)",
+    "alpha2code varchar(2)",
+    "alpha3code varchar(3)",
+    "capital varchar(50)",
+    "region varchar(50)",
+    "subregion varchar(50)",
+    "population integer",
+    "latitude double precision",
+    "longitude double precision",
+    "demonym varchar(50)",
+    "area double precision",
+    "numeric_code varchar(3)",
+    "flag varchar(255)",
+    "currencies varchar(3)[]",
+    "languages varchar(20)[]",
+)
+
+CITY_COLUMNS = (
+    "country_code varchar(2)",
+    "name varchar(50)",
+    "region varchar(50)",
+    "latitude double precision",
+    "longitude double precision",
+    "population integer",
+)
+
+
+class LoadStatsDTO(BaseModel):
+    """
+    Модель статистики загрузки данных.
+    """
+
+    rows: int = 0
+    skipped: int = 0
+    merged: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        """
+        Скорость обработки строк файла.
+
+        :return:
+        """
+
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+class GeoLoader:
+    """
+    Потоковая загрузка больших наборов данных о странах и городах в БД.
+
+    Файл читается построчно, записи пакетами копируются командой PostgreSQL `COPY`
+    во временную таблицу и объединяются с существующими записями. После каждого пакета
+    позиция в файле сохраняется в файл контрольной точки, что позволяет продолжить загрузку
+    после прерывания. Объем используемой памяти ограничен размером пакета.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        batch_size: int,
+        checkpoint_path: str,
+    ) -> None:
+        """
+        Конструктор.
+
+        :param kind: Тип данных (`countries` или `cities`)
+        :param batch_size: Количество записей в пакете
+        :param checkpoint_path: Путь к файлу контрольной точки
+        :return:
+        """
+
+        self.batch_size = batch_size
+        self.checkpoint_path = checkpoint_path
+        self.columns: tuple[str, ...]
+        self.normalize: Callable[[dict], Optional[tuple]]
+        self.merge: Callable[[Any], int]
+        if kind == "countries":
+            self.columns = COUNTRY_COLUMNS
+            self.normalize = normalize_country
+            self.merge = merge_countries
+        else:
+            self.columns = CITY_COLUMNS
+            self.normalize = normalize_city
+            self.merge = merge_cities
+
+    def load(
+        self, path: str, file_format: str, delimiter: str, restart: bool = False
+    ) -> LoadStatsDTO:
+        """
+        Загрузка данных из файла.
+
+        :param path: Путь к файлу с данными
+        :param file_format: Формат файла (`csv`, `jsonl` или `geonames`)
+        :param delimiter: Разделитель колонок для формата `csv`
+        :param restart: Начать загрузку сначала, игнорируя контрольную точку
+        :return:
+        """
+
+        stats = LoadStatsDTO()
+        offset = 0 if restart else self._read_checkpoint(path)
+        if offset:
+            logger.info("Resuming load of '%s' from byte %s.", path, offset)
+
+        started = time.monotonic()
+        with open(path, "rb") as file, connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMP TABLE {STAGING_TABLE} "
+                f"({', '.join(self.columns)}) ON COMMIT DELETE ROWS"
+            )
+            records = self._read_records(file, file_format, delimiter, offset)
+            while batch := list(islice(records, self.batch_size)):
+                self._load_batch(cursor, batch, stats)
+                # позиция в файле после последней записи пакета
+                self._write_checkpoint(path, batch[-1][0])
+                stats.seconds = time.monotonic() - started
+                logger.info(
+                    "Processed %s rows (%s merged, %s skipped), %.0f rows/sec.",
+                    stats.rows,
+                    stats.merged,
+                    stats.skipped,
+                    stats.rows_per_second,
+                )
+
+            cursor.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+
+        stats.seconds = time.monotonic() - started
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+        return stats
+
+    def _load_batch(
+        self, cursor: Any, batch: list[tuple[int, dict]], stats: LoadStatsDTO
+    ) -> None:
+        """
+        Загрузка пакета записей в одной транзакции.
+
+        :param cursor: Курсор БД
+        :param batch: Записи с позициями в файле
+        :param stats: Статистика загрузки
+        :return:
+        """
+
+        rows = []
+        for _, record in batch:
+            if (row := self.normalize(record)) is not None:
+                rows.append(row)
+            else:
+                stats.skipped += 1
+
+        with transaction.atomic():
+            self._copy(cursor, rows)
+            stats.merged += self.merge(cursor)
+
+        stats.rows += len(batch)
+
+    def _copy(self, cursor: Any, rows: list[tuple]) -> None:
+        """
+        Копирование пакета записей во временную таблицу командой `COPY`.
+
+        :param cursor: Курсор БД
+        :param rows: Записи для копирования
+        :return:
+        """
+
+        buffer = io.StringIO()
+        # в формате CSV незаключенное в кавычки пустое значение читается как NULL,
+        # а пустые строки (например, регион города) должны сохраняться как есть
+        writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)
+        writer.writerows(rows)
+        buffer.seek(0)
+        columns = ", ".join(column.split()[0] for column in self.columns)
+        cursor.copy_expert(
+            f"COPY {STAGING_TABLE} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+
+    @staticmethod
+    def _read_records(
+        file: IO[bytes], file_format: str, delimiter: str, offset: int
+    ) -> Iterator[tuple[int, dict]]:
+        """
+        Построчное чтение записей из файла.
+
+        Для каждой записи возвращается позиция в файле после нее (для контрольной точки).
+        Поддерживаются только записи, занимающие одну строку файла.
+
+        :param file: Файл, открытый в бинарном режиме
+        :param file_format: Формат файла (`csv`, `jsonl` или `geonames`)
+        :param delimiter: Разделитель колонок для формата `csv`
+        :param offset: Позиция в файле, с которой продолжается чтение
+        :return:
+        """
+
+        header: tuple[str, ...] = GEONAMES_COLUMNS
+        if file_format == "csv":
+            header = tuple(
+                next(csv.reader([file.readline().decode()], delimiter=delimiter), [])
+            )
+        if offset > file.tell():
+            file.seek(offset)
+
+        position = file.tell()
+        for line in iter(file.readline, b""):
+            position += len(line)
+            text = line.decode().rstrip("\r\n")
+            if not text:
+                continue
+
+            if file_format == "jsonl":
+                yield position, json.loads(text)
+            elif file_format == "csv":
+                values: list[str] = next(csv.reader([text], delimiter=delimiter), [])
+                yield position, dict(zip(header, values))
+            else:
+                yield position, dict(zip(header, text.split("\t")))
+
+    def _read_checkpoint(self, path: str) -> int:
+        """
+        Получение позиции в файле из контрольной точки.
+
+        :param path: Путь к файлу с данными
+        :return:
+        """
+
+        if not os.path.exists(self.checkpoint_path):
+            return 0
+
+        with open(self.checkpoint_path, encoding="utf-8") as file:
+            checkpoint = json.load(file)
+
+        if checkpoint.get("path") != os.path.abspath(path):
+            return 0
+
+        return int(checkpoint.get("offset", 0))
+
+    def _write_checkpoint(self, path: str, offset: int) -> None:
+        """
+        Атомарное сохранение позиции в файле в контрольной точке.
+
+        :param path: Путь к файлу с данными
+        :param offset: Позиция в файле после последней загруженной записи
+        :return:
+        """
+
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump({"path": os.path.abspath(path), "offset": offset}, file)
+        os.replace(tmp_path, self.checkpoint_path)
+
+
+def _to_list(value: Any) -> list[str]:
+    """
+    Преобразование значения в список строк (список или строка через запятую).
+
+    :param value: Значение
+    :return:
+    """
+
+    if isinstance(value, list):
+        return [str(item) for item in value]
+
+    return [item.strip() for item in str(value or "").split(",") if item.strip()]
+
+
+def _to_array(values: list[str]) -> str:
+    """
+    Формирование литерала массива PostgreSQL.
+
+    :param values: Список строк
+    :return:
+    """
+
+    items = (
+        '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"' for value in values
+    )
+
+    return "{" + ",".join(items) + "}"
+
+
+def normalize_country(record: dict) -> Optional[tuple]:
+    """
+    Преобразование записи о стране в строку временной таблицы.
+
+    :param record: Запись из файла
+    :return: Значения колонок или `None` для некорректной записи
+    """
+
+    try:
+        return (
+            str(record["name"])[:255],
+            str(record["alpha2code"]).upper()[:2],
+            str(record.get("alpha3code") or "").upper()[:3],
+            str(record.get("capital") or "")[:50],
+            str(record.get("region") or "")[:50],
+            str(record.get("subregion") or "")[:50],
+            int(record.get("population") or 0),
+            float(record["latitude"]),
+            float(record["longitude"]),
+            str(record.get("demonym") or "")[:50],
+            float(record.get("area") or 0),
+            str(record.get("numeric_code") or "")[:3],
+            str(record.get("flag") or "")[:255],
+            _to_array([code[:3] for code in _to_list(record.get("currencies"))]),
+            _to_array([name[:20] for name in _to_list(record.get("languages"))]),
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def normalize_city(record: dict) -> Optional[tuple]:
+    """
+    Преобразование записи о городе в строку временной таблицы.
+
+    Поддерживаются записи GeoNames (`country_code`, `admin1_code`) и записи с полями модели
+    (`alpha2code`, `region`).
+
+    :param record: Запись из файла
+    :return: Значения колонок или `None` для некорректной записи
+    """
+
+    try:
+        return (
+            str(record.get("alpha2code") or record["country_code"]).upper()[:2],
+            str(record["name"])[:50],
+            str(record.get("region") or record.get("admin1_code") or "")[:50],
+            float(record["latitude"]),
+            float(record["longitude"]),
+            int(record.get("population") or 0),
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def merge_countries(cursor: Any) -> int:
+    """
+    Объединение стран из временной таблицы с существующими записями по ISO Alpha2 коду.
+
+    Существующие записи обновляются, только если данные изменились.
+
+    :param cursor: Курсор БД
+    :return: Количество добавленных и измененных записей
+    """
+
+    table = Country._meta.db_table
+    columns = [column.split()[0] for column in COUNTRY_COLUMNS]
+    updates = [column for column in columns if column != "alpha2code"]
+    cursor.execute(
+        f"""
+        INSERT INTO {table} (created_at, updated_at, {", ".join(columns)})
+        SELECT DISTINCT ON (alpha2code) now(), now(), {", ".join(columns)}
+        FROM {STAGING_TABLE}
+        ON CONFLICT (alpha2code) DO UPDATE SET
+            updated_at = now(),
+            {", ".join(f"{column} = EXCLUDED.{column}" for column in updates)}
+        WHERE ({", ".join(f"{table}.{column}" for column in updates)})
+            IS DISTINCT FROM ({", ".join(f"EXCLUDED.{column}" for column in updates)})
+        """
+    )
+
+    return int(cursor.rowcount)
+
+
+def merge_cities(cursor: Any) -> int:
+    """
+    Объединение городов из временной таблицы с существующими записями.
+
+    Город определяется страной, названием и регионом; у существующих записей обновляются
+    измененные координаты и население. Города стран, отсутствующих в БД, пропускаются.
+
+    :param cursor: Курсор БД
+    :return: Количество добавленных и измененных записей
+    """
+
+    table = City._meta.db_table
+    country_table = Country._meta.db_table
+    staging = f"""
+        SELECT DISTINCT ON (country.id, staging.name, staging.region)
+            country.id AS country_id, staging.name, staging.region,
+            staging.latitude, staging.longitude, staging.population
+        FROM {STAGING_TABLE} staging
+        JOIN {country_table} country ON country.alpha2code = staging.country_code
+    """
+    cursor.execute(
+        f"""
+        UPDATE {table} city SET
+            latitude = source.latitude,
+            longitude = source.longitude,
+            population = source.population,
+            updated_at = now()
+        FROM ({staging}) source
+        WHERE city.country_id = source.country_id
+            AND city.name = source.name
+            AND city.region = source.region
+            AND (city.latitude, city.longitude, city.population)
+                IS DISTINCT FROM (source.latitude, source.longitude, source.population)
+        """
+    )
+    updated = int(cursor.rowcount)
+    cursor.execute(
+        f"""
+        INSERT INTO {table}
+            (created_at, updated_at, country_id, name, region, latitude, longitude,
+            population)
+        SELECT now(), now(), source.country_id, source.name, source.region,
+            source.latitude, source.longitude, source.population
+        FROM ({staging}) source
+        WHERE NOT EXISTS (
+            SELECT 1 FROM {table} city
+            WHERE city.country_id = source.country_id
+                AND city.name = source.name
+                AND city.region = source.region
+        )
+        """
+    )
+
+    return updated + int(cursor.rowcount)
@@ -0,0 +1,181 @@
+import json
+from typing import Any
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.test.utils import override_settings, setup_databases, teardown_databases
+
+from geo.management.commands._benchmark import (
+    BenchmarkRunner,
+    compare,
+    get_isolated_caches,
+)
+
+
+class Command(BaseCommand):
+    """
+    Реализация функций консольной команды.
+
+    https://docs.djangoproject.com/en/4.1/howto/custom-management-commands
+    """
+
+    help = (
+        "Замер производительности основных сценариев работы с данными "
+        "на отдельной тестовой базе данных."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """
+        Добавление аргументов для команды.
+
+        :param parser: Объект парсера консольной команды.
+        :return:
+        """
+
+        parser.add_argument(
+            "names",
+            nargs="*",
+            help="Названия сценариев (по умолчанию выполняются все сценарии)",
+        )
+        parser.add_argument(
+            "--rounds",
+            type=int,
+            default=20,
+            help="Количество замеров каждого сценария",
+        )
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=3,
+            help="Количество предварительных запусков без замера",
+        )
+        parser.add_argument(
+            "--cities",
+            type=int,
+            default=50_000,
+            help="Количество городов в тестовых данных",
+        )
+        parser.add_argument(
+            "--output",
+            type=str,
+            default="benchmark.json",
+            help="Путь к файлу для сохранения результатов",
+        )
+        parser.add_argument(
+            "--compare",
+            type=str,
+            help="Путь к файлу с ранее сохраненными результатами для сравнения",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.1,
+            help="Допустимое замедление медианы времени при сравнении (доля)",
+        )
+        parser.add_argument(
+            "--redis-db",
+            type=int,
+            default=10,
+            help="Номер первой базы данных Redis для кэшей на время замеров "
+            "(кэши используют базы подряд и очищаются после замеров)",
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Не удалять тестовую базу данных после замеров",
+        )
+
+    def handle(self, *args: tuple, **options: Any) -> None:
+        """
+        Выполнение консольной команды.
+        https://docs.python.org/3/library/argparse.html#example
+
+        :param args: Позиционные аргументы консольной команды.
+        :param options: Опции консольной команды.
+        :return:
+        """
+
+        if options["rounds"] < 1:
+            raise CommandError("Количество замеров должно быть не меньше 1.")
+
+        results, environment = self._run(options)
+
+        for name, stats in results.items():
+            self.stdout.write(
+                f"{name:<24} median {stats.median:9.3f} ms  p95 {stats.p95:9.3f} ms  "
+                f"{stats.items_per_second:12.0f} items/sec"
+            )
+
+        with open(options["output"], "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "environment": environment,
+                    "benchmarks": {
+                        name: stats.dict() for name, stats in results.items()
+                    },
+                },
+                file,
+                indent=2,
+            )
+        self.stdout.write(self.style.SUCCESS(f"Results saved to {options['output']}."))
+
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as file:
+                baseline = json.load(file)
+
+            regressions = []
+            for name, before, after, regressed in compare(
+                results, baseline, options["threshold"]
+            ):
+                change = f"{(after - before) / before:+.1%}" if before else "n/a"
+                self.stdout.write(
+                    f"{name:<24} {before:9.3f} ms -> {after:9.3f} ms ({change})"
+                )
+                if regressed:
+                    regressions.append(name)
+
+            if regressions:
+                raise CommandError(f"Performance regressions: {', '.join(regressions)}")
+
+    def _run(self, options: dict[str, Any]) -> tuple[dict, dict]:
+        """
+        Выполнение замеров на отдельной базе данных (как и автоматические тесты)
+        и с отдельными базами данных Redis.
+
+        :param options: Опции консольной команды.
+        :return: Результаты замеров и описание окружения
+        """
+
+        try:
+            caches_settings = get_isolated_caches(options["redis_db"])
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+
+        runner = BenchmarkRunner(
+            rounds=options["rounds"],
+            warmup=options["warmup"],
+            cities=options["cities"],
+        )
+        old_config = setup_databases(
+            verbosity=0, interactive=False, keepdb=options["keepdb"]
+        )
+        try:
+            with override_settings(CACHES=caches_settings):
+                self._clear_caches()
+                try:
+                    return runner.run(options["names"]), runner.get_environment()
+                finally:
+                    self._clear_caches()
+        finally:
+            teardown_databases(old_config, verbosity=0, keepdb=options["keepdb"])
+
+    @staticmethod
+    def _clear_caches() -> None:
+        """
+        Очистка кэшей, используемых при замерах.
+
+        :return:
+        """
+
+        for alias in caches:
+            caches[alias].clear()
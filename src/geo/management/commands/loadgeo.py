@@ -0,0 +1,107 @@
+import os
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from geo.management.commands._loader import GeoLoader
+from geo.services.autocomplete import AutocompleteService
+
+
+class Command(BaseCommand):
+    """
+    Реализация функций консольной команды.
+
+    https://docs.djangoproject.com/en/4.1/howto/custom-management-commands
+    """
+
+    help = "Загрузка наборов данных о странах и городах из файла."
+
+    argument_path: str = "path"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """
+        Добавление аргументов для команды.
+
+        :param parser: Объект парсера консольной команды.
+        :return:
+        """
+
+        parser.add_argument(
+            self.argument_path,
+            type=str,
+            help="Путь к файлу с данными",
+        )
+        parser.add_argument(
+            "--kind",
+            choices=["countries", "cities"],
+            default="cities",
+            help="Тип данных",
+        )
+        parser.add_argument(
+            "--format",
+            choices=["csv", "jsonl", "geonames"],
+            help="Формат файла (по умолчанию определяется по расширению)",
+        )
+        parser.add_argument(
+            "--delimiter",
+            type=str,
+            default=",",
+            help="Разделитель колонок для формата csv",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10_000,
+            help="Количество записей в пакете",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            type=str,
+            help="Путь к файлу контрольной точки (по умолчанию <path>.checkpoint)",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Начать загрузку сначала, игнорируя контрольную точку",
+        )
+
+    def handle(self, *args: tuple, **options: Any) -> None:
+        """
+        Выполнение консольной команды.
+        https://docs.python.org/3/library/argparse.html#example
+
+        :param args: Позиционные аргументы консольной команды.
+        :param options: Опции консольной команды.
+        :return:
+        """
+
+        path = str(options[self.argument_path])
+        if not os.path.isfile(path):
+            raise CommandError(f"Файл '{path}' не найден.")
+
+        file_format = options["format"]
+        if not file_format:
+            extension = os.path.splitext(path)[1].lower()
+            file_format = {".jsonl": "jsonl", ".txt": "geonames"}.get(extension, "csv")
+
+        loader = GeoLoader(
+            kind=options["kind"],
+            batch_size=options["batch_size"],
+            checkpoint_path=options["checkpoint"] or f"{path}.checkpoint",
+        )
+        stats = loader.load(
+            path=path,
+            file_format=file_format,
+            delimiter=options["delimiter"],
+            restart=options["restart"],
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Loaded {stats.rows} rows ({stats.merged} merged, {stats.skipped} skipped) "
+                f"in {stats.seconds:.1f} s, {stats.rows_per_second:.0f} rows/sec."
+            )
+        )
+        # индекс автодополнения перестраивается после импорта (без брокера задач)
+        total = AutocompleteService().rebuild()
+        self.stdout.write(f"Autocomplete index has been rebuilt: {total} entries.")
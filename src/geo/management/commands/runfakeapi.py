@@ -0,0 +1,91 @@
+from http.server import ThreadingHTTPServer
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from geo.management.commands._fakeapi import (
+    FakeApiConfigDTO,
+    FakeApiHandler,
+    FakeApiState,
+)
+
+
+class Command(BaseCommand):
+    """
+    Реализация функций консольной команды.
+
+    https://docs.djangoproject.com/en/4.1/howto/custom-management-commands
+    """
+
+    help = (
+        "Запуск сервера, имитирующего внешние API (APILayer, OpenWeather, NewsAPI) "
+        "для нагрузочного тестирования без доступа к ним."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """
+        Добавление аргументов для команды.
+
+        :param parser: Объект парсера консольной команды.
+        :return:
+        """
+
+        parser.add_argument(
+            "addrport",
+            nargs="?",
+            default="0.0.0.0:8030",
+            help="Адрес и порт сервера",
+        )
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.0,
+            help="Средняя задержка ответа (в миллисекундах)",
+        )
+        parser.add_argument(
+            "--jitter",
+            type=float,
+            default=0.0,
+            help="Случайное отклонение задержки ответа (в миллисекундах)",
+        )
+        parser.add_argument(
+            "--error-rate",
+            type=float,
+            default=0.0,
+            help="Доля запросов, завершающихся ошибкой 503",
+        )
+        parser.add_argument(
+            "--rate-limit",
+            type=float,
+            default=0.0,
+            help="Допустимое количество запросов в секунду для ключа API (0 – без ограничений)",
+        )
+
+    def handle(self, *args: tuple, **options: Any) -> None:
+        """
+        Выполнение консольной команды.
+        https://docs.python.org/3/library/argparse.html#example
+
+        :param args: Позиционные аргументы консольной команды.
+        :param options: Опции консольной команды.
+        :return:
+        """
+
+        host, _, port = options["addrport"].rpartition(":")
+        FakeApiHandler.state = FakeApiState(
+            FakeApiConfigDTO(
+                latency=options["latency"],
+                jitter=options["jitter"],
+                error_rate=options["error_rate"],
+                rate_limit=options["rate_limit"],
+            )
+        )
+
+        server = ThreadingHTTPServer((host or "0.0.0.0", int(port)), FakeApiHandler)
+        self.stdout.write(f"Fake API is listening on {host or '0.0.0.0'}:{port}...")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,59 @@
+# Generated by Django 4.0.10 on 2026-10-19 15:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("geo", "0002_alter_city_region"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CurrencyRates",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Время создания записи"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, verbose_name="Время обновления записи"
+                    ),
+                ),
+                ("base", models.CharField(max_length=3, verbose_name="Базовая валюта")),
+                ("date", models.DateField(verbose_name="Дата курсов")),
+                (
+                    "rates",
+                    models.JSONField(
+                        help_text="Количество единиц валюты за единицу базовой валюты",
+                        verbose_name="Курсы валют",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Курсы валют",
+                "verbose_name_plural": "Курсы валют",
+                "ordering": ["-date"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="currencyrates",
+            constraint=models.UniqueConstraint(
+                fields=("base", "date"), name="unique_currency_rates_base_date"
+            ),
+        ),
+    ]
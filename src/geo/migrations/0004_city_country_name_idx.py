@@ -0,0 +1,19 @@
+# Generated by Django 4.0.10 on 2026-10-19 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("geo", "0003_currencyrates"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="city",
+            index=models.Index(
+                fields=["country", "name", "region"], name="geo_city_country_name_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.0.10 on 2026-10-19 15:13
+
+from django.db import migrations, models
+import django.db.models.expressions
+import django.db.models.functions.math
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("geo", "0004_city_country_name_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="city",
+            index=models.Index(
+                django.db.models.functions.math.Floor(
+                    django.db.models.expressions.CombinedExpression(
+                        django.db.models.expressions.F("latitude"),
+                        "*",
+                        django.db.models.expressions.Value(10),
+                    )
+                ),
+                django.db.models.functions.math.Floor(
+                    django.db.models.expressions.CombinedExpression(
+                        django.db.models.expressions.F("longitude"),
+                        "*",
+                        django.db.models.expressions.Value(10),
+                    )
+                ),
+                name="geo_city_grid_cell_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.0.10 on 2026-10-19 15:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("geo", "0005_city_grid_cell_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="city",
+            name="population",
+            field=models.IntegerField(default=0, verbose_name="Население"),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.0.10 on 2026-10-19 15:46
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently  # type: ignore
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # индексы больших таблиц создаются без блокировки записи
+    atomic = False
+
+    dependencies = [
+        ("geo", "0006_city_population"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="city",
+            index=models.Index(
+                fields=["updated_at", "id"], name="geo_city_updated_at_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="city",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.search.SearchVector(
+                    "name", "region", config="simple"
+                ),
+                name="geo_city_search_idx",
+            ),
+        ),
+    ]
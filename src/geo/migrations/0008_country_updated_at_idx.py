@@ -0,0 +1,19 @@
+# Generated by Django 4.0.10 on 2026-10-19 15:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("geo", "0007_city_admin_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="country",
+            index=models.Index(
+                fields=["updated_at", "id"], name="geo_country_updated_at_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.0.10 on 2026-10-19 16:15
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from django.contrib.postgres.operations import AddIndexConcurrently  # type: ignore
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # индексы больших таблиц создаются без блокировки записи
+    atomic = False
+
+    dependencies = [
+        ("geo", "0008_country_updated_at_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="city",
+            name="checked_at",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                null=True,
+                verbose_name="Время проверки данных",
+            ),
+        ),
+        migrations.AddField(
+            model_name="country",
+            name="checked_at",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                null=True,
+                verbose_name="Время проверки данных",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="city",
+            index=models.Index(
+                django.db.models.functions.comparison.Coalesce(
+                    "checked_at", "updated_at"
+                ),
+                django.db.models.expressions.F("id"),
+                name="geo_city_checked_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="country",
+            index=models.Index(
+                django.db.models.functions.comparison.Coalesce(
+                    "checked_at", "updated_at"
+                ),
+                django.db.models.expressions.F("id"),
+                name="geo_country_checked_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.0.10 on 2026-10-19 16:25
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently  # type: ignore
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # индекс большой таблицы создается без блокировки записи
+    atomic = False
+
+    dependencies = [
+        ("geo", "0009_refresh_checked_at"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="city",
+            index=models.Index(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Lower("name"),
+                    name="text_pattern_ops",
+                ),
+                name="geo_city_name_prefix_idx",
+            ),
+        ),
+    ]
@@ -1,9 +1,15 @@
 """Сущности для основной БД."""
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.validators import MinLengthValidator
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Coalesce, Floor, Lower
 
-from base.models import TimeStampMixin
+from base.models import TimeStampMixin, build_search_vector
+
+# количество ячеек сетки координат на один градус (для индекса поиска ближайших городов)
+CITY_GRID_SCALE = 10
 
 
 class Country(TimeStampMixin):
@@ -61,6 +67,10 @@ class Country(TimeStampMixin):
         models.CharField(max_length=20),
         verbose_name="Языки",
     )
+    # время последней проверки данных во внешнем API при фоновом обновлении
+    checked_at = models.DateTimeField(
+        null=True, blank=True, editable=False, verbose_name="Время проверки данных"
+    )
 
     def __str__(self) -> str:
         return self.name
@@ -69,6 +79,18 @@ class Country(TimeStampMixin):
         verbose_name = "Страна"
         verbose_name_plural = "Страны"
         ordering = ["name"]
+        indexes = [
+            # лента изменений (постраничный вывод по времени обновления)
+            models.Index(
+                fields=["updated_at", "id"], name="geo_country_updated_at_idx"
+            ),
+            # выбор давно не проверявшихся записей при фоновом обновлении
+            models.Index(
+                Coalesce("checked_at", "updated_at"),
+                "id",
+                name="geo_country_checked_idx",
+            ),
+        ]
 
 
 class City(TimeStampMixin):
@@ -88,6 +110,14 @@ class City(TimeStampMixin):
     longitude = models.FloatField(
         verbose_name="Долгота",
     )
+    population = models.IntegerField(
+        default=0,
+        verbose_name="Население",
+    )
+    # время последней проверки данных во внешнем API при фоновом обновлении
+    checked_at = models.DateTimeField(
+        null=True, blank=True, editable=False, verbose_name="Время проверки данных"
+    )
 
     def __str__(self) -> str:
         return self.name
@@ -96,3 +126,52 @@ class City(TimeStampMixin):
         verbose_name = "Город"
         verbose_name_plural = "Города"
         ordering = ["name"]
+        indexes = [
+            # поиск существующих городов при загрузке наборов данных
+            models.Index(
+                fields=["country", "name", "region"], name="geo_city_country_name_idx"
+            ),
+            # фильтрация по дате обновления и лента изменений
+            models.Index(fields=["updated_at", "id"], name="geo_city_updated_at_idx"),
+            # выбор давно не проверявшихся записей при фоновом обновлении
+            models.Index(
+                Coalesce("checked_at", "updated_at"), "id", name="geo_city_checked_idx"
+            ),
+            # полнотекстовый поиск в административном интерфейсе
+            GinIndex(build_search_vector("name", "region"), name="geo_city_search_idx"),
+            # поиск по префиксу названия при автодополнении длинных префиксов
+            models.Index(
+                OpClass(Lower("name"), name="text_pattern_ops"),
+                name="geo_city_name_prefix_idx",
+            ),
+            # ячейки сетки координат для поиска ближайших городов
+            models.Index(
+                Floor(F("latitude") * CITY_GRID_SCALE),
+                Floor(F("longitude") * CITY_GRID_SCALE),
+                name="geo_city_grid_cell_idx",
+            ),
+        ]
+
+
+class CurrencyRates(TimeStampMixin):
+    """Модель снимка курсов валют"""
+
+    base = models.CharField(max_length=3, verbose_name="Базовая валюта")
+    date = models.DateField(verbose_name="Дата курсов")
+    rates = models.JSONField(
+        verbose_name="Курсы валют",
+        help_text="Количество единиц валюты за единицу базовой валюты",
+    )
+
+    def __str__(self) -> str:
+        return f"{self.base} {self.date}"
+
+    class Meta:
+        verbose_name = "Курсы валют"
+        verbose_name_plural = "Курсы валют"
+        ordering = ["-date"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["base", "date"], name="unique_currency_rates_base_date"
+            ),
+        ]
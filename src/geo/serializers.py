@@ -1,9 +1,10 @@
 from rest_framework import serializers
 
+from base.serializers import SparseFieldsMixin
 from geo.models import Country, City
 
 
-class CountrySerializer(serializers.ModelSerializer):
+class CountrySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Сериализатор для данных о стране.
     """
@@ -30,7 +31,7 @@ class CountrySerializer(serializers.ModelSerializer):
         ]
 
 
-class CitySerializer(serializers.ModelSerializer):
+class CitySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Сериализатор для данных о городе.
     """
@@ -45,5 +46,25 @@ class CitySerializer(serializers.ModelSerializer):
             "region",
             "latitude",
             "longitude",
+            "population",
             "country",
         ]
+
+
+class CityDistanceSerializer(CitySerializer):
+    """
+    Сериализатор для данных о городе с расстоянием до точки поиска (в километрах).
+    """
+
+    distance = serializers.FloatField(read_only=True)
+
+    class Meta(CitySerializer.Meta):
+        fields = CitySerializer.Meta.fields + ["distance"]
+
+
+class CityChangeSerializer(CitySerializer):
+    """
+    Сериализатор для данных о городе в ленте изменений (страна передается идентификатором).
+    """
+
+    country = serializers.PrimaryKeyRelatedField(read_only=True)
@@ -0,0 +1,330 @@
+import json
+import logging
+import unicodedata
+import uuid
+from typing import Iterable, Iterator, Optional
+
+from celery import current_app
+from django.db.models import Q
+from django.db.models.functions import Lower
+from kombu.exceptions import OperationalError
+
+from app.settings import AUTOCOMPLETE_LIMIT, AUTOCOMPLETE_MAX_PREFIX
+from base.services.cache import get_redis_client
+from geo.models import City, Country
+
+logger = logging.getLogger()
+
+# префикс ключей индекса автодополнения
+KEY_PREFIX = "autocomplete"
+# ключ с версией индекса, используемой для поиска
+VERSION_KEY = f"{KEY_PREFIX}:version"
+# ключ блокировки постановки задачи перестройки индекса в очередь
+REBUILD_LOCK_KEY = f"{KEY_PREFIX}:rebuild_lock"
+# время блокировки повторной постановки задачи перестройки (в секундах)
+REBUILD_LOCK_TTL = 600
+# количество записей, обрабатываемых за одну итерацию перестройки индекса
+BATCH_SIZE = 5000
+
+
+def normalize(text: str) -> str:
+    """
+    Нормализация текста для поиска по префиксу: нижний регистр, без диакритических знаков.
+
+    :param text: Текст
+    :return:
+    """
+
+    decomposed = unicodedata.normalize("NFKD", text.strip().lower())
+
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+class AutocompleteService:
+    """
+    Сервис автодополнения названий городов и стран.
+
+    Для каждого префикса названия (до `AUTOCOMPLETE_MAX_PREFIX` символов) в Redis хранится
+    сортированное множество из `AUTOCOMPLETE_LIMIT` самых населенных мест, поэтому поиск
+    выполняется одним чтением сортированного множества. Более длинные префиксы ищутся
+    в БД, если множество усеченного префикса заполнено и может не содержать всех мест.
+    Пока индекс не построен (после развертывания или очистки Redis), поиск выполняется
+    в БД, а перестройка индекса ставится в очередь задач.
+    """
+
+    def __init__(self) -> None:
+        self.client = get_redis_client("default")
+
+    def search(self, query: str, limit: int = AUTOCOMPLETE_LIMIT) -> list[dict]:
+        """
+        Поиск городов и стран по префиксу названия.
+
+        :param query: Префикс названия
+        :param limit: Максимальное количество результатов
+        :return:
+        """
+
+        if not (prefix := normalize(query)):
+            return []
+        if not (version := self.client.get(VERSION_KEY)):
+            self._schedule_rebuild()
+            return self._search_db(query, prefix, limit)
+
+        members = self.client.zrevrange(
+            self._key(version.decode(), prefix[:AUTOCOMPLETE_MAX_PREFIX]),
+            0,
+            AUTOCOMPLETE_LIMIT - 1,
+        )
+        items = [json.loads(member) for member in members]
+        if len(prefix) > AUTOCOMPLETE_MAX_PREFIX:
+            # длинные префиксы дополнительно проверяются по полному названию
+            items = [
+                item for item in items if normalize(item["name"]).startswith(prefix)
+            ]
+            if len(items) < limit and len(members) >= AUTOCOMPLETE_LIMIT:
+                return self._search_db(query, prefix, limit)
+
+        return items[:limit]
+
+    def _search_db(self, query: str, prefix: str, limit: int) -> list[dict]:
+        """
+        Поиск городов и стран по префиксу названия в БД (для префиксов длиннее индексируемых).
+
+        Города выбираются по индексу `Lower(name)` по префиксу в исходном и в нормализованном
+        виде, совпадение проверяется по нормализованному названию.
+
+        :param query: Префикс названия
+        :param prefix: Нормализованный префикс названия
+        :param limit: Максимальное количество результатов
+        :return:
+        """
+
+        condition = Q(lower_name__startswith=query.strip().lower()) | Q(
+            lower_name__startswith=prefix
+        )
+        entries = [
+            self._build_country_entry(*values)
+            for values in Country.objects.alias(lower_name=Lower("name"))
+            .filter(condition)
+            .order_by("-population")
+            .values_list("pk", "name", "alpha2code", "population")[:limit]
+        ]
+        entries.extend(
+            self._build_city_entry(*values)
+            for values in City.objects.alias(lower_name=Lower("name"))
+            .filter(condition)
+            .order_by("-population")
+            .values_list("pk", "name", "country__alpha2code", "population")[:limit]
+        )
+        entries.sort(key=lambda entry: entry[1], reverse=True)
+
+        return [
+            json.loads(member) for name, _, member in entries if name.startswith(prefix)
+        ][:limit]
+
+    def rebuild(self) -> int:
+        """
+        Перестройка индекса по всем странам и городам из БД.
+
+        Новый индекс строится под новой версией и становится доступен после завершения
+        построения; ключи предыдущей версии удаляются.
+
+        :return: Количество проиндексированных записей
+        """
+
+        version = uuid.uuid4().hex
+        total = 0
+        batch: list[tuple[str, float, str]] = []
+        for item in self._iter_entries():
+            batch.append(item)
+            if len(batch) >= BATCH_SIZE:
+                self._write(version, batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            self._write(version, batch)
+            total += len(batch)
+
+        previous = self.client.getset(VERSION_KEY, version)
+        if previous:
+            self._delete_version(previous.decode())
+        self.client.delete(REBUILD_LOCK_KEY)
+
+        logger.info("Autocomplete index has been rebuilt: %s entries.", total)
+
+        return total
+
+    def add_cities(self, cities: Iterable[City]) -> None:
+        """
+        Добавление городов в текущую версию индекса (например, после импорта).
+
+        :param cities: Города (со связанной страной)
+        :return:
+        """
+
+        if not (version := self.client.get(VERSION_KEY)):
+            # записи будут добавлены при построении индекса
+            self._schedule_rebuild()
+        else:
+            self._write(
+                version.decode(),
+                [
+                    self._build_city_entry(
+                        city.pk,
+                        city.name,
+                        city.country.alpha2code,
+                        city.population,
+                    )
+                    for city in cities
+                ],
+            )
+
+    def add_countries(self, countries: Iterable[Country]) -> None:
+        """
+        Добавление стран в текущую версию индекса (например, после импорта).
+
+        :param countries: Страны
+        :return:
+        """
+
+        if not (version := self.client.get(VERSION_KEY)):
+            # записи будут добавлены при построении индекса
+            self._schedule_rebuild()
+        else:
+            self._write(
+                version.decode(),
+                [
+                    self._build_country_entry(
+                        country.pk, country.name, country.alpha2code, country.population
+                    )
+                    for country in countries
+                ],
+            )
+
+    def _schedule_rebuild(self) -> None:
+        """
+        Постановка задачи перестройки индекса в очередь (не чаще одного раза
+        за `REBUILD_LOCK_TTL` секунд для всех процессов).
+
+        :return:
+        """
+
+        if not self.client.set(REBUILD_LOCK_KEY, 1, nx=True, ex=REBUILD_LOCK_TTL):
+            return
+
+        try:
+            # без повторных попыток, чтобы не задерживать ответ при недоступном брокере
+            current_app.send_task("rebuild_autocomplete", retry=False)
+        except OperationalError:
+            # брокер задач недоступен: постановка повторяется при следующем запросе
+            self.client.delete(REBUILD_LOCK_KEY)
+            logger.warning("Failed to schedule autocomplete rebuild.", exc_info=True)
+        else:
+            logger.info("Autocomplete index is missing, rebuild has been scheduled.")
+
+    def _iter_entries(self) -> Iterator[tuple[str, float, str]]:
+        """
+        Получение записей индекса из БД без загрузки всех записей в память.
+
+        :return: Нормализованное название, вес и сериализованные данные записи
+        """
+
+        for values in (
+            Country.objects.order_by()
+            .values_list("pk", "name", "alpha2code", "population")
+            .iterator(chunk_size=BATCH_SIZE)
+        ):
+            yield self._build_country_entry(*values)
+
+        for city_values in (
+            City.objects.order_by()
+            .values_list("pk", "name", "country__alpha2code", "population")
+            .iterator(chunk_size=BATCH_SIZE)
+        ):
+            yield self._build_city_entry(*city_values)
+
+    @staticmethod
+    def _build_country_entry(
+        pk: int, name: str, alpha2code: str, population: Optional[int]
+    ) -> tuple[str, float, str]:
+        """
+        Формирование записи индекса для страны.
+
+        :param pk: Идентификатор страны
+        :param name: Название страны
+        :param alpha2code: ISO Alpha2 код страны
+        :param population: Население
+        :return:
+        """
+
+        member = {"type": "country", "id": pk, "name": name, "alpha2code": alpha2code}
+
+        return normalize(name), float(population or 0), json.dumps(member)
+
+    @staticmethod
+    def _build_city_entry(
+        pk: int, name: str, alpha2code: str, population: Optional[int]
+    ) -> tuple[str, float, str]:
+        """
+        Формирование записи индекса для города.
+
+        :param pk: Идентификатор города
+        :param name: Название города
+        :param alpha2code: ISO Alpha2 код страны
+        :param population: Население
+        :return:
+        """
+
+        member = {"type": "city", "id": pk, "name": name, "alpha2code": alpha2code}
+
+        return normalize(name), float(population or 0), json.dumps(member)
+
+    def _write(self, version: str, entries: list[tuple[str, float, str]]) -> None:
+        """
+        Запись пакета записей в сортированные множества префиксов
+        с сохранением в каждом множестве только самых населенных мест.
+
+        :param version: Версия индекса
+        :param entries: Записи индекса
+        :return:
+        """
+
+        keys = set()
+        with self.client.pipeline(transaction=False) as pipe:
+            for name, score, member in entries:
+                for length in range(1, min(len(name), AUTOCOMPLETE_MAX_PREFIX) + 1):
+                    key = self._key(version, name[:length])
+                    keys.add(key)
+                    pipe.zadd(key, {member: score})
+            for key in keys:
+                pipe.zremrangebyrank(key, 0, -AUTOCOMPLETE_LIMIT - 1)
+            pipe.execute()
+
+    def _delete_version(self, version: str) -> None:
+        """
+        Удаление ключей указанной версии индекса.
+
+        :param version: Версия индекса
+        :return:
+        """
+
+        keys = []
+        for key in self.client.scan_iter(match=f"{KEY_PREFIX}:{version}:*", count=1000):
+            keys.append(key)
+            if len(keys) >= 1000:
+                self.client.unlink(*keys)
+                keys = []
+        if keys:
+            self.client.unlink(*keys)
+
+    @staticmethod
+    def _key(version: str, prefix: str) -> str:
+        """
+        Формирование ключа сортированного множества для префикса.
+
+        :param version: Версия индекса
+        :param prefix: Нормализованный префикс названия
+        :return:
+        """
+
+        return f"{KEY_PREFIX}:{version}:{prefix}"
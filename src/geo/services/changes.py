@@ -0,0 +1,163 @@
+"""
+Лента изменений стран и городов для инкрементальной синхронизации.
+"""
+import base64
+import heapq
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Optional, Union
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Q, QuerySet
+from pydantic import ValidationError
+
+from app.settings import CHANGES_DELAY
+from geo.models import City, Country
+from geo.services.shemas import ChangeCursorDTO
+
+# типы записей ленты в порядке сортировки при совпадении времени обновления
+KIND_COUNTRY = "country"
+KIND_CITY = "city"
+KINDS = (KIND_COUNTRY, KIND_CITY)
+
+
+class ChangesService:
+    """
+    Сервис ленты изменений.
+
+    Записи упорядочены по времени обновления, типу и идентификатору, а позиция в ленте
+    передается курсором, поэтому каждая страница выбирается по индексу `(updated_at, id)`
+    за время, не зависящее от количества ранее полученных изменений.
+    Удаленные записи в ленту не попадают.
+
+    Лента читается из основной БД: граница ленты определяется по ее незавершенным
+    транзакциям (`get_until`), а реплика может еще не содержать зафиксированные записи.
+    """
+
+    @staticmethod
+    def encode_cursor(cursor: ChangeCursorDTO) -> str:
+        """
+        Формирование строкового представления курсора.
+
+        :param cursor: Позиция в ленте
+        :return:
+        """
+
+        return base64.urlsafe_b64encode(cursor.json().encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(value: str) -> Optional[ChangeCursorDTO]:
+        """
+        Разбор строкового представления курсора.
+
+        :param value: Строковое представление курсора
+        :return: Позиция в ленте или None, если курсор некорректен
+        """
+
+        try:
+            cursor = ChangeCursorDTO.parse_raw(
+                base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+            )
+        except (ValueError, ValidationError):
+            return None
+
+        return cursor if cursor.kind in KINDS else None
+
+    def get_changes(
+        self, cursor: Optional[ChangeCursorDTO], limit: int
+    ) -> tuple[list[tuple[str, Union[Country, City]]], Optional[ChangeCursorDTO], bool]:
+        """
+        Получение записей, измененных после позиции курсора.
+
+        :param cursor: Позиция в ленте (None – с начала ленты)
+        :param limit: Максимальное количество записей
+        :return: Записи с их типом, позиция последней записи и признак наличия следующих записей
+        """
+
+        until = self.get_until()
+        querysets = {
+            KIND_COUNTRY: Country.objects.using(DEFAULT_DB_ALIAS),
+            KIND_CITY: City.objects.using(DEFAULT_DB_ALIAS),
+        }
+
+        rows = heapq.merge(
+            *(
+                [
+                    (item.updated_at, KINDS.index(kind), item.pk, kind, item)
+                    for item in self._get_page(queryset, kind, cursor, until, limit + 1)
+                ]
+                for kind, queryset in querysets.items()
+            )
+        )
+        changes = [row[3:] for row in islice(rows, limit + 1)]
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        if changes:
+            kind, item = changes[-1]
+            cursor = ChangeCursorDTO(updated_at=item.updated_at, kind=kind, id=item.pk)
+
+        return changes, cursor, has_more
+
+    @staticmethod
+    def get_until() -> datetime:
+        """
+        Получение максимального времени обновления записей, возвращаемых лентой.
+
+        Время обновления устанавливается при записи, а не при фиксации транзакции
+        (загрузчик использует время начала транзакции, `auto_now` – время сохранения),
+        поэтому запись может стать видимой позже записей с большим временем обновления.
+        Все записи со временем обновления раньше начала самой ранней незавершенной
+        транзакции уже зафиксированы, а `CHANGES_DELAY` учитывает расхождение часов.
+        Для учета транзакций других пользователей БД роли приложения требуется
+        роль `pg_read_all_stats`.
+
+        :return:
+        """
+
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT least(now(), min(xact_start))
+                FROM pg_stat_activity
+                WHERE datname = current_database()
+                  AND backend_type = 'client backend'
+                  AND pid <> pg_backend_pid()
+                """
+            )
+            oldest = cursor.fetchone()[0]
+
+        return oldest - timedelta(seconds=CHANGES_DELAY)
+
+    @staticmethod
+    def _get_page(
+        queryset: QuerySet,
+        kind: str,
+        cursor: Optional[ChangeCursorDTO],
+        until: datetime,
+        limit: int,
+    ) -> QuerySet:
+        """
+        Выборка записей одного типа, следующих за позицией курсора.
+
+        :param queryset: Выборка записей
+        :param kind: Тип записей
+        :param cursor: Позиция в ленте
+        :param until: Максимальное время обновления
+        :param limit: Максимальное количество записей
+        :return:
+        """
+
+        queryset = queryset.filter(updated_at__lte=until)
+        if cursor:
+            queryset = queryset.filter(updated_at__gte=cursor.updated_at)
+            position = KINDS.index(kind) - KINDS.index(cursor.kind)
+            if position < 0:
+                # записи этого типа с тем же временем уже получены
+                queryset = queryset.filter(updated_at__gt=cursor.updated_at)
+            elif position == 0:
+                queryset = queryset.filter(
+                    Q(updated_at__gt=cursor.updated_at) | Q(pk__gt=cursor.id)
+                )
+
+        return queryset.order_by("updated_at", "pk")[:limit]
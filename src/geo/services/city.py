@@ -1,15 +1,97 @@
-from typing import Set
+from typing import Optional, Set
 
-from django.db.models import Q, QuerySet
-from django.db.models.functions import Lower
+import math
 
+from django.db.models import F, FloatField, Q, QuerySet, Value
+from django.db.models.functions import (
+    ASin,
+    Cos,
+    Floor,
+    Least,
+    Lower,
+    Power,
+    Radians,
+    Sin,
+    Sqrt,
+)
+
+from app.settings import CITY_NEAR_MAX_RADIUS, GEO_INDEX_ENABLED
+from base.routers import get_read_database
+from base.services.etag import get_queryset_etag
+from base.services.fields import restrict_queryset
 from geo.clients.geo import GeoClient
 from geo.clients.shemas import CityDTO
-from geo.models import Country, City
+from geo.models import CITY_GRID_SCALE, Country, City
+from geo.services.autocomplete import AutocompleteService
 from geo.services.country import CountryService
 from geo.services.shemas import CountryCityDTO
 
 
+# средний радиус Земли (в километрах)
+EARTH_RADIUS = 6371.0088
+
+
+def _split_longitudes(min_lon: float, max_lon: float) -> list[tuple[float, float]]:
+    """
+    Разбиение диапазона долгот, пересекающего антимеридиан, на корректные диапазоны.
+
+    :param min_lon: Минимальная долгота (может быть меньше -180)
+    :param max_lon: Максимальная долгота (может быть больше 180)
+    :return:
+    """
+
+    if max_lon - min_lon >= 360:
+        return [(-180.0, 180.0)]
+    if min_lon < -180:
+        return [(min_lon + 360, 180.0), (-180.0, max_lon)]
+    if max_lon > 180:
+        return [(min_lon, 180.0), (-180.0, max_lon - 360)]
+
+    return [(min_lon, max_lon)]
+
+
+def _get_grid_conditions(latitude: float, longitude: float, radius: float) -> Q:
+    """
+    Формирование условий выборки по ячейкам сетки координат, покрывающим
+    окружающий точку прямоугольник.
+
+    :param latitude: Широта точки
+    :param longitude: Долгота точки
+    :param radius: Радиус поиска (в километрах)
+    :return:
+    """
+
+    # границы окружающего прямоугольника
+    lat_delta = math.degrees(radius / EARTH_RADIUS)
+    min_lat, max_lat = max(latitude - lat_delta, -90.0), min(latitude + lat_delta, 90.0)
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        # у полюсов прямоугольник охватывает все долготы
+        lon_ranges = [(-180.0, 180.0)]
+    else:
+        lon_delta = math.degrees(
+            radius
+            / (EARTH_RADIUS * math.cos(math.radians(max(abs(min_lat), abs(max_lat)))))
+        )
+        lon_ranges = _split_longitudes(longitude - lon_delta, longitude + lon_delta)
+
+    # условия по ячейкам сетки: для каждой строки ячеек по широте – диапазон ячеек по долготе
+    conditions = Q()
+    for cell_lat in range(
+        math.floor(min_lat * CITY_GRID_SCALE),
+        math.floor(max_lat * CITY_GRID_SCALE) + 1,
+    ):
+        for min_lon, max_lon in lon_ranges:
+            conditions |= Q(
+                cell_lat=cell_lat,
+                cell_lon__range=(
+                    math.floor(min_lon * CITY_GRID_SCALE),
+                    math.floor(max_lon * CITY_GRID_SCALE),
+                ),
+            )
+
+    return conditions
+
+
 class CityService:
     """
     Сервис для работы с данными о городах.
@@ -18,16 +100,17 @@ class CityService:
     def __init__(self) -> None:
         self.geo_client = GeoClient()
 
-    def get_cities(self, name: str) -> QuerySet[City]:
+    def get_cities(self, name: str, only: Optional[list[str]] = None) -> QuerySet[City]:
         """
         Получение списка городов по названию.
 
         :param name: Название города
+        :param only: Поля модели для выборки (None – все поля)
         :return:
         """
 
-        cities_db = City.objects.prefetch_related("country").filter(
-            Q(name__iregex=name) | Q(region__iregex=name)
+        cities_db = restrict_queryset(
+            self._search_cities(name).prefetch_related("country"), only
         )
         if not cities_db:
             if cities_api := self.geo_client.get_cities(name):
@@ -67,18 +150,174 @@ class CityService:
                     self._save_cities(cities_to_save)
 
                     # поиск нужной страны в БД после импорта новых городов
-                    cities_db = City.objects.prefetch_related("country").filter(
-                        Q(name__iregex=name) | Q(region__iregex=name)
-                    )
+                    cities_db = self._search_cities(name).prefetch_related("country")
+                    # добавление новых городов в индекс автодополнения
+                    AutocompleteService().add_cities(cities_db)
+                    cities_db = restrict_queryset(cities_db, only)
 
         return cities_db
 
+    def get_cities_etag(self, name: str) -> Optional[str]:
+        """
+        Получение ETag для списка городов по названию.
+
+        :param name: Название города
+        :return:
+        """
+
+        return get_queryset_etag(self._search_cities(name), "country__updated_at")
+
+    def get_city(self, alpha2code: str, name: str) -> Optional[City]:
+        """
+        Получение города по ISO Alpha2 коду страны и точному названию.
+
+        Если город не найден в БД, то выполняется его импорт из API.
+
+        :param alpha2code: ISO Alpha2 код страны
+        :param name: Название города
+        :return:
+        """
+
+        cities = City.objects.filter(
+            name__iexact=name, country__alpha2code__iexact=alpha2code
+        ).select_related("country")
+        if city := cities.first():
+            return city
+
+        if self.get_cities(name):
+            return cities.first()
+
+        return None
+
     @staticmethod
-    def get_cities_by_codes(codes: set[CountryCityDTO]) -> QuerySet:
+    def get_nearest_cities(
+        latitude: float,
+        longitude: float,
+        radius: float,
+        limit: int,
+        only: Optional[list[str]] = None,
+    ) -> QuerySet[City]:
+        """
+        Получение ближайших к точке городов в пределах радиуса.
+
+        Кандидаты отбираются по ячейкам сетки координат, покрывающим окружающий прямоугольник
+        (с использованием индекса), и ранжируются по точному расстоянию (формула гаверсинусов).
+        Результат содержит расстояние до точки в километрах (атрибут `distance`).
+
+        :param latitude: Широта точки
+        :param longitude: Долгота точки
+        :param radius: Радиус поиска (в километрах)
+        :param limit: Максимальное количество городов
+        :param only: Поля модели для выборки (None – все поля)
+        :return:
+        """
+
+        conditions = _get_grid_conditions(latitude, longitude, radius)
+
+        lat1 = math.radians(latitude)
+        haversine = Power(Sin((Radians(F("latitude")) - lat1) / 2), 2) + math.cos(
+            lat1
+        ) * Cos(Radians(F("latitude"))) * Power(
+            Sin((Radians(F("longitude")) - math.radians(longitude)) / 2), 2
+        )
+
+        return restrict_queryset(
+            City.objects.annotate(
+                cell_lat=Floor(F("latitude") * CITY_GRID_SCALE),
+                cell_lon=Floor(F("longitude") * CITY_GRID_SCALE),
+            )
+            .filter(conditions)
+            .annotate(
+                distance=2
+                * EARTH_RADIUS
+                * ASin(Sqrt(Least(haversine, Value(1.0))), output_field=FloatField())
+            )
+            .filter(distance__lte=radius)
+            .select_related("country")
+            .order_by("distance"),
+            only,
+        )[:limit]
+
+    def reverse_geocode(
+        self, points: list[tuple[float, float]]
+    ) -> list[Optional[dict]]:
+        """
+        Поиск ближайшего города для каждой из точек.
+
+        При включенном `GEO_INDEX_ENABLED` поиск выполняется одним векторизованным запросом
+        к индексу координат в памяти процесса, иначе – запросом к БД для каждой точки
+        в пределах `CITY_NEAR_MAX_RADIUS`.
+
+        :param points: Список координат (широта, долгота)
+        :return: Данные о ближайшем городе (с расстоянием в километрах) для каждой точки
+        """
+
+        if not points:
+            return []
+
+        if not GEO_INDEX_ENABLED:
+            results = []
+            for latitude, longitude in points:
+                city = self.get_nearest_cities(
+                    latitude, longitude, CITY_NEAR_MAX_RADIUS, 1
+                ).first()
+                # расстояние – вычисляемый атрибут выборки
+                results.append(
+                    self._build_nearest(city, getattr(city, "distance"))
+                    if city
+                    else None
+                )
+
+            return results
+
+        # индекс загружается только при включенной настройке
+        from geo.services.geo_index import (  # pylint: disable=import-outside-toplevel
+            geo_index,
+        )
+
+        latitudes, longitudes = zip(*points)
+        ids, distances = geo_index.nearest(latitudes, longitudes)
+        if ids.size == 0:
+            return [None] * len(points)
+
+        cities = City.objects.select_related("country").in_bulk(set(ids.tolist()))
+
+        return [
+            self._build_nearest(cities[city_id], distance)
+            if city_id in cities
+            else None
+            for city_id, distance in zip(ids.tolist(), distances.tolist())
+        ]
+
+    @staticmethod
+    def _build_nearest(city: City, distance: float) -> dict:
+        """
+        Формирование данных о ближайшем городе.
+
+        :param City city: Город
+        :param float distance: Расстояние до города (в километрах)
+        :return:
+        """
+
+        return {
+            "id": city.pk,
+            "name": city.name,
+            "region": city.region,
+            "latitude": city.latitude,
+            "longitude": city.longitude,
+            "alpha2code": city.country.alpha2code,
+            "distance": distance,
+        }
+
+    @staticmethod
+    def get_cities_by_codes(
+        codes: set[CountryCityDTO], only: Optional[list[str]] = None
+    ) -> QuerySet:
         """
         Получение списка городов по ISO Alpha2 кодам стран и названиям городов.
 
         :param codes: Множество ISO Alpha2 кодов стран и названий городов.
+        :param only: Поля модели для выборки (None – все поля)
         :return:
         """
 
@@ -90,16 +329,39 @@ class CityService:
         for query in queries:
             conditions |= query
 
-        return (
-            City.objects.annotate(
+        return restrict_queryset(
+            City.objects.using(get_read_database())
+            .annotate(
                 city_name_lower=Lower("name"),
                 country_alpha2code_lower=Lower("country__alpha2code"),
             )
             .filter(conditions)
             .select_related("country")
-            .all()
+            .all(),
+            only,
         )
 
+    def get_cities_by_codes_etag(self, codes: set[CountryCityDTO]) -> Optional[str]:
+        """
+        Получение ETag для списка городов по ISO Alpha2 кодам стран и названиям городов.
+
+        :param codes: Множество ISO Alpha2 кодов стран и названий городов.
+        :return:
+        """
+
+        return get_queryset_etag(self.get_cities_by_codes(codes), "country__updated_at")
+
+    @staticmethod
+    def _search_cities(name: str) -> QuerySet[City]:
+        """
+        Формирование выборки городов по названию города или региона.
+
+        :param name: Название города
+        :return:
+        """
+
+        return City.objects.filter(Q(name__iregex=name) | Q(region__iregex=name))
+
     def build_model(self, city: CityDTO, country_id: int) -> City:
         """
         Формирование объекта модели города.
@@ -145,6 +407,8 @@ class CityService:
             countries,
             batch_size=1000,
         )
+        # добавление новых стран в индекс автодополнения
+        AutocompleteService().add_countries(countries)
 
     def _save_cities(self, cities: list[City]) -> None:
         """
@@ -159,3 +423,11 @@ class CityService:
             cities,
             batch_size=1000,
         )
+        if GEO_INDEX_ENABLED:
+            # индекс загружается только при включенной настройке
+            from geo.services.geo_index import (  # pylint: disable=import-outside-toplevel
+                geo_index,
+            )
+
+            # новые города добавляются в индекс координат фоновым потоком
+            geo_index.request_refresh()
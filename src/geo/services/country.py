@@ -3,9 +3,13 @@ from typing import Optional, Dict
 from django.db.models import Q, QuerySet
 from django.db.models.functions import Lower
 
+from base.routers import get_read_database
+from base.services.etag import get_queryset_etag
+from base.services.fields import restrict_queryset
 from geo.clients.geo import GeoClient
 from geo.clients.shemas import CountryDTO
 from geo.models import Country
+from geo.services.autocomplete import AutocompleteService
 
 
 class CountryService:
@@ -13,17 +17,18 @@ class CountryService:
     Сервис для работы с данными о странах.
     """
 
-    def get_countries(self, name: str) -> QuerySet[Country]:
+    def get_countries(
+        self, name: str, only: Optional[list[str]] = None
+    ) -> QuerySet[Country]:
         """
         Получение списка стран по названию.
 
         :param name: Название страны
+        :param only: Поля модели для выборки (None – все поля)
         :return:
         """
 
-        countries = Country.objects.filter(
-            Q(name__iregex=name) | Q(demonym__iregex=name)
-        )
+        countries = restrict_queryset(self._search_countries(name), only)
         if not countries:
             # если страна не найдена в БД, то – поиск в API и сохранение в БД
             if countries_data := GeoClient().get_countries(name):
@@ -32,12 +37,23 @@ class CountryService:
                     batch_size=1000,
                 )
                 # поиск нужной страны в БД после импорта новых стран
-                countries = Country.objects.filter(
-                    Q(name__iregex=name) | Q(demonym__iregex=name)
-                )
+                countries = self._search_countries(name)
+                # добавление новых стран в индекс автодополнения
+                AutocompleteService().add_countries(countries)
+                countries = restrict_queryset(countries, only)
 
         return countries
 
+    def get_countries_etag(self, name: str) -> Optional[str]:
+        """
+        Получение ETag для списка стран по названию.
+
+        :param name: Название страны
+        :return:
+        """
+
+        return get_queryset_etag(self._search_countries(name))
+
     @staticmethod
     def get_countries_codes() -> Optional[Dict[str, int]]:
         """
@@ -48,7 +64,8 @@ class CountryService:
         """
 
         if (
-            data := Country.objects.filter(alpha2code__isnull=False)
+            data := Country.objects.using(get_read_database())
+            .filter(alpha2code__isnull=False)
             .annotate(alpha2code_lower=Lower("alpha2code"))
             .values("pk", "alpha2code_lower")
         ):
@@ -57,22 +74,48 @@ class CountryService:
         return None
 
     @staticmethod
-    def get_countries_by_codes(codes: set[str]) -> QuerySet:
+    def get_countries_by_codes(
+        codes: set[str], only: Optional[list[str]] = None
+    ) -> QuerySet:
         """
         Получение списка стран по их ISO Alpha2 кодам.
 
         :param codes: Множество ISO Alpha2 кодов стран.
+        :param only: Поля модели для выборки (None – все поля)
         :return:
         """
 
         alpha2codes = [code.lower() for code in codes]
 
-        return (
-            Country.objects.annotate(alpha2code_lower=Lower("alpha2code"))
+        return restrict_queryset(
+            Country.objects.using(get_read_database())
+            .annotate(alpha2code_lower=Lower("alpha2code"))
             .filter(alpha2code_lower__in=alpha2codes)
-            .all()
+            .all(),
+            only,
         )
 
+    def get_countries_by_codes_etag(self, codes: set[str]) -> Optional[str]:
+        """
+        Получение ETag для списка стран по их ISO Alpha2 кодам.
+
+        :param codes: Множество ISO Alpha2 кодов стран.
+        :return:
+        """
+
+        return get_queryset_etag(self.get_countries_by_codes(codes))
+
+    @staticmethod
+    def _search_countries(name: str) -> QuerySet[Country]:
+        """
+        Формирование выборки стран по названию или демониму.
+
+        :param name: Название страны
+        :return:
+        """
+
+        return Country.objects.filter(Q(name__iregex=name) | Q(demonym__iregex=name))
+
     def build_model(self, country: CountryDTO) -> Country:
         """
         Формирование объекта модели страны.
@@ -95,6 +138,7 @@ class CountryService:
             area=country.area,
             numeric_code=country.numeric_code,
             flag=country.flag,
-            currencies=[currency.code for currency in country.currencies],
-            languages=[language.name for language in country.languages],
+            # множества упорядочиваются, чтобы порядок не зависел от процесса
+            currencies=sorted(currency.code for currency in country.currencies),
+            languages=sorted(language.name for language in country.languages),
         )
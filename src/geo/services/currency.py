@@ -0,0 +1,111 @@
+from typing import Optional
+
+from django.core.cache import caches
+
+from app.settings import CACHE_CURRENCY, CURRENCY_BASE
+from base.services.metrics import record_cache
+from geo.clients.currency import CurrencyClient
+from geo.clients.shemas import CurrencyRatesDTO
+from geo.models import Country, CurrencyRates
+
+# ключ кэша для снимка курсов валют
+RATES_CACHE_KEY = "rates"
+
+
+class CurrencyService:
+    """
+    Сервис для работы с данными о курсах валют.
+    """
+
+    def import_rates(self) -> Optional[CurrencyRatesDTO]:
+        """
+        Получение снимка курсов валют из внешнего API и сохранение в БД и кэше.
+
+        :return:
+        """
+
+        if rates := CurrencyClient().get_rates(CURRENCY_BASE):
+            CurrencyRates.objects.update_or_create(
+                base=rates.base, date=rates.date, defaults={"rates": rates.rates}
+            )
+            caches[CACHE_CURRENCY].set(RATES_CACHE_KEY, rates.dict())
+
+        return rates
+
+    def get_rates(self) -> Optional[CurrencyRatesDTO]:
+        """
+        Получение последнего снимка курсов валют.
+
+        Снимок читается из кэша, а при его отсутствии – из БД (с повторным сохранением в кэше).
+        Запросы к внешнему API не выполняются.
+
+        :return:
+        """
+
+        cache = caches[CACHE_CURRENCY]
+        data = cache.get(RATES_CACHE_KEY)
+        record_cache(CACHE_CURRENCY, int(bool(data)), int(not data))
+        if data:
+            return CurrencyRatesDTO(**data)
+
+        if snapshot := CurrencyRates.objects.order_by("-date").first():
+            rates = CurrencyRatesDTO(
+                base=snapshot.base, date=str(snapshot.date), rates=snapshot.rates
+            )
+            cache.set(RATES_CACHE_KEY, rates.dict())
+
+            return rates
+
+        return None
+
+    def get_country_rates(
+        self, alpha2code: str, base: str
+    ) -> Optional[CurrencyRatesDTO]:
+        """
+        Получение курсов валют страны относительно указанной валюты.
+
+        Курсы вычисляются как кросс-курсы по снимку относительно базовой валюты снимка.
+
+        :param alpha2code: ISO Alpha2 код страны
+        :param base: Код валюты, относительно которой рассчитываются курсы
+        :return:
+        """
+
+        currencies = (
+            Country.objects.filter(alpha2code__iexact=alpha2code)
+            .values_list("currencies", flat=True)
+            .first()
+        )
+        if currencies is None or not (rates := self.get_rates()):
+            return None
+
+        return self.build_cross_rates(rates, base, currencies)
+
+    @staticmethod
+    def build_cross_rates(
+        rates: CurrencyRatesDTO, base: str, currencies: list[str]
+    ) -> Optional[CurrencyRatesDTO]:
+        """
+        Вычисление кросс-курсов валют относительно указанной валюты.
+
+        :param rates: Снимок курсов валют
+        :param base: Код валюты, относительно которой рассчитываются курсы
+        :param currencies: Коды валют
+        :return:
+        """
+
+        base = base.upper()
+        if base == rates.base:
+            base_rate = 1.0
+        elif not (base_rate := rates.rates.get(base, 0.0)):
+            return None
+
+        return CurrencyRatesDTO(
+            base=base,
+            date=rates.date,
+            rates={
+                code: rates.rates[code] / base_rate
+                for code in currencies
+                if code in rates.rates
+            },
+        )
@@ -0,0 +1,231 @@
+"""
+Индекс координат городов в памяти процесса для обратного геокодирования.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+from django.db import connection
+from scipy.spatial import cKDTree
+
+from app.settings import GEO_INDEX_REBUILD_INTERVAL, GEO_INDEX_REFRESH_INTERVAL
+from geo.models import City
+from geo.services.changes import ChangesService
+
+logger = logging.getLogger()
+
+# средний радиус Земли (в километрах)
+EARTH_RADIUS = 6371.0088
+
+
+def to_unit_vectors(latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """
+    Преобразование географических координат в точки на единичной сфере.
+
+    Ближайшая по хорде точка является ближайшей и по дуге большого круга,
+    поэтому поиск ведется в трехмерном пространстве.
+
+    :param latitudes: Широты (в градусах)
+    :param longitudes: Долготы (в градусах)
+    :return: Массив формы (N, 3)
+    """
+
+    lat = np.radians(latitudes)
+    lon = np.radians(longitudes)
+    cos_lat = np.cos(lat)
+
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+
+class GeoIndex:
+    """
+    KD-дерево по координатам городов из БД.
+
+    Индекс строится при первом обращении, а затем обновляется фоновым потоком процесса
+    не реже, чем раз в `GEO_INDEX_REFRESH_INTERVAL` секунд, и сразу после импорта городов
+    в этом процессе (`request_refresh`). Запросы не ожидают обновления и используют
+    текущее дерево. Дерево перестраивается, только если координаты изменились;
+    удаленные города исключаются полной перестройкой раз в `GEO_INDEX_REBUILD_INTERVAL` секунд.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._ids = np.empty(0, dtype=np.int64)
+        self._points = np.empty((0, 3), dtype=np.float64)
+        # дерево и идентификаторы заменяются одним присваиванием для чтения без блокировки
+        self._state: tuple[Optional[cKDTree], np.ndarray] = (None, self._ids)
+        self._updated_at: Optional[datetime] = None
+        self._rebuilt_at = 0.0
+
+    def request_refresh(self) -> None:
+        """
+        Запрос внеочередного обновления индекса в фоне (например, после импорта городов).
+
+        :return:
+        """
+
+        self._wakeup.set()
+
+    def refresh(self, full: bool = False) -> int:
+        """
+        Обновление индекса записями, измененными после предыдущего обновления.
+
+        Отметка обновления не превышает границу ленты изменений (`ChangesService.get_until`):
+        записи длительных транзакций могут быть зафиксированы позже записей с большим
+        временем обновления, поэтому записи после границы выбираются повторно.
+
+        :param full: Полная перестройка индекса (например, после удаления городов)
+        :return: Количество добавленных или измененных записей
+        """
+
+        with self._lock:
+            return self._refresh(full)
+
+    def _refresh(self, full: bool) -> int:
+        """
+        Обновление индекса (вызывается при захваченной блокировке).
+
+        :param full: Полная перестройка индекса
+        :return: Количество добавленных или измененных записей
+        """
+
+        full = full or self._updated_at is None
+        # граница определяется до выборки: все записи до нее уже зафиксированы
+        until = ChangesService.get_until()
+        cities = City.objects.order_by()
+        if not full:
+            cities = cities.filter(updated_at__gt=self._updated_at)
+
+        rows = list(cities.values_list("id", "latitude", "longitude"))
+        if full:
+            self._rebuilt_at = time.monotonic()
+        self._updated_at = (
+            until if full or not self._updated_at else max(until, self._updated_at)
+        )
+
+        ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        points = to_unit_vectors(
+            np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows)),
+            np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows)),
+        )
+        # повторно выбранные записи без изменений координат не перестраивают дерево
+        changed = self._find_changed(ids, points)
+        if full:
+            if not changed.any() and len(ids) == len(self._ids):
+                return 0
+            self._ids, self._points = ids, points
+        else:
+            if not changed.any():
+                return 0
+            # измененные записи заменяют прежние координаты
+            ids, points = ids[changed], points[changed]
+            keep = ~np.isin(self._ids, ids)
+            self._ids = np.concatenate((self._ids[keep], ids))
+            self._points = np.concatenate((self._points[keep], points))
+
+        self._state = (
+            cKDTree(self._points) if len(self._ids) else None,
+            self._ids,
+        )
+        logger.info(
+            "Geo index refreshed: %s changed, %s total.",
+            int(changed.sum()),
+            len(self._ids),
+        )
+
+        return int(changed.sum())
+
+    def nearest(
+        self, latitudes: np.ndarray, longitudes: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Поиск ближайших городов для массива точек одним векторизованным запросом.
+
+        :param latitudes: Широты точек (в градусах)
+        :param longitudes: Долготы точек (в градусах)
+        :return: Идентификаторы ближайших городов и расстояния до них (в километрах);
+            для пустого индекса – пустые массивы
+        """
+
+        if self._worker is None:
+            self._start()
+
+        tree, ids = self._state
+        if tree is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+        chords, positions = tree.query(to_unit_vectors(latitudes, longitudes))
+        distances = 2 * EARTH_RADIUS * np.arcsin(np.clip(chords / 2, 0, 1))
+
+        return ids[positions], distances
+
+    def _find_changed(self, ids: np.ndarray, points: np.ndarray) -> np.ndarray:
+        """
+        Поиск записей, отсутствующих в индексе или с измененными координатами.
+
+        :param ids: Идентификаторы городов
+        :param points: Точки городов на единичной сфере
+        :return: Маска измененных записей
+        """
+
+        if self._ids.size == 0 or ids.size == 0:
+            return np.ones(len(ids), dtype=bool)
+
+        order = np.argsort(self._ids)
+        positions = order[
+            np.clip(np.searchsorted(self._ids, ids, sorter=order), 0, len(order) - 1)
+        ]
+
+        return (self._ids[positions] != ids) | np.any(
+            self._points[positions] != points, axis=1
+        )
+
+    def _start(self) -> None:
+        """
+        Построение индекса при первом обращении и запуск фонового обновления.
+
+        Одновременные первые запросы ожидают одного построения индекса.
+
+        :return:
+        """
+
+        with self._lock:
+            if self._worker is not None:
+                return
+            self._refresh(full=True)
+            self._worker = threading.Thread(
+                target=self._run, name="geo-index", daemon=True
+            )
+            self._worker.start()
+
+    def _run(self) -> None:
+        """
+        Фоновое обновление индекса.
+
+        :return:
+        """
+
+        while True:
+            self._wakeup.wait(GEO_INDEX_REFRESH_INTERVAL)
+            self._wakeup.clear()
+            try:
+                self.refresh(
+                    full=time.monotonic() - self._rebuilt_at
+                    > GEO_INDEX_REBUILD_INTERVAL
+                )
+            except Exception:  # pylint: disable=broad-except
+                # ошибка обновления не останавливает поток: используется прежний индекс
+                logger.exception("Geo index refresh failed.")
+            finally:
+                # подключение потока к БД не удерживается между обновлениями
+                connection.close()
+
+
+# индекс создается один раз на процесс
+geo_index = GeoIndex()
@@ -0,0 +1,69 @@
+"""
+Функции для работы с геохешами.
+
+https://en.wikipedia.org/wiki/Geohash
+"""
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def encode(latitude: float, longitude: float, precision: int = 5) -> str:
+    """
+    Вычисление геохеша для координат.
+
+    :param latitude: Широта
+    :param longitude: Долгота
+    :param precision: Длина геохеша (точность ячейки)
+    :return:
+    """
+
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    geohash: list[str] = []
+    bits = 0
+    bit = 0
+    even = True
+    while len(geohash) < precision:
+        # биты долготы и широты чередуются, начиная с долготы
+        value, value_range = (longitude, lon_range) if even else (latitude, lat_range)
+        middle = (value_range[0] + value_range[1]) / 2
+        if value >= middle:
+            bits = (bits << 1) | 1
+            value_range[0] = middle
+        else:
+            bits <<= 1
+            value_range[1] = middle
+        even = not even
+
+        bit += 1
+        if bit == 5:
+            geohash.append(BASE32[bits])
+            bits = 0
+            bit = 0
+
+    return "".join(geohash)
+
+
+def decode(geohash: str) -> tuple[float, float]:
+    """
+    Вычисление координат центра ячейки геохеша.
+
+    :param geohash: Геохеш
+    :return: Широта и долгота центра ячейки
+    """
+
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        bits = BASE32.index(char)
+        for shift in range(4, -1, -1):
+            value_range = lon_range if even else lat_range
+            middle = (value_range[0] + value_range[1]) / 2
+            if (bits >> shift) & 1:
+                value_range[0] = middle
+            else:
+                value_range[1] = middle
+            even = not even
+
+    return (lat_range[0] + lat_range[1]) / 2, (lon_range[0] + lon_range[1]) / 2
@@ -0,0 +1,162 @@
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Optional
+
+from django.db import connection
+
+from app.settings import CURRENCY_BASE, LOCATION_SECTION_TIMEOUT
+from base.services.metrics import propagate
+from geo.clients.geo import GeoClient
+from geo.serializers import CitySerializer, CountrySerializer
+from geo.services.city import CityService
+from geo.services.country import CountryService
+from geo.services.currency import CurrencyService
+from geo.services.shemas import LocationSectionDTO
+from geo.services.weather import WeatherService
+
+logger = logging.getLogger()
+
+
+class LocationService:
+    """
+    Сервис для получения сводной информации о месте.
+    """
+
+    def get_location(self, alpha2code: str, city: str) -> dict[str, LocationSectionDTO]:
+        """
+        Получение сводной информации о месте: страна, город, погода и курсы валют.
+
+        Разделы запрашиваются параллельно. Если раздел не получен за `LOCATION_SECTION_TIMEOUT`
+        секунд, то он возвращается со статусом `timeout`, а остальные данные – без ожидания.
+
+        :param alpha2code: ISO Alpha2 код страны
+        :param city: Город
+        :return:
+        """
+
+        sections: dict[str, Callable[[], Any]] = {
+            "country": lambda: self._get_country(alpha2code),
+            "city": lambda: self._get_city(alpha2code, city),
+            "weather": lambda: self._get_weather(alpha2code, city),
+            "currency_rates": lambda: self._get_currency_rates(alpha2code),
+        }
+
+        executor = ThreadPoolExecutor(max_workers=len(sections))
+        futures = {
+            name: executor.submit(propagate(self._call), func)
+            for name, func in sections.items()
+        }
+        deadline = time.monotonic() + LOCATION_SECTION_TIMEOUT
+        try:
+            return {
+                name: self._get_result(name, future, deadline)
+                for name, future in futures.items()
+            }
+        finally:
+            # незавершенные запросы продолжают выполняться в фоне (например, для заполнения кэша)
+            executor.shutdown(wait=False)
+
+    @staticmethod
+    def _get_result(name: str, future: Future, deadline: float) -> LocationSectionDTO:
+        """
+        Ожидание данных раздела до истечения общего времени ожидания.
+
+        :param name: Название раздела
+        :param future: Задача получения данных раздела
+        :param deadline: Момент истечения времени ожидания (`time.monotonic()`)
+        :return:
+        """
+
+        try:
+            data = future.result(timeout=max(deadline - time.monotonic(), 0))
+        except FutureTimeoutError:
+            logger.warning("Location section '%s' timed out.", name)
+
+            return LocationSectionDTO(status="timeout")
+        except Exception:  # pylint: disable=broad-except
+            logger.error("Error during location section '%s'.", name, exc_info=True)
+
+            return LocationSectionDTO(status="error")
+
+        if data is None:
+            return LocationSectionDTO(status="not_found")
+
+        return LocationSectionDTO(status="ok", data=data)
+
+    @staticmethod
+    def _call(func: Callable[[], Any]) -> Any:
+        """
+        Выполнение функции в отдельном потоке с закрытием соединения с БД после завершения.
+
+        :param func: Функция получения данных раздела
+        :return:
+        """
+
+        try:
+            return func()
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _get_country(alpha2code: str) -> Optional[dict]:
+        """
+        Получение данных о стране из БД или, при отсутствии, из API.
+
+        :param alpha2code: ISO Alpha2 код страны
+        :return:
+        """
+
+        if country := CountryService.get_countries_by_codes({alpha2code}).first():
+            return CountrySerializer(country).data
+        if country_dto := GeoClient().get_country_by_code(alpha2code):
+            return CountrySerializer(CountryService().build_model(country_dto)).data
+
+        return None
+
+    @staticmethod
+    def _get_city(alpha2code: str, city: str) -> Optional[dict]:
+        """
+        Получение данных о городе.
+
+        :param alpha2code: ISO Alpha2 код страны
+        :param city: Город
+        :return:
+        """
+
+        if city_db := CityService().get_city(alpha2code=alpha2code, name=city):
+            return CitySerializer(city_db).data
+
+        return None
+
+    @staticmethod
+    def _get_weather(alpha2code: str, city: str) -> Optional[dict]:
+        """
+        Получение данных о погоде.
+
+        :param alpha2code: ISO Alpha2 код страны
+        :param city: Город
+        :return:
+        """
+
+        if weather := WeatherService().get_weather(alpha2code=alpha2code, city=city):
+            return weather.dict()
+
+        return None
+
+    @staticmethod
+    def _get_currency_rates(alpha2code: str) -> Optional[dict]:
+        """
+        Получение курсов валют страны.
+
+        :param alpha2code: ISO Alpha2 код страны
+        :return:
+        """
+
+        if rates := CurrencyService().get_country_rates(
+            alpha2code=alpha2code, base=CURRENCY_BASE
+        ):
+            return rates.dict()
+
+        return None
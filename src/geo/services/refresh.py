@@ -0,0 +1,240 @@
+"""
+Фоновое обновление устаревших данных о странах и городах из внешнего API.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Optional, Sequence
+
+from django.db.models import Model, QuerySet
+from django.db.models.functions import Coalesce
+
+from app.settings import GEO_REFRESH_BATCH_SIZE, GEO_REFRESH_WORKERS
+from base.services.metrics import propagate
+from geo.clients.geo import GeoClient
+from geo.clients.shemas import CityDTO
+from geo.models import City, Country
+from geo.services.city import CityService
+from geo.services.country import CountryService
+
+logger = logging.getLogger()
+
+# поля, значения которых обновляются по данным внешнего API
+COUNTRY_FIELDS = (
+    "name",
+    "alpha3code",
+    "capital",
+    "region",
+    "subregion",
+    "population",
+    "latitude",
+    "longitude",
+    "demonym",
+    "area",
+    "numeric_code",
+    "flag",
+    "currencies",
+    "languages",
+)
+CITY_FIELDS = ("region", "latitude", "longitude")
+
+
+class RefreshService:
+    """
+    Сервис фонового обновления устаревших данных о странах и городах.
+
+    Записи, которые не проверялись и не обновлялись дольше заданного времени, проверяются
+    начиная с самых давних пакетами по `GEO_REFRESH_BATCH_SIZE` записей. Запросы пакета
+    к API выполняются параллельно, изменившиеся записи сохраняются одним запросом
+    только по изменившимся полям, а у всех проверенных записей обновляется время проверки
+    (`checked_at`). Записи без изменений не попадают в ленту изменений.
+    """
+
+    def __init__(self) -> None:
+        self.geo_client = GeoClient()
+
+    def refresh(self, max_age: int, budget: int) -> tuple[int, int]:
+        """
+        Обновление устаревших данных о странах, а затем о городах.
+
+        Запуск завершается досрочно, если запросы к API отклонены из-за открытого
+        выключателя или исчерпанной квоты; записи такого пакета не отмечаются проверенными.
+
+        :param max_age: Время, после которого данные считаются устаревшими (в секундах)
+        :param budget: Максимальное количество запросов к API за запуск
+        :return: Количество проверенных и обновленных записей
+        """
+
+        self.geo_client.throttled = False
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=max_age)
+        models: tuple[tuple[QuerySet, Callable, tuple[str, ...]], ...] = (
+            (Country.objects.all(), self._fetch_countries, COUNTRY_FIELDS),
+            (City.objects.select_related("country"), self._fetch_cities, CITY_FIELDS),
+        )
+
+        checked = updated = 0
+        for queryset, fetch, fields in models:
+            # выборка по индексу `Coalesce(checked_at, updated_at), id`
+            stale = (
+                queryset.alias(checked=Coalesce("checked_at", "updated_at"))
+                .filter(checked__lt=stale_before)
+                .order_by("checked", "pk")
+            )
+            while budget > 0:
+                if not (rows := list(stale[: min(GEO_REFRESH_BATCH_SIZE, budget)])):
+                    break
+
+                # количество запросов не больше количества записей пакета
+                budget -= len(rows)
+                fresh = fetch(rows)
+                if self.geo_client.throttled:
+                    logger.warning("Geo API is unavailable, refresh stopped.")
+                    return checked, updated
+
+                checked += len(rows)
+                updated += self._save_changes(rows, fresh, fields)
+
+        return checked, updated
+
+    def _fetch_countries(self, rows: list[Country]) -> dict[int, Country]:
+        """
+        Получение актуальных данных о странах из API.
+
+        :param rows: Страны из БД
+        :return: Актуальные данные по идентификаторам стран
+        """
+
+        data = self._fetch_many(
+            self.geo_client.get_country_by_code, {row.alpha2code for row in rows}
+        )
+        country_service = CountryService()
+
+        return {
+            row.pk: country_service.build_model(country)
+            for row in rows
+            if (country := data[row.alpha2code])
+        }
+
+    def _fetch_cities(self, rows: list[City]) -> dict[int, City]:
+        """
+        Получение актуальных данных о городах из API (один запрос на название города).
+
+        :param rows: Города из БД
+        :return: Актуальные данные по идентификаторам городов
+        """
+
+        data = self._fetch_many(self.geo_client.get_cities, {row.name for row in rows})
+        city_service = CityService()
+
+        fresh = {}
+        for row in rows:
+            if city := self._match_city(row, data[row.name] or []):
+                fresh[row.pk] = city_service.build_model(
+                    city, country_id=row.country_id
+                )
+
+        return fresh
+
+    @staticmethod
+    def _match_city(row: City, cities: list[CityDTO]) -> Optional[CityDTO]:
+        """
+        Поиск данных о городе среди городов с таким же названием:
+        по стране, а при нескольких совпадениях – и по региону.
+
+        :param row: Город из БД
+        :param cities: Данные о городах из API
+        :return:
+        """
+
+        candidates = [
+            city
+            for city in cities
+            if city.name.lower() == row.name.lower()
+            and city.country.alpha2code.lower() == row.country.alpha2code.lower()
+        ]
+        if len(candidates) > 1:
+            candidates = [
+                city
+                for city in candidates
+                if (city.state_or_region or "").lower() == row.region.lower()
+            ]
+
+        return candidates[0] if len(candidates) == 1 else None
+
+    @staticmethod
+    def _fetch_many(fetch: Callable[[str], Any], keys: set[str]) -> dict[str, Any]:
+        """
+        Параллельный запрос данных во внешнем API с ограничением числа потоков.
+
+        Контекст выполнения (фоновый приоритет запросов задачи) передается в потоки,
+        поэтому запросы расходуют квоту API без использования резерва для пользователей.
+
+        :param fetch: Функция получения данных по ключу
+        :param keys: Ключи запросов
+        :return: Полученные данные по ключам
+        """
+
+        ordered = list(keys)
+        with ThreadPoolExecutor(
+            max_workers=min(GEO_REFRESH_WORKERS, len(ordered))
+        ) as executor:
+            return dict(zip(ordered, executor.map(propagate(fetch), ordered)))
+
+    @staticmethod
+    def _save_changes(
+        rows: Sequence[Model], fresh: dict[int, Model], fields: tuple[str, ...]
+    ) -> int:
+        """
+        Сохранение изменившихся полей изменившихся записей одним запросом.
+
+        :param rows: Записи из БД
+        :param fresh: Актуальные данные по идентификаторам записей
+        :param fields: Сравниваемые поля
+        :return: Количество обновленных записей
+        """
+
+        now = datetime.now(timezone.utc)
+        changed_rows = []
+        changed_fields: set[str] = set()
+        for row in rows:
+            if (model := fresh.get(row.pk)) is None:
+                continue
+            if changes := [
+                field
+                for field in fields
+                if not _is_equal(getattr(row, field), getattr(model, field))
+            ]:
+                for field in changes:
+                    setattr(row, field, getattr(model, field))
+                # `auto_now` не применяется при `bulk_update`
+                setattr(row, "updated_at", now)
+                changed_rows.append(row)
+                changed_fields.update(changes)
+
+        model_class = type(rows[0])
+        if changed_rows:
+            model_class.objects.bulk_update(
+                changed_rows, [*sorted(changed_fields), "updated_at"]
+            )
+        # записи без данных в API тоже отмечаются проверенными,
+        # чтобы не выбираться повторно при каждом запуске
+        model_class.objects.filter(pk__in=[row.pk for row in rows]).update(
+            checked_at=now
+        )
+
+        return len(changed_rows)
+
+
+def _is_equal(value: Any, other: Any) -> bool:
+    """
+    Сравнение значений поля; списки (валюты, языки) сравниваются без учета порядка.
+
+    :param value: Значение в БД
+    :param other: Значение по данным API
+    :return:
+    """
+
+    if isinstance(value, list) and isinstance(other, list):
+        return sorted(value) == sorted(other)
+
+    return bool(value == other)
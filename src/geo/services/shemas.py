@@ -2,7 +2,10 @@
 Описание моделей данных (DTO).
 """
 
-from pydantic import Field
+from datetime import datetime
+from typing import Any, Optional
+
+from pydantic import BaseModel, Field
 
 from base.clients.shemas import HashableBaseModel
 
@@ -22,3 +25,62 @@ class CountryCityDTO(HashableBaseModel):
 
     city: str
     alpha2code: str = Field(min_length=2, max_length=2)
+
+
+class WeatherQueryDTO(HashableBaseModel):
+    """
+    Модель параметров запроса данных о погоде.
+    Содержит координаты центра ячейки геохеша или, если город не найден в БД,
+    текстовое описание локации.
+
+    .. code-block::
+
+        WeatherQueryDTO(
+            cache_key="cell_ucfv0",
+            latitude=55.74462890625,
+            longitude=37.63916015625,
+        )
+    """
+
+    cache_key: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    location: Optional[str] = None
+
+
+class LocationSectionDTO(BaseModel):
+    """
+    Модель раздела сводной информации о месте.
+    Содержит статус получения данных (`ok`, `not_found`, `timeout`, `error`) и сами данные.
+
+    .. code-block::
+
+        LocationSectionDTO(
+            status="ok",
+            data={
+                "EUR": 0.016503,
+            },
+        )
+    """
+
+    status: str
+    data: Optional[Any] = None
+
+
+class ChangeCursorDTO(BaseModel):
+    """
+    Модель позиции в ленте изменений: время обновления, тип и идентификатор
+    последней полученной записи.
+
+    .. code-block::
+
+        ChangeCursorDTO(
+            updated_at="2022-10-14T14:26:00.123456+00:00",
+            kind="city",
+            id=42,
+        )
+    """
+
+    updated_at: datetime
+    kind: str
+    id: int
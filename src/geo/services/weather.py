@@ -1,8 +1,40 @@
-from typing import Optional
+import hashlib
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
 
-from geo.clients.shemas import CountryDTO
+from django.core.cache import caches
+from django.db.models import Q
+from django.db.models.functions import Lower
+from pydantic import ValidationError
+
+from app.settings import (
+    CACHE_WEATHER,
+    WEATHER_GEOHASH_PRECISION,
+    WEATHER_REQUESTS_WORKERS,
+)
+from base.services.cache import get_redis_client
+from base.services.metrics import propagate, record_cache
+from geo.clients.shemas import CountryDTO, LocationDTO, WeatherInfoDTO
 from geo.clients.weather import WeatherClient
-from geo.models import Country
+from geo.models import City, Country
+from geo.services import geohash
+from geo.services.shemas import WeatherQueryDTO
+
+logger = logging.getLogger()
+
+# ключ сортированного множества с частотой запросов локаций
+HOT_LOCATIONS_KEY = "weather:hot_locations"
+# коэффициент уменьшения частот запросов после каждого предварительного обновления
+HOT_LOCATIONS_DECAY = 0.5
+# во множестве хранится не больше `HOT_LOCATIONS_LIMIT * top_n` локаций
+HOT_LOCATIONS_LIMIT = 10
+# поля компактного представления данных о погоде в порядке хранения
+INFO_FIELDS = tuple(WeatherInfoDTO.__fields__)
+# префикс ключей кэша компактных данных о погоде: версия формата вычисляется по составу
+# и порядку полей, поэтому после изменения модели прежние записи не читаются
+INFO_PREFIX = f"info_{hashlib.sha1(','.join(INFO_FIELDS).encode()).hexdigest()[:8]}"
 
 
 class WeatherService:
@@ -10,20 +42,338 @@ class WeatherService:
     Сервис для работы с данными о погоде.
     """
 
-    def get_weather(self, alpha2code: str, city: str) -> Optional[dict]:
+    def get_weather(self, alpha2code: str, city: str) -> Optional[WeatherInfoDTO]:
         """
-        Получение списка стран по названию.
+        Получение данных о погоде в городе.
 
         :param alpha2code: ISO Alpha2 код страны
         :param city: Город
         :return:
         """
 
-        if data := WeatherClient().get_weather(f"{city},{alpha2code}"):
-            return data
+        location = LocationDTO(alpha2code=alpha2code, city=city)
+
+        return self.get_weather_bulk({location})[location]
+
+    def get_weather_raw(self, alpha2code: str, city: str) -> Optional[dict]:
+        """
+        Получение данных о погоде в городе в исходном формате API.
+
+        :param alpha2code: ISO Alpha2 код страны
+        :param city: Город
+        :return:
+        """
+
+        location = LocationDTO(alpha2code=alpha2code, city=city)
+
+        return self.get_weather_raw_bulk({location})[location]
+
+    def get_weather_bulk(
+        self, locations: set[LocationDTO]
+    ) -> dict[LocationDTO, Optional[WeatherInfoDTO]]:
+        """
+        Получение данных о погоде для множества локаций.
+
+        В кэше хранится только компактное представление данных (массив JSON значений полей
+        `WeatherInfoDTO`).
+
+        :param locations: Множество локаций (город и ISO Alpha2 код страны)
+        :return:
+        """
+
+        return {
+            location: self._unpack(packed) if packed else None
+            for location, packed in self._get_cached(
+                locations, prefix=INFO_PREFIX, fetch=self._fetch_packed
+            ).items()
+        }
+
+    def get_weather_raw_bulk(
+        self, locations: set[LocationDTO]
+    ) -> dict[LocationDTO, Optional[dict]]:
+        """
+        Получение данных о погоде для множества локаций в исходном формате API.
+
+        Данные запрашиваются во внешнем API без сохранения в кэше погоды:
+        в кэше хранится только компактное представление данных.
+
+        :param locations: Множество локаций (город и ISO Alpha2 код страны)
+        :return:
+        """
+
+        queries = self._build_queries(locations)
+        if not queries:
+            return {}
+
+        data = self._fetch_parallel(list(set(queries.values())), self._fetch)
+
+        return {location: data[query.cache_key] for location, query in queries.items()}
+
+    def _get_cached(
+        self,
+        locations: set[LocationDTO],
+        prefix: str,
+        fetch: Callable[[WeatherQueryDTO], Any],
+    ) -> dict[LocationDTO, Any]:
+        """
+        Получение данных о погоде из кэша с запросом недостающих данных во внешнем API.
+
+        Локации сопоставляются с координатами городов из БД и группируются по ячейкам геохеша,
+        поэтому разные написания названия и соседние города используют одну запись кэша.
+        Данные из кэша читаются одним запросом, а отсутствующие в кэше ячейки
+        запрашиваются во внешнем API параллельно с ограничением числа потоков.
+
+        :param locations: Множество локаций (город и ISO Alpha2 код страны)
+        :param prefix: Префикс ключей кэша для формата данных
+        :param fetch: Функция получения данных для сохранения в кэше
+        :return:
+        """
+
+        base_queries = self._build_queries(locations)
+        locations_map = {
+            location: query.copy(update={"cache_key": f"{prefix}_{query.cache_key}"})
+            for location, query in base_queries.items()
+        }
+        queries = {query.cache_key: query for query in locations_map.values()}
+        data = caches[CACHE_WEATHER].get_many(queries.keys())
+        record_cache(CACHE_WEATHER, len(data), len(queries) - len(data))
+        if missed := [query for key, query in queries.items() if key not in data]:
+            data.update(self._fetch_many(missed, fetch))
+
+        # учитываются только локации с данными: ненайденные локации не обновляются заранее
+        self._track(
+            {
+                base_queries[location]
+                for location, query in locations_map.items()
+                if data.get(query.cache_key)
+            }
+        )
+
+        return {
+            location: data.get(query.cache_key)
+            for location, query in locations_map.items()
+        }
+
+    def prewarm(self, top_n: int, window: int, budget: int) -> int:
+        """
+        Предварительное обновление данных о погоде для самых запрашиваемых локаций.
+
+        Обновляются данные из кэша, срок актуальности которых истекает в течение `window` секунд,
+        в порядке убывания популярности и не более `budget` запросов к API.
+        После обновления частоты запросов уменьшаются, чтобы учитывались недавние запросы.
+
+        :param top_n: Количество самых запрашиваемых локаций
+        :param window: Время до истечения актуальности данных (в секундах)
+        :param budget: Максимальное количество запросов к API
+        :return: Количество обновленных локаций
+        """
+
+        cache = caches[CACHE_WEATHER]
+        client = get_redis_client(CACHE_WEATHER)
+        queries = [
+            query.copy(update={"cache_key": f"{INFO_PREFIX}_{query.cache_key}"})
+            for query in (
+                WeatherQueryDTO.parse_raw(member)
+                for member in client.zrevrange(HOT_LOCATIONS_KEY, 0, top_n - 1)
+            )
+        ]
+
+        with client.pipeline(transaction=False) as pipe:
+            for query in queries:
+                pipe.ttl(cache.make_key(query.cache_key))
+            ttls = pipe.execute()
+
+        # отсутствующие ключи (TTL равен -2) не обновляются: данные не были получены
+        # или уже истекли и будут запрошены при следующем обращении
+        to_refresh = [query for query, ttl in zip(queries, ttls) if 0 <= ttl < window][
+            :budget
+        ]
+        if to_refresh:
+            self._fetch_many(to_refresh, self._fetch_packed)
+
+        with client.pipeline(transaction=False) as pipe:
+            pipe.zunionstore(
+                HOT_LOCATIONS_KEY, {HOT_LOCATIONS_KEY: HOT_LOCATIONS_DECAY}
+            )
+            pipe.zremrangebyrank(HOT_LOCATIONS_KEY, 0, -HOT_LOCATIONS_LIMIT * top_n - 1)
+            pipe.execute()
+
+        return len(to_refresh)
+
+    @staticmethod
+    def _track(queries: set[WeatherQueryDTO]) -> None:
+        """
+        Учет частоты запросов локаций для предварительного обновления данных.
+
+        :param queries: Параметры запросов данных о погоде
+        :return:
+        """
+
+        if not queries:
+            return
+
+        with get_redis_client(CACHE_WEATHER).pipeline(transaction=False) as pipe:
+            for query in queries:
+                pipe.zincrby(HOT_LOCATIONS_KEY, 1, query.json())
+            pipe.execute()
+
+    @staticmethod
+    def _fetch_many(
+        queries: list[WeatherQueryDTO], fetch: Callable[[WeatherQueryDTO], Any]
+    ) -> dict[str, Any]:
+        """
+        Параллельный запрос данных во внешнем API и сохранение в кэше.
+
+        :param queries: Параметры запросов данных о погоде
+        :param fetch: Функция получения данных для сохранения в кэше
+        :return: Успешно полученные данные по ключам кэша
+        """
+
+        fetched = WeatherService._fetch_parallel(queries, fetch)
+
+        # в кэш сохраняются только успешно полученные данные
+        if to_cache := {key: value for key, value in fetched.items() if value}:
+            caches[CACHE_WEATHER].set_many(to_cache)
+
+        return to_cache
+
+    @staticmethod
+    def _fetch_parallel(
+        queries: list[WeatherQueryDTO], fetch: Callable[[WeatherQueryDTO], Any]
+    ) -> dict[str, Any]:
+        """
+        Параллельный запрос данных во внешнем API с ограничением числа потоков.
+
+        :param queries: Параметры запросов данных о погоде
+        :param fetch: Функция получения данных
+        :return: Полученные данные по ключам кэша
+        """
+
+        with ThreadPoolExecutor(
+            max_workers=min(WEATHER_REQUESTS_WORKERS, len(queries))
+        ) as executor:
+            return dict(
+                zip(
+                    (query.cache_key for query in queries),
+                    executor.map(propagate(fetch), queries),
+                )
+            )
+
+    @staticmethod
+    def _build_queries(
+        locations: set[LocationDTO],
+    ) -> dict[LocationDTO, WeatherQueryDTO]:
+        """
+        Формирование параметров запроса данных о погоде для локаций.
+
+        Координаты городов получаются из БД одним запросом.
+
+        :param locations: Множество локаций (город и ISO Alpha2 код страны)
+        :return:
+        """
+
+        if not locations:
+            return {}
+
+        conditions = Q()
+        for alpha2code, city in {
+            (location.alpha2code.lower(), location.city.lower())
+            for location in locations
+        }:
+            conditions |= Q(city_name_lower=city, country_alpha2code_lower=alpha2code)
+
+        coordinates = {
+            (item["country_alpha2code_lower"], item["city_name_lower"]): (
+                item["latitude"],
+                item["longitude"],
+            )
+            for item in City.objects.annotate(
+                city_name_lower=Lower("name"),
+                country_alpha2code_lower=Lower("country__alpha2code"),
+            )
+            .filter(conditions)
+            .values(
+                "city_name_lower",
+                "country_alpha2code_lower",
+                "latitude",
+                "longitude",
+            )
+        }
+
+        queries = {}
+        for location in locations:
+            alpha2code, city = location.alpha2code.lower(), location.city.lower()
+            if point := coordinates.get((alpha2code, city)):
+                cell = geohash.encode(*point, precision=WEATHER_GEOHASH_PRECISION)
+                latitude, longitude = geohash.decode(cell)
+                queries[location] = WeatherQueryDTO(
+                    cache_key=f"cell_{cell}", latitude=latitude, longitude=longitude
+                )
+            else:
+                # города нет в БД – запрос по названию
+                queries[location] = WeatherQueryDTO(
+                    cache_key=f"name_{alpha2code}_{city}",
+                    location=f"{city},{alpha2code}",
+                )
+
+        return queries
+
+    @staticmethod
+    def _fetch(query: WeatherQueryDTO) -> Optional[dict]:
+        """
+        Запрос данных о погоде во внешнем API.
+
+        :param query: Параметры запроса (координаты или название локации)
+        :return:
+        """
+
+        client = WeatherClient()
+        if query.latitude is not None and query.longitude is not None:
+            return client.get_weather_by_coordinates(query.latitude, query.longitude)
+
+        return client.get_weather(str(query.location))
+
+    def _fetch_packed(self, query: WeatherQueryDTO) -> Optional[bytes]:
+        """
+        Запрос данных о погоде во внешнем API и преобразование в компактный формат.
+
+        :param query: Параметры запроса (координаты или название локации)
+        :return:
+        """
+
+        if data := self._fetch(query):
+            try:
+                return self._pack(WeatherClient.build_weather_info(data))
+            except (KeyError, IndexError, TypeError, ValidationError):
+                logger.error("Error during weather data parsing.", exc_info=True)
 
         return None
 
+    @staticmethod
+    def _pack(weather: WeatherInfoDTO) -> bytes:
+        """
+        Преобразование данных о погоде в компактный массив JSON значений полей
+        (порядок полей `INFO_FIELDS` закреплен версией в префиксе ключа `INFO_PREFIX`).
+
+        :param weather: Данные о погоде
+        :return:
+        """
+
+        return json.dumps(
+            [getattr(weather, field) for field in INFO_FIELDS], separators=(",", ":")
+        ).encode()
+
+    @staticmethod
+    def _unpack(packed: bytes) -> WeatherInfoDTO:
+        """
+        Восстановление данных о погоде из компактного массива JSON.
+
+        :param packed: Значения полей `WeatherInfoDTO` в порядке `INFO_FIELDS`
+        :return:
+        """
+
+        return WeatherInfoDTO.parse_obj(dict(zip(INFO_FIELDS, json.loads(packed))))
+
     def build_model(self, country: CountryDTO) -> Country:
         """
         Формирование объекта модели страны.
@@ -0,0 +1,82 @@
+import logging
+
+from celery import shared_task
+
+from app.settings import (
+    GEO_REFRESH_BUDGET,
+    GEO_REFRESH_MAX_AGE,
+    WEATHER_PREWARM_BUDGET,
+    WEATHER_PREWARM_TOP_N,
+    WEATHER_PREWARM_WINDOW,
+)
+from geo.services.autocomplete import AutocompleteService
+from geo.services.currency import CurrencyService
+from geo.services.refresh import RefreshService
+from geo.services.weather import WeatherService
+
+logger = logging.getLogger()
+
+
+@shared_task(name="prewarm_weather")
+def prewarm_weather() -> None:
+    """
+    Предварительное обновление данных о погоде для самых запрашиваемых локаций
+    до истечения срока их актуальности в кэше.
+
+    :return:
+    """
+
+    logger.info("Running 'prewarm_weather'...")
+    refreshed = WeatherService().prewarm(
+        top_n=WEATHER_PREWARM_TOP_N,
+        window=WEATHER_PREWARM_WINDOW,
+        budget=WEATHER_PREWARM_BUDGET,
+    )
+    logger.info("Weather data has been refreshed for %s locations.", refreshed)
+    logger.info("Function 'prewarm_weather' finished.")
+
+
+@shared_task(name="import_currency_rates")
+def import_currency_rates() -> None:
+    """
+    Импорт ежедневного снимка курсов валют.
+
+    :return:
+    """
+
+    logger.info("Running 'import_currency_rates'...")
+    if rates := CurrencyService().import_rates():
+        logger.info("Currency rates for '%s' have been saved.", rates.date)
+    else:
+        logger.info("Currency rates not received.")
+    logger.info("Function 'import_currency_rates' finished.")
+
+
+@shared_task(name="rebuild_autocomplete")
+def rebuild_autocomplete() -> None:
+    """
+    Перестройка индекса автодополнения названий городов и стран.
+
+    :return:
+    """
+
+    logger.info("Running 'rebuild_autocomplete'...")
+    total = AutocompleteService().rebuild()
+    logger.info("Autocomplete index contains %s entries.", total)
+    logger.info("Function 'rebuild_autocomplete' finished.")
+
+
+@shared_task(name="refresh_geo_data")
+def refresh_geo_data() -> None:
+    """
+    Обновление устаревших данных о странах и городах из внешнего API.
+
+    :return:
+    """
+
+    logger.info("Running 'refresh_geo_data'...")
+    checked, updated = RefreshService().refresh(
+        max_age=GEO_REFRESH_MAX_AGE, budget=GEO_REFRESH_BUDGET
+    )
+    logger.info("Geo data checked: %s, updated: %s.", checked, updated)
+    logger.info("Function 'refresh_geo_data' finished.")
@@ -0,0 +1,168 @@
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+
+from app.settings import CHANGES_DELAY
+from geo.models import City, Country
+from geo.services.changes import KIND_CITY, KIND_COUNTRY, ChangesService
+from geo.services.shemas import ChangeCursorDTO
+
+
+class ChangesServiceTest(TestCase):
+    """
+    Тесты ленты изменений стран и городов.
+    """
+
+    def setUp(self) -> None:
+        self.service = ChangesService()
+        self.updated_at = datetime.now(timezone.utc) - timedelta(hours=1)
+        self.countries = [self.create_country(code) for code in ("RU", "KZ", "BY")]
+        self.cities = [
+            City.objects.create(
+                country=self.countries[index % 3],
+                name=f"City {index}",
+                latitude=55.0,
+                longitude=37.0,
+            )
+            for index in range(5)
+        ]
+        # все записи изменены одновременно (одной транзакцией загрузки)
+        Country.objects.update(updated_at=self.updated_at)
+        City.objects.update(updated_at=self.updated_at)
+
+    @staticmethod
+    def create_country(code: str) -> Country:
+        return Country.objects.create(
+            name=code,
+            alpha2code=code,
+            alpha3code=f"{code}X",
+            capital="",
+            region="",
+            subregion="",
+            population=0,
+            latitude=0.0,
+            longitude=0.0,
+            demonym="",
+            area=0.0,
+            numeric_code="",
+            flag="",
+            currencies=[],
+            languages=[],
+        )
+
+    def read_all(self, limit: int) -> list[tuple[str, int]]:
+        """
+        Получение всей ленты страницами.
+
+        :param limit: Размер страницы
+        :return: Тип и идентификатор записей в порядке получения
+        """
+
+        result = []
+        cursor = None
+        while True:
+            changes, cursor, has_more = self.service.get_changes(cursor, limit)
+            self.assertLessEqual(len(changes), limit)
+            result.extend((kind, item.pk) for kind, item in changes)
+            if not has_more:
+                return result
+
+    def test_cursor_round_trip(self) -> None:
+        """
+        Курсор восстанавливается из строкового представления без изменений.
+        """
+
+        cursor = ChangeCursorDTO(updated_at=self.updated_at, kind=KIND_CITY, id=42)
+
+        value = self.service.encode_cursor(cursor)
+
+        self.assertNotIn("=", value)
+        self.assertEqual(self.service.decode_cursor(value), cursor)
+
+    def test_invalid_cursor(self) -> None:
+        """
+        Некорректный курсор не разбирается.
+        """
+
+        unknown_kind = ChangeCursorDTO.construct(
+            updated_at=self.updated_at, kind="region", id=1
+        )
+
+        for value in ("", "not a cursor", self.service.encode_cursor(unknown_kind)):
+            with self.subTest(value=value):
+                self.assertIsNone(self.service.decode_cursor(value))
+
+    def test_paging_with_equal_updated_at(self) -> None:
+        """
+        При совпадении времени обновления записи разных типов не пропускаются и не повторяются.
+        """
+
+        expected = [(KIND_COUNTRY, country.pk) for country in self.countries] + [
+            (KIND_CITY, city.pk) for city in self.cities
+        ]
+
+        for limit in range(1, len(expected) + 2):
+            with self.subTest(limit=limit):
+                self.assertEqual(self.read_all(limit), expected)
+
+    def test_paging_with_encoded_cursor(self) -> None:
+        """
+        Страницы, полученные по строковому представлению курсора, продолжают ленту.
+        """
+
+        changes, cursor, _ = self.service.get_changes(None, 4)
+        assert cursor is not None
+        decoded = self.service.decode_cursor(self.service.encode_cursor(cursor))
+
+        following, _, has_more = self.service.get_changes(decoded, 10)
+
+        self.assertEqual(changes[-1], (KIND_CITY, self.cities[0]))
+        self.assertEqual([item for _, item in following], self.cities[1:])
+        self.assertFalse(has_more)
+
+    def test_empty_page_keeps_cursor(self) -> None:
+        """
+        При отсутствии новых записей возвращается исходный курсор.
+        """
+
+        cursor = ChangeCursorDTO(
+            updated_at=self.updated_at, kind=KIND_CITY, id=self.cities[-1].pk
+        )
+
+        changes, next_cursor, has_more = self.service.get_changes(cursor, 10)
+
+        self.assertEqual(changes, [])
+        self.assertEqual(next_cursor, cursor)
+        self.assertFalse(has_more)
+
+    def test_until_boundary(self) -> None:
+        """
+        Лента содержит записи со временем обновления не позже границы `get_until`.
+        """
+
+        until = self.updated_at + timedelta(minutes=1)
+        City.objects.filter(pk=self.cities[3].pk).update(updated_at=until)
+        City.objects.filter(pk=self.cities[4].pk).update(
+            updated_at=until + timedelta(microseconds=1)
+        )
+
+        with mock.patch.object(ChangesService, "get_until", return_value=until):
+            result = self.read_all(limit=2)
+
+        self.assertEqual(result[-1], (KIND_CITY, self.cities[3].pk))
+        self.assertNotIn((KIND_CITY, self.cities[4].pk), result)
+
+    def test_get_until(self) -> None:
+        """
+        Граница ленты отстает от начала текущей транзакции не меньше чем на `CHANGES_DELAY`.
+        """
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT now()")
+            now = cursor.fetchone()[0]
+
+        self.assertLessEqual(
+            self.service.get_until(), now - timedelta(seconds=CHANGES_DELAY)
+        )
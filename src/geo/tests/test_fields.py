@@ -0,0 +1,129 @@
+from django.test import TestCase
+
+from geo.models import City, Country
+
+
+class CitiesNearFieldsTest(TestCase):
+    """
+    Тесты ограничения полей ответа и выборки из БД параметром `fields`.
+    """
+
+    url = "/api/v1/city/near"
+
+    def setUp(self) -> None:
+        country = Country.objects.create(
+            name="Russia",
+            alpha2code="RU",
+            alpha3code="RUS",
+            capital="Moscow",
+            region="Europe",
+            subregion="Eastern Europe",
+            population=146_000_000,
+            latitude=60.0,
+            longitude=100.0,
+            demonym="Russian",
+            area=17_124_442.0,
+            numeric_code="643",
+            flag="",
+            currencies=["RUB"],
+            languages=["Russian"],
+        )
+        City.objects.create(
+            country=country,
+            name="Moscow",
+            region="Moscow",
+            latitude=55.75,
+            longitude=37.62,
+            population=12_000_000,
+        )
+
+    def get(self, fields: str) -> tuple[list[dict], str]:
+        """
+        Запрос ближайших городов с проверкой количества запросов к БД.
+
+        :param fields: Значение параметра `fields`
+        :return: Данные ответа и список столбцов запроса городов (SQL до `FROM`)
+        """
+
+        with self.assertNumQueries(1) as context:
+            response = self.client.get(
+                self.url, {"lat": 55.7, "lon": 37.6, "fields": fields}
+            )
+
+        self.assertEqual(response.status_code, 200)
+        sql = context.captured_queries[0]["sql"]
+        return response.json(), sql.split(" FROM ", 1)[0]
+
+    def test_fields_with_related(self) -> None:
+        """
+        Поля связанной записи выбираются соединением, остальные поля не выбираются.
+        """
+
+        data, columns = self.get("name,country.alpha2code")
+
+        self.assertEqual(data, [{"name": "Moscow", "country": {"alpha2code": "RU"}}])
+        self.assertIn('"geo_city"."name"', columns)
+        self.assertIn('"geo_country"."alpha2code"', columns)
+        self.assertNotIn('"geo_city"."population"', columns)
+        self.assertNotIn('"geo_country"."name"', columns)
+
+    def test_fields_with_annotation(self) -> None:
+        """
+        Вычисляемое поле выводится без выборки неуказанных полей модели.
+        """
+
+        data, columns = self.get("name,distance")
+
+        self.assertEqual(list(data[0]), ["name", "distance"])
+        self.assertIn('"geo_city"."name"', columns)
+        self.assertNotIn('"geo_city"."population"', columns)
+        self.assertNotIn("geo_country", columns)
+
+    def test_only_annotation(self) -> None:
+        """
+        Без полей модели выбирается только первичный ключ.
+        """
+
+        data, columns = self.get("distance")
+
+        self.assertEqual(list(data[0]), ["distance"])
+        self.assertIn('"geo_city"."id"', columns)
+        self.assertNotIn('"geo_city"."name"', columns)
+        self.assertNotIn('"geo_city"."region"', columns)
+        self.assertNotIn("geo_country", columns)
+
+    def test_all_fields(self) -> None:
+        """
+        Без параметра `fields` выводятся и выбираются все поля.
+        """
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {"lat": 55.7, "lon": 37.6})
+
+        city = response.json()[0]
+        self.assertEqual(
+            list(city),
+            [
+                "id",
+                "name",
+                "region",
+                "latitude",
+                "longitude",
+                "population",
+                "country",
+                "distance",
+            ],
+        )
+        self.assertEqual(city["country"]["alpha2code"], "RU")
+
+    def test_unknown_field(self) -> None:
+        """
+        Неизвестное поле отклоняется без запроса к БД.
+        """
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                self.url, {"lat": 55.7, "lon": 37.6, "fields": "name,unknown"}
+            )
+
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+
+from django.test import TransactionTestCase
+
+from geo.management.commands._loader import GeoLoader
+from geo.models import City, Country
+
+
+class GeoLoaderTest(TransactionTestCase):
+    """
+    Тесты загрузки наборов данных о городах.
+    """
+
+    def setUp(self) -> None:
+        self.country = Country.objects.create(
+            name="Russia",
+            alpha2code="RU",
+            alpha3code="RUS",
+            capital="Moscow",
+            region="Europe",
+            subregion="Eastern Europe",
+            population=146_000_000,
+            latitude=60.0,
+            longitude=100.0,
+            demonym="Russian",
+            area=17_124_442.0,
+            numeric_code="643",
+            flag="",
+            currencies=["RUB"],
+            languages=["Russian"],
+        )
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, "cities.csv")
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.write("alpha2code,name,region,latitude,longitude,population\n")
+            file.write("RU,Moscow,,55.7,37.6,12000000\n")
+            file.write("RU,Kazan,Tatarstan,55.8,49.1,1200000\n")
+
+    def load(self) -> None:
+        GeoLoader(
+            kind="cities",
+            batch_size=10,
+            checkpoint_path=os.path.join(self.directory, "checkpoint"),
+        ).load(path=self.path, file_format="csv", delimiter=",")
+
+    def test_empty_region(self) -> None:
+        """
+        Город с пустым регионом сохраняется с пустой строкой, а не NULL.
+        """
+
+        self.load()
+
+        city = City.objects.get(name="Moscow")
+        self.assertEqual(city.region, "")
+        self.assertEqual(city.country, self.country)
+        self.assertEqual(City.objects.count(), 2)
+
+    def test_reload_empty_region(self) -> None:
+        """
+        Повторная загрузка не создает дубликатов городов с пустым регионом.
+        """
+
+        self.load()
+        self.load()
+
+        self.assertEqual(City.objects.filter(name="Moscow").count(), 1)
+        self.assertEqual(City.objects.count(), 2)
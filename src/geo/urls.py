@@ -1,11 +1,31 @@
 from django.urls import path
 
-from geo.views import get_city, get_cities, get_countries, get_country, get_weather
+from geo.views import (
+    get_autocomplete,
+    get_changes,
+    get_city,
+    get_cities,
+    get_cities_near,
+    get_countries,
+    get_country,
+    get_currency,
+    get_location,
+    get_weather,
+    get_weather_bulk,
+    reverse_geocode,
+)
 
 urlpatterns = [
+    path("autocomplete", get_autocomplete, name="autocomplete"),
+    path("changes", get_changes, name="changes"),
     path("city", get_cities, name="cities"),
+    path("city/near", get_cities_near, name="cities_near"),
+    path("city/reverse", reverse_geocode, name="cities_reverse"),
     path("city/<str:name>", get_city, name="city"),
     path("country", get_countries, name="countries"),
     path("country/<str:name>", get_country, name="country"),
+    path("currency/<str:alpha2code>", get_currency, name="currency"),
+    path("location/<str:alpha2code>/<str:city>", get_location, name="location"),
+    path("weather", get_weather_bulk, name="weather_bulk"),
     path("weather/<str:alpha2code>/<str:city>", get_weather, name="weather"),
 ]
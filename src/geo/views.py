@@ -1,21 +1,182 @@
 """Представления Django"""
 import re
-from typing import Any
+from typing import Optional
 
-from django.core.cache import caches
-from django.http import JsonResponse
+from django.http import HttpRequest, JsonResponse, QueryDict
+from django.views.decorators.http import condition
+from pydantic import ValidationError as PydanticValidationError
 from rest_framework.decorators import api_view
 from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.request import Request
 
-from app.settings import CACHE_WEATHER
-from geo.serializers import CountrySerializer, CitySerializer
+from app.settings import (
+    AUTOCOMPLETE_LIMIT,
+    CHANGES_LIMIT,
+    CITY_NEAR_MAX_LIMIT,
+    CITY_NEAR_MAX_RADIUS,
+    CURRENCY_BASE,
+    GEO_INDEX_BATCH_LIMIT,
+    GEO_INDEX_ENABLED,
+    GEO_REVERSE_DB_BATCH_LIMIT,
+    WEATHER_BULK_LIMIT,
+)
+from base.services.metrics import track
+from geo.clients.shemas import LocationDTO
+from geo.serializers import (
+    CityChangeSerializer,
+    CityDistanceSerializer,
+    CountrySerializer,
+    CitySerializer,
+)
+from geo.services.autocomplete import AutocompleteService
+from geo.services.changes import KIND_COUNTRY, ChangesService
 from geo.services.city import CityService
 from geo.services.country import CountryService
+from geo.services.currency import CurrencyService
+from geo.services.location import LocationService
 from geo.services.shemas import CountryCityDTO
 from geo.services.weather import WeatherService
 
 
+def _parse_cities_codes(query_params: QueryDict) -> set[CountryCityDTO]:
+    """
+    Разбор ISO Alpha2 кодов стран и названий городов из параметров запроса.
+
+    :param query_params: Параметры запроса
+    :return:
+    """
+
+    codes_set = set()
+    if codes := query_params.getlist("codes"):
+        if any(not re.match(r"\w{2},\w{2,50}", code) for code in codes):
+            raise ValidationError({"codes": "Коды переданы в некорректном формате."})
+
+        codes_set = {
+            CountryCityDTO(alpha2code=alpha2code, city=city)
+            for (alpha2code, city) in (code.split(",") for code in codes)
+        }
+
+    if not codes_set:
+        raise ValidationError(
+            {
+                "codes": "Не переданы ISO Alpha2 коды стран и названия городов для поиска."
+            }
+        )
+
+    return codes_set
+
+
+def _parse_countries_codes(query_params: QueryDict) -> set[str]:
+    """
+    Разбор ISO Alpha2 кодов стран из параметров запроса.
+
+    :param query_params: Параметры запроса
+    :return:
+    """
+
+    codes_set = set()
+    if codes := query_params.getlist("codes"):
+        codes_set = {code.strip() for code in codes if code.strip().isalpha()}
+
+    if not codes_set:
+        raise ValidationError(
+            {"codes": "Не переданы ISO Alpha2 коды стран для поиска."}
+        )
+
+    return codes_set
+
+
+def _get_city_etag(request: HttpRequest, name: str) -> Optional[str]:
+    """
+    Вычисление ETag для ответа со списком городов по названию.
+
+    :param HttpRequest request: Объект запроса
+    :param str name: Название города
+    :return:
+    """
+
+    return CityService().get_cities_etag(name)
+
+
+def _get_cities_etag(request: HttpRequest) -> Optional[str]:
+    """
+    Вычисление ETag для ответа со списком городов по кодам.
+
+    Некорректные параметры не обрабатываются: ошибку валидации сформирует представление.
+
+    :param HttpRequest request: Объект запроса
+    :return:
+    """
+
+    try:
+        codes_set = _parse_cities_codes(request.GET)
+    except ValidationError:
+        return None
+
+    return CityService().get_cities_by_codes_etag(codes_set)
+
+
+def _get_country_etag(request: HttpRequest, name: str) -> Optional[str]:
+    """
+    Вычисление ETag для ответа со списком стран по названию.
+
+    :param HttpRequest request: Объект запроса
+    :param str name: Название страны
+    :return:
+    """
+
+    return CountryService().get_countries_etag(name)
+
+
+def _get_countries_etag(request: HttpRequest) -> Optional[str]:
+    """
+    Вычисление ETag для ответа со списком стран по кодам.
+
+    Некорректные параметры не обрабатываются: ошибку валидации сформирует представление.
+
+    :param HttpRequest request: Объект запроса
+    :return:
+    """
+
+    try:
+        codes_set = _parse_countries_codes(request.GET)
+    except ValidationError:
+        return None
+
+    return CountryService().get_countries_by_codes_etag(codes_set)
+
+
+def _parse_fields(request: Request) -> Optional[list[str]]:
+    """
+    Разбор списка полей ответа из параметра запроса `fields`
+    (через запятую, поля связанной записи – через точку: `name,country.alpha2code`).
+
+    :param Request request: Объект запроса
+    :return: Поля ответа или None, если выводятся все поля
+    """
+
+    fields = [
+        field.strip()
+        for value in request.query_params.getlist("fields")
+        for field in value.split(",")
+        if field.strip()
+    ]
+
+    return fields or None
+
+
+def _is_raw(request: Request) -> bool:
+    """
+    Проверка запроса на получение исходных данных внешнего API.
+
+    :param Request request: Объект запроса
+    :return:
+    """
+
+    return request.query_params.get("raw") in ("1", "true")
+
+
+@condition(etag_func=_get_city_etag)
 @api_view(["GET"])
 def get_city(request: Request, name: str) -> JsonResponse:
     """
@@ -24,53 +185,139 @@ def get_city(request: Request, name: str) -> JsonResponse:
     Сначала метод ищет данные в БД. Если данные не найдены, то делается запрос к API.
     После получения данных от API они сохраняются в БД.
 
+    Параметр `fields` ограничивает набор полей ответа (например, `name,country.alpha2code`).
+
     :param Request request: Объект запроса
     :param str name: Название города
     :return:
     """
 
-    if cities := CityService().get_cities(name):
-        serializer = CitySerializer(cities, many=True)
+    fields = _parse_fields(request)
+    if cities := CityService().get_cities(name, only=CitySerializer.get_only(fields)):
+        serializer = CitySerializer(cities, many=True, fields=fields)
+
+        with track("serialize"):
+            data = serializer.data
 
-        return JsonResponse(serializer.data, safe=False)
+        return JsonResponse(data, safe=False)
 
     raise NotFound
 
 
+@condition(etag_func=_get_cities_etag)
 @api_view(["GET"])
 def get_cities(request: Request) -> JsonResponse:
     """
     Получение информации о городах с фильтрацией по ISO Alpha2 коду страны и названию города.
 
+    Параметр `fields` ограничивает набор полей ответа (например, `name,country.alpha2code`).
+
     :param Request request: Объект запроса
     :return:
     """
 
-    codes_set = set()
-    if codes := request.query_params.getlist("codes"):
-        if any(not re.match(r"\w{2},\w{2,50}", code) for code in codes):
-            raise ValidationError({"codes": "Коды переданы в некорректном формате."})
+    codes_set = _parse_cities_codes(request.query_params)
+    fields = _parse_fields(request)
+    if cities := CityService().get_cities_by_codes(
+        codes_set, only=CitySerializer.get_only(fields)
+    ):
+        serializer = CitySerializer(cities, many=True, fields=fields)
 
-        codes_set = {
-            CountryCityDTO(alpha2code=alpha2code, city=city)
-            for (alpha2code, city) in (code.split(",") for code in codes)
-        }
+        with track("serialize"):
+            data = serializer.data
 
-    if not codes_set:
+        return JsonResponse(data, safe=False)
+
+    return JsonResponse([], safe=False)
+
+
+@api_view(["GET"])
+def get_cities_near(request: Request) -> JsonResponse:
+    """
+    Получение ближайших к точке городов в пределах радиуса.
+
+    Параметры: `lat` и `lon` – координаты точки, `radius` – радиус поиска в километрах
+    (по умолчанию 10), `limit` – максимальное количество городов (по умолчанию 10).
+    Параметр `fields` ограничивает набор полей ответа (например, `name,country.alpha2code`).
+
+    :param Request request: Объект запроса
+    :return:
+    """
+
+    params = request.query_params
+    try:
+        latitude = float(params["lat"])
+        longitude = float(params["lon"])
+        radius = float(params.get("radius", 10))
+        limit = int(params.get("limit", 10))
+    except (KeyError, ValueError) as exc:
         raise ValidationError(
-            {
-                "codes": "Не переданы ISO Alpha2 коды стран и названия городов для поиска."
-            }
+            {"lat": "Координаты и параметры поиска переданы в некорректном формате."}
+        ) from exc
+
+    if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+        raise ValidationError({"lat": "Координаты вне допустимого диапазона."})
+    if not 0 < radius <= CITY_NEAR_MAX_RADIUS:
+        raise ValidationError(
+            {"radius": f"Радиус должен быть от 0 до {CITY_NEAR_MAX_RADIUS} км."}
+        )
+    if not 0 < limit <= CITY_NEAR_MAX_LIMIT:
+        raise ValidationError(
+            {"limit": f"Количество должно быть от 1 до {CITY_NEAR_MAX_LIMIT}."}
         )
 
-    if cities := CityService().get_cities_by_codes(codes_set):
-        serializer = CitySerializer(cities, many=True)
+    fields = _parse_fields(request)
+    cities = CityService.get_nearest_cities(
+        latitude,
+        longitude,
+        radius,
+        limit,
+        only=CityDistanceSerializer.get_only(fields),
+    )
+    serializer = CityDistanceSerializer(cities, many=True, fields=fields)
 
-        return JsonResponse(serializer.data, safe=False)
+    with track("serialize"):
+        data = serializer.data
 
-    return JsonResponse([], safe=False)
+    return JsonResponse(data, safe=False)
+
+
+@api_view(["POST"])
+def reverse_geocode(request: Request) -> JsonResponse:
+    """
+    Поиск ближайших городов для множества точек (обратное геокодирование).
 
+    Тело запроса: `{"points": [[<широта>, <долгота>], ...]}`.
+    Для каждой точки возвращается ближайший город с расстоянием в километрах или `null`.
 
+    :param Request request: Объект запроса
+    :return:
+    """
+
+    points = request.data.get("points") if isinstance(request.data, dict) else None
+    if not isinstance(points, list) or not points:
+        raise ValidationError({"points": "Не переданы координаты точек."})
+    # без индекса координат для каждой точки выполняется запрос к БД
+    batch_limit = (
+        GEO_INDEX_BATCH_LIMIT if GEO_INDEX_ENABLED else GEO_REVERSE_DB_BATCH_LIMIT
+    )
+    if len(points) > batch_limit:
+        raise ValidationError(
+            {"points": f"Превышено количество точек ({batch_limit})."}
+        )
+    try:
+        coordinates = [(float(lat), float(lon)) for lat, lon in points]
+    except (TypeError, ValueError) as exc:
+        raise ValidationError(
+            {"points": "Координаты переданы в некорректном формате."}
+        ) from exc
+    if any(not -90 <= lat <= 90 or not -180 <= lon <= 180 for lat, lon in coordinates):
+        raise ValidationError({"points": "Координаты вне допустимого диапазона."})
+
+    return JsonResponse(CityService().reverse_geocode(coordinates), safe=False)
+
+
+@condition(etag_func=_get_country_etag)
 @api_view(["GET"])
 def get_country(request: Request, name: str) -> JsonResponse:
     """
@@ -79,41 +326,50 @@ def get_country(request: Request, name: str) -> JsonResponse:
     Сначала метод ищет данные в БД. Если данные не найдены, то делается запрос к API.
     После получения данных от API они сохраняются в БД.
 
+    Параметр `fields` ограничивает набор полей ответа (например, `name,alpha2code`).
+
     :param Request request: Объект запроса
     :param str name: Название страны
     :return:
     """
 
-    if countries := CountryService().get_countries(name):
-        serializer = CountrySerializer(countries, many=True)
+    fields = _parse_fields(request)
+    if countries := CountryService().get_countries(
+        name, only=CountrySerializer.get_only(fields)
+    ):
+        serializer = CountrySerializer(countries, many=True, fields=fields)
+
+        with track("serialize"):
+            data = serializer.data
 
-        return JsonResponse(serializer.data, safe=False)
+        return JsonResponse(data, safe=False)
 
     raise NotFound
 
 
+@condition(etag_func=_get_countries_etag)
 @api_view(["GET"])
 def get_countries(request: Request) -> JsonResponse:
     """
     Получение информации о странах с фильтрацией по их ISO Alpha2 коду страны.
 
+    Параметр `fields` ограничивает набор полей ответа (например, `name,alpha2code`).
+
     :param Request request: Объект запроса
     :return:
     """
 
-    codes_set = set()
-    if codes := request.query_params.getlist("codes"):
-        codes_set = {code.strip() for code in codes if code.strip().isalpha()}
-
-    if not codes_set:
-        raise ValidationError(
-            {"codes": "Не переданы ISO Alpha2 коды стран для поиска."}
-        )
+    codes_set = _parse_countries_codes(request.query_params)
+    fields = _parse_fields(request)
+    if countries := CountryService().get_countries_by_codes(
+        codes_set, only=CountrySerializer.get_only(fields)
+    ):
+        serializer = CountrySerializer(countries, many=True, fields=fields)
 
-    if countries := CountryService().get_countries_by_codes(codes_set):
-        serializer = CountrySerializer(countries, many=True)
+        with track("serialize"):
+            data = serializer.data
 
-        return JsonResponse(serializer.data, safe=False)
+        return JsonResponse(data, safe=False)
 
     return JsonResponse([], safe=False)
 
@@ -123,17 +379,24 @@ def get_weather(request: Request, alpha2code: str, city: str) -> JsonResponse:
     """
     Получение информации о погоде в указанном городе.
 
+    Параметр `raw=1` возвращает исходный ответ внешнего API вместо компактных данных.
+
     :param Request request: Объект запроса
     :param str alpha2code: ISO Alpha2 код страны
     :param str city: Город
     :return:
     """
 
-    cache_key = f"{alpha2code}_{city}"
-    data = caches[CACHE_WEATHER].get(cache_key)
-    if not data:
-        if data := WeatherService().get_weather(alpha2code=alpha2code, city=city):
-            caches[CACHE_WEATHER].set(cache_key, data)
+    service = WeatherService()
+    try:
+        if _is_raw(request):
+            data = service.get_weather_raw(alpha2code=alpha2code, city=city)
+        elif weather := service.get_weather(alpha2code=alpha2code, city=city):
+            data = weather.dict()
+        else:
+            data = None
+    except PydanticValidationError as exc:
+        raise NotFound from exc
 
     if data:
         return JsonResponse(data)
@@ -142,5 +405,173 @@ def get_weather(request: Request, alpha2code: str, city: str) -> JsonResponse:
 
 
 @api_view(["GET"])
-def get_currency(*args: Any, **kwargs: Any) -> None:
-    pass
+def get_weather_bulk(request: Request) -> JsonResponse:
+    """
+    Получение информации о погоде для нескольких городов одним запросом.
+
+    Локации передаются в параметре `locations` в формате `<ISO Alpha2 код страны>,<город>`.
+    Параметр `raw=1` возвращает исходные ответы внешнего API вместо компактных данных.
+
+    :param Request request: Объект запроса
+    :return:
+    """
+
+    locations = request.query_params.getlist("locations")
+    if not locations:
+        raise ValidationError(
+            {"locations": "Не переданы ISO Alpha2 коды стран и названия городов."}
+        )
+    if len(locations) > WEATHER_BULK_LIMIT:
+        raise ValidationError(
+            {"locations": f"Превышено количество локаций ({WEATHER_BULK_LIMIT})."}
+        )
+    if any(not re.match(r"\w{2},\w{2,50}", location) for location in locations):
+        raise ValidationError({"locations": "Локации переданы в некорректном формате."})
+
+    locations_set = {
+        LocationDTO(alpha2code=alpha2code, city=city)
+        for (alpha2code, city) in (location.split(",", 1) for location in locations)
+    }
+    service = WeatherService()
+    weather: dict[LocationDTO, Optional[dict]]
+    if _is_raw(request):
+        weather = service.get_weather_raw_bulk(locations_set)
+    else:
+        weather = {
+            location: data.dict() if data else None
+            for location, data in service.get_weather_bulk(locations_set).items()
+        }
+
+    return JsonResponse(
+        [
+            {"alpha2code": location.alpha2code, "city": location.city, "weather": data}
+            for location, data in weather.items()
+        ],
+        safe=False,
+    )
+
+
+@api_view(["GET"])
+def get_currency(request: Request, alpha2code: str) -> JsonResponse:
+    """
+    Получение курсов валют страны.
+
+    Курсы рассчитываются по ежедневному снимку без обращения к внешнему API.
+    Параметр `base` задает валюту, относительно которой рассчитываются курсы.
+
+    :param Request request: Объект запроса
+    :param str alpha2code: ISO Alpha2 код страны
+    :return:
+    """
+
+    base = request.query_params.get("base", CURRENCY_BASE)
+    if rates := CurrencyService().get_country_rates(alpha2code=alpha2code, base=base):
+        return JsonResponse(rates.dict())
+
+    raise NotFound
+
+
+@api_view(["GET"])
+def get_location(request: Request, alpha2code: str, city: str) -> JsonResponse:
+    """
+    Получение сводной информации о месте: страна, город, погода и курсы валют.
+
+    Разделы собираются параллельно; для каждого раздела возвращается статус получения данных
+    (`ok`, `not_found`, `timeout`, `error`), поэтому при медленном источнике ответ содержит
+    частичные данные.
+
+    :param Request request: Объект запроса
+    :param str alpha2code: ISO Alpha2 код страны
+    :param str city: Город
+    :return:
+    """
+
+    if len(alpha2code) != 2:
+        raise NotFound
+
+    sections = LocationService().get_location(alpha2code=alpha2code, city=city)
+    if all(section.status == "not_found" for section in sections.values()):
+        raise NotFound
+
+    return JsonResponse({name: section.dict() for name, section in sections.items()})
+
+
+@api_view(["GET"])
+def get_autocomplete(request: Request) -> JsonResponse:
+    """
+    Автодополнение названий городов и стран по префиксу.
+
+    Параметры: `q` – начало названия, `limit` – максимальное количество результатов.
+    Результаты упорядочены по убыванию численности населения.
+
+    :param Request request: Объект запроса
+    :return:
+    """
+
+    params = request.query_params
+    query = params.get("q", "").strip()
+    if not query:
+        raise ValidationError({"q": "Не передан префикс для поиска."})
+    try:
+        limit = int(params.get("limit", AUTOCOMPLETE_LIMIT))
+    except ValueError as exc:
+        raise ValidationError(
+            {"limit": "Количество передано в некорректном формате."}
+        ) from exc
+    if not 0 < limit <= AUTOCOMPLETE_LIMIT:
+        raise ValidationError(
+            {"limit": f"Количество должно быть от 1 до {AUTOCOMPLETE_LIMIT}."}
+        )
+
+    return JsonResponse(AutocompleteService().search(query, limit), safe=False)
+
+
+@api_view(["GET"])
+def get_changes(request: Request) -> JsonResponse:
+    """
+    Лента изменений стран и городов для инкрементальной синхронизации.
+
+    Параметры: `since` – курсор из поля `next` предыдущего ответа (без курсора лента
+    возвращается с начала), `limit` – максимальное количество записей.
+    Если `has_more` равно `false`, следующий запрос с тем же курсором стоит выполнить позже.
+
+    :param Request request: Объект запроса
+    :return:
+    """
+
+    params = request.query_params
+    cursor = None
+    if since := params.get("since"):
+        if not (cursor := ChangesService.decode_cursor(since)):
+            raise ValidationError({"since": "Курсор передан в некорректном формате."})
+    try:
+        limit = int(params.get("limit", CHANGES_LIMIT))
+    except ValueError as exc:
+        raise ValidationError(
+            {"limit": "Количество передано в некорректном формате."}
+        ) from exc
+    if not 0 < limit <= CHANGES_LIMIT:
+        raise ValidationError(
+            {"limit": f"Количество должно быть от 1 до {CHANGES_LIMIT}."}
+        )
+
+    changes, cursor, has_more = ChangesService().get_changes(cursor, limit)
+
+    with track("serialize"):
+        data = [
+            {
+                "type": kind,
+                "data": CountrySerializer(item).data
+                if kind == KIND_COUNTRY
+                else CityChangeSerializer(item).data,
+            }
+            for kind, item in changes
+        ]
+
+    return JsonResponse(
+        {
+            "changes": data,
+            "next": ChangesService.encode_cursor(cursor) if cursor else None,
+            "has_more": has_more,
+        }
+    )
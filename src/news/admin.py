@@ -1,10 +1,11 @@
 from django.contrib import admin
 
+from base.admin import PerformanceModelAdmin
 from news.models import News
 
 
 @admin.register(News)
-class NewsAdmin(admin.ModelAdmin):
+class NewsAdmin(PerformanceModelAdmin):
     list_display = (
         "country",
         "title",
@@ -12,11 +13,10 @@ class NewsAdmin(admin.ModelAdmin):
         "published_at",
         "url",
     )
+    list_select_related = ("country",)
 
     search_fields = ("title", "description")
+    search_vector_fields = ("title", "description")
 
-    list_filter = (
-        "published_at",
-        "created_at",
-        "updated_at",
-    )
+    # фильтрация по дате публикации использует индекс news_news_published_at_idx
+    date_hierarchy = "published_at"
@@ -1,13 +1,16 @@
 """
 Функции для взаимодействия с внешним сервисом-провайдером новостной ленты.
 """
-from http import HTTPStatus
 from typing import Optional
 
-import httpx
-
-from app.settings import REQUESTS_TIMEOUT, API_KEY_NEWSAPI
+from app.settings import (
+    API_RATE_BURST_NEWSAPI,
+    API_RATE_LIMIT_NEWSAPI,
+    API_BASE_URL_NEWSAPI,
+    API_KEY_NEWSAPI,
+)
 from base.clients.base import BaseClient
+from base.services.metrics import track_upstream
 
 from news.clients.shemas import NewsItemDTO
 
@@ -18,16 +21,14 @@ class NewsClient(BaseClient):
     """
 
     def get_base_url(self) -> str:
-        return "https://newsapi.org/v2"
+        return f"{API_BASE_URL_NEWSAPI}/v2"
 
-    def _request(self, endpoint: str) -> Optional[dict]:
-        with httpx.Client(timeout=REQUESTS_TIMEOUT) as client:
-            # получение ответа
-            response = client.get(endpoint)
-            if response.status_code == HTTPStatus.OK:
-                return response.json()
+    def get_rate_limit(self) -> tuple[float, int]:
+        return API_RATE_LIMIT_NEWSAPI, API_RATE_BURST_NEWSAPI
 
-            return None
+    @track_upstream
+    def _request(self, endpoint: str) -> Optional[dict]:
+        return self._get(endpoint)
 
     def get_news(self, alpha2code: str) -> Optional[list[NewsItemDTO]]:
         """
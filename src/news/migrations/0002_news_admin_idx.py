@@ -0,0 +1,33 @@
+# Generated by Django 4.0.10 on 2026-10-19 15:46
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently  # type: ignore
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # индексы больших таблиц создаются без блокировки записи
+    atomic = False
+
+    dependencies = [
+        ("news", "0001_initial"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="news",
+            index=models.Index(
+                fields=["published_at"], name="news_news_published_at_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="news",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.search.SearchVector(
+                    "title", "description", config="simple"
+                ),
+                name="news_news_search_idx",
+            ),
+        ),
+    ]
@@ -1,6 +1,7 @@
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 
-from base.models import TimeStampMixin
+from base.models import TimeStampMixin, build_search_vector
 from geo.models import Country
 
 
@@ -46,3 +47,12 @@ class News(TimeStampMixin):
         verbose_name = "Новость"
         verbose_name_plural = "Новости"
         ordering = ["published_at"]
+        indexes = [
+            # сортировка и фильтрация по дате публикации
+            models.Index(fields=["published_at"], name="news_news_published_at_idx"),
+            # полнотекстовый поиск в административном интерфейсе
+            GinIndex(
+                build_search_vector("title", "description"),
+                name="news_news_search_idx",
+            ),
+        ]